@@ -14,7 +14,7 @@ from pathlib import Path
 # Agregar src al path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from utils.logger import get_logger
+from utils.logger import configure_logging, get_logger, shutdown_logging
 from utils.helpers import load_config
 from core.vision_pipeline import VisionPipeline
 
@@ -33,29 +33,26 @@ def main():
         detection_config = load_config('config/detection_config.yaml')
         vision_config = load_config('config/vision_config.yaml')
         
+        # Logging asíncrono y límite de frecuencia (reconfigura los loggers existentes)
+        configure_logging(vision_config.get('logging', {}))
+        
         logger.info("Configuración cargada correctamente")
         
     except Exception as e:
         logger.error(f"Error cargando configuración: {e}")
         return
     
-    # TODO: Inicializar pipeline de visión
-    # pipeline = VisionPipeline(camera_config, detection_config)
-    
-    # TODO: Ejecutar sistema
-    # pipeline.run()
+    # Inicializar pipeline de visión
+    pipeline = VisionPipeline(camera_config, detection_config)
     
     logger.info("Sistema iniciado. Presiona 'q' para salir.")
     
-    # Por ahora, solo un placeholder
-    print("\n" + "="*50)
-    print("SISTEMA DE VISIÓN ARTIFICIAL")
-    print("Beach Cleaner Robot - TMR 2026")
-    print("="*50)
-    print("\nEstructura creada correctamente.")
-    print("Listo para dividir trabajo entre el equipo.")
-    print("\nVer: DIVISION_DE_TRABAJO.md para asignaciones")
-    print("="*50)
+    # Ejecutar sistema (bloquea hasta 'q' o Ctrl+C)
+    try:
+        pipeline.run()
+    finally:
+        logger.info(f"Logging: {pipeline.get_stats()['logging']}")
+        shutdown_logging()
 
 
 if __name__ == '__main__':
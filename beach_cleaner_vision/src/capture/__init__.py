@@ -0,0 +1 @@
+"""Fuentes de video (cámara, ESP32-CAM, archivo) con captura en segundo plano"""
@@ -0,0 +1,67 @@
+"""
+Fuente de video: cámara local (webcam integrada o USB)
+============================================
+
+DESCRIPCIÓN:
+    Backend 'laptop' de camera_config.yaml. El hilo de FrameSource llama
+    grab() sin pausa, así el buffer interno de VideoCapture se vacía tan
+    rápido como la cámara entrega frames y el timestamp se toma apenas
+    termina grab() (antes de decodificar con retrieve()).
+"""
+
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .frame_source import FrameSource
+
+
+class CameraSource(FrameSource):
+    """Cámara local vía cv2.VideoCapture"""
+
+    def __init__(self, config: dict):
+        """
+        Inicializa la fuente
+
+        Args:
+            config: Sección camera.laptop de camera_config.yaml
+        """
+        super().__init__('laptop')
+        self.config = config
+        self._capture: Optional[cv2.VideoCapture] = None
+
+    def _open(self):
+        """Abre la cámara y aplica resolución, FPS y tamaño de buffer"""
+        capture = cv2.VideoCapture(self.config.get('device_id', 0))
+
+        resolution = self.config.get('resolution', {})
+        if 'width' in resolution:
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, resolution['width'])
+        if 'height' in resolution:
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution['height'])
+        if 'fps' in self.config:
+            capture.set(cv2.CAP_PROP_FPS, self.config['fps'])
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, self.config.get('buffer_size', 1))
+
+        if not capture.isOpened():
+            raise RuntimeError("No se pudo abrir la fuente de video 'laptop'")
+        self._capture = capture
+
+    def _grab(self) -> Optional[Tuple[np.ndarray, float]]:
+        """Captura (grab) y luego decodifica (retrieve) un frame"""
+        if not self._capture.grab():
+            return None
+        timestamp = time.monotonic()
+
+        ret, frame = self._capture.retrieve()
+        if not ret:
+            return None
+        return frame, timestamp
+
+    def _close(self):
+        """Libera la cámara"""
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
@@ -0,0 +1,209 @@
+"""
+Fuente de video: ESP32-CAM
+============================================
+
+DESCRIPCIÓN:
+    Backend 'esp32cam' de camera_config.yaml. La cámara sirve un JPEG
+    fijo por petición en http://<ip_address>:<port><stream_path>
+    (ej: /cam-hi.jpg).
+
+    Cliente HTTP propio (http.client) en lugar de VideoCapture:
+    - Conexión persistente (keep-alive): sin handshake TCP por frame
+    - Una petición SIEMPRE en vuelo: un hilo de descarga pide el
+      siguiente JPEG mientras el hilo de captura decodifica el anterior
+
+          [descarga] GET n+1  GET n+2  GET n+3 ...
+          [captura]     decode n  decode n+1 ...
+
+    - Reconexión con backoff exponencial, máximo `reconnect_attempts`
+      intentos seguidos; si ninguno funciona la captura termina
+    - Decodificación reducida: con decode_scale 0.5 o 0.25 el JPEG se
+      decodifica directo a 1/2 o 1/4 (cv2.IMREAD_REDUCED_COLOR_2/4), que
+      es bastante más barato que decodificar completo y luego reducir
+
+    El timestamp de cada frame es el momento en que terminó de llegar
+    su JPEG (antes de decodificar).
+"""
+
+import http.client
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.frame_queue import LatestQueue
+from .frame_source import FrameSource
+
+
+# Escala de decodificación → bandera de cv2.imdecode
+_DECODE_FLAGS = {
+    1.0: cv2.IMREAD_COLOR,
+    0.5: cv2.IMREAD_REDUCED_COLOR_2,
+    0.25: cv2.IMREAD_REDUCED_COLOR_4,
+}
+
+
+class Esp32CamSource(FrameSource):
+    """Cliente HTTP de JPEG fijos de la ESP32-CAM"""
+
+    def __init__(self, config: dict, max_scale: float = 1.0):
+        """
+        Inicializa la fuente
+
+        Args:
+            config: Sección camera.esp32cam de camera_config.yaml
+            max_scale: Resolución máxima que el pipeline va a usar
+                       (performance.resize_factor); permite decodificar
+                       reducido sin perder nada
+        """
+        super().__init__('esp32cam')
+        self.host = config.get('ip_address', '192.168.4.1')
+        self.port = config.get('port', 80)
+        self.path = config.get('stream_path', '/cam-hi.jpg')
+        self.reconnect_attempts = config.get('reconnect_attempts', 5)
+        self.timeout = config.get('timeout', 5)
+
+        # Mayor reducción que no baje de la resolución que se va a usar
+        self.decode_scale = min(scale for scale in _DECODE_FLAGS
+                                if scale >= min(max_scale, 1.0))
+        self._decode_flag = _DECODE_FLAGS[self.decode_scale]
+
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._jpegs = LatestQueue('esp32cam-jpeg')
+        self._downloader: Optional[threading.Thread] = None
+
+        # Estadísticas
+        self.reconnects = 0
+        self.bytes_received = 0
+
+    def _open(self):
+        """Conecta y arranca el hilo de descarga"""
+        self._jpegs = LatestQueue('esp32cam-jpeg')
+        if not self._reconnect():
+            raise RuntimeError(
+                f"No se pudo abrir la fuente de video 'esp32cam' "
+                f"(http://{self.host}:{self.port}{self.path})")
+
+        self._downloader = threading.Thread(target=self._download_loop,
+                                            name='capture-esp32cam-http', daemon=True)
+        self._downloader.start()
+
+    def _grab(self) -> Optional[Tuple[np.ndarray, float]]:
+        """Toma el último JPEG descargado y lo decodifica"""
+        item = self._jpegs.get(timeout=self.timeout)
+        if item is None:
+            return None
+
+        data, timestamp = item
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), self._decode_flag)
+        if frame is None:
+            self.logger.warning("JPEG inválido de la ESP32-CAM")
+            return None
+        return frame, timestamp
+
+    def _recover(self) -> bool:
+        """La reconexión la maneja el hilo de descarga: seguir si sigue vivo"""
+        return not self._jpegs.closed and not self._stop_event.is_set()
+
+    def _close(self):
+        """Detiene la descarga y cierra la conexión"""
+        self._jpegs.close()
+        if self._downloader is not None and self._downloader is not threading.current_thread():
+            self._downloader.join(timeout=self.timeout + 1)
+            self._downloader = None
+        self._disconnect()
+
+    def get_stats(self):
+        """Estadísticas de FrameSource + reconexiones y bytes recibidos"""
+        stats = super().get_stats()
+        stats.update({
+            'decode_scale': self.decode_scale,
+            'reconnects': self.reconnects,
+            'bytes_received': self.bytes_received,
+            'jpegs_dropped': self._jpegs.dropped_count
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _download_loop(self):
+        """Hilo de descarga: una petición en vuelo mientras se decodifica"""
+        while not self._stop_event.is_set() and not self._jpegs.closed:
+            # No pedir más de un frame por delante del decodificador: la
+            # siguiente petición sale apenas él toma el JPEG anterior
+            if not self._jpegs.wait_until_empty(timeout=0.1):
+                continue
+
+            try:
+                data = self._fetch()
+            except (OSError, http.client.HTTPException) as e:
+                self.logger.warning(f"ESP32-CAM: fallo de descarga ({e})")
+                if not self._reconnect():
+                    break
+                continue
+
+            self._jpegs.put((data, time.monotonic()))
+
+        # Sin conexión posible: el hilo de captura termina al vaciar la cola
+        self._jpegs.close()
+
+    def _fetch(self) -> bytes:
+        """GET del JPEG sobre la conexión persistente"""
+        if self._connection is None:
+            raise ConnectionError("sin conexión")
+
+        self._connection.request('GET', self.path, headers={'Connection': 'keep-alive'})
+        response = self._connection.getresponse()
+        data = response.read()
+
+        if response.status != 200:
+            raise http.client.HTTPException(f"HTTP {response.status}")
+        # El servidor pidió cerrar: abrir otra para la siguiente petición
+        if response.will_close:
+            self._connect()
+
+        self.bytes_received += len(data)
+        return data
+
+    def _reconnect(self) -> bool:
+        """Reconecta con backoff exponencial (máximo reconnect_attempts)"""
+        delay = 0.25
+        for attempt in range(1, self.reconnect_attempts + 1):
+            if self._stop_event.is_set():
+                return False
+            try:
+                self._connect()
+                # Una petición de prueba confirma que la cámara responde
+                self._jpegs.put((self._fetch(), time.monotonic()))
+                if attempt > 1 or self.sequence > 0:
+                    self.reconnects += 1
+                    self.logger.info(f"ESP32-CAM reconectada (intento {attempt})")
+                return True
+            except (OSError, http.client.HTTPException) as e:
+                self.logger.warning(
+                    f"ESP32-CAM sin respuesta ({e}), reintento "
+                    f"{attempt}/{self.reconnect_attempts} en {delay:.2f} s")
+                self._disconnect()
+                if self._stop_event.wait(delay):
+                    return False
+                delay *= 2
+
+        self.logger.error(f"ESP32-CAM no disponible tras {self.reconnect_attempts} intentos")
+        return False
+
+    def _connect(self):
+        """Abre una conexión HTTP nueva"""
+        self._disconnect()
+        self._connection = http.client.HTTPConnection(self.host, self.port,
+                                                      timeout=self.timeout)
+        self._connection.connect()
+
+    def _disconnect(self):
+        """Cierra la conexión actual (si hay)"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
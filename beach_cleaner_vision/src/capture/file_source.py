@@ -0,0 +1,86 @@
+"""
+Fuente de video: archivo (pruebas y benchmarks)
+============================================
+
+DESCRIPCIÓN:
+    Backend 'file' de camera_config.yaml. Dos modos de reproducción:
+
+    - realtime: true  → a la velocidad nominal del video (FPS del
+      archivo), simula una cámara real: si el pipeline va lento, los
+      frames viejos se descartan igual que en vivo
+    - realtime: false → lo más rápido posible y SIN descartar (modo
+      lockstep): cada frame espera a que los consumidores tomen el
+      anterior. Mismo video = mismos frames procesados en cada corrida
+
+    Con loop: true el video vuelve al inicio al terminar; si no, la
+    fuente se marca como terminada (FrameSource.finished).
+"""
+
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .frame_source import FrameSource
+
+
+class FileSource(FrameSource):
+    """Reproducción de un archivo de video"""
+
+    def __init__(self, config: dict):
+        """
+        Inicializa la fuente
+
+        Args:
+            config: Sección camera.file de camera_config.yaml
+        """
+        super().__init__('file')
+        self.path = config.get('path', '')
+        self.loop = config.get('loop', False)
+        self.realtime = config.get('realtime', True)
+        self.lockstep = not self.realtime
+
+        self._capture: Optional[cv2.VideoCapture] = None
+        self._frame_interval = 0.0
+        self._next_frame_time = 0.0
+
+    def _open(self):
+        """Abre el archivo y toma su FPS nominal"""
+        capture = cv2.VideoCapture(self.path)
+        if not capture.isOpened():
+            raise RuntimeError(f"No se pudo abrir el archivo de video '{self.path}'")
+        self._capture = capture
+
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        self._frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+        self._next_frame_time = time.monotonic()
+
+    def _grab(self) -> Optional[Tuple[np.ndarray, float]]:
+        """Lee el siguiente frame (esperando su turno en modo realtime)"""
+        if self.realtime:
+            delay = self._next_frame_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_frame_time = max(self._next_frame_time + self._frame_interval,
+                                        time.monotonic())
+
+        ret, frame = self._capture.read()
+        if not ret and self.loop:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._capture.read()
+
+        if not ret:
+            return None
+        return frame, time.monotonic()
+
+    def _recover(self) -> bool:
+        """Fin del archivo (sin loop): terminar la captura"""
+        self.logger.info(f"Fin del video '{self.path}' ({self.sequence} frames)")
+        return False
+
+    def _close(self):
+        """Cierra el archivo"""
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
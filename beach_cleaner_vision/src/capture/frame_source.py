@@ -0,0 +1,283 @@
+"""
+Fuente de frames con captura en segundo plano
+============================================
+
+DESCRIPCIÓN:
+    VideoCapture guarda varios frames en su buffer interno: si el
+    programa lee más lento que la cámara, cada read() devuelve un frame
+    viejo (latencia de varios frames) y `buffer_size: 1` no siempre lo
+    evita (depende del backend).
+
+    FrameSource lee la fuente en su PROPIO hilo, tan rápido como la
+    fuente entrega, así el buffer del driver nunca se llena. Cada frame
+    se sella con:
+        - timestamp: tiempo monotónico justo al capturarlo
+        - sequence: número de frame (1, 2, 3, ...)
+    y se publica en una o más LatestQueue de salida (el más nuevo gana).
+    Los frames que ningún consumidor alcanzó a leer se cuentan como
+    descartados en cada salida.
+
+    Modo lockstep (ej: archivo lo más rápido posible): en lugar de
+    descartar, el hilo espera a que todas las salidas tomen el frame
+    anterior. Sirve para benchmarks deterministas. La espera no cuenta
+    como latencia: cada paquete lleva además 'published', el momento en
+    que salió hacia las colas (después de esperar), y los plazos del
+    pipeline se miden desde ahí.
+
+    Al terminar la fuente (fin de archivo, cámara perdida) las salidas
+    se cierran: cada consumidor procesa el último frame pendiente y
+    luego recibe None con la cola cerrada.
+
+BACKENDS:
+    - laptop:   CameraSource (webcam USB / integrada)
+    - esp32cam: Esp32CamSource (JPEG por HTTP)
+    - file:     FileSource (video, a tiempo real o lo más rápido posible)
+    - recording: RecordingSource (grabación cruda .bcvraw, sin decodificar)
+
+    create_frame_source() elige el backend según camera_config.yaml.
+
+    Con camera.record.enabled cualquier backend copia además cada frame
+    capturado a una grabación cruda (FrameRecorder, ver recording.py).
+
+PAQUETE PUBLICADO:
+    {
+        'frame': imagen BGR,
+        'timestamp': tiempo monotónico de captura,
+        'published': tiempo monotónico de publicación (= captura salvo en lockstep),
+        'sequence': número de frame
+    }
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.frame_queue import LatestQueue
+from utils.logger import get_logger
+
+
+class FrameSource(ABC):
+    """Base de las fuentes de video: hilo de captura + salidas LatestQueue"""
+
+    def __init__(self, name: str):
+        """
+        Inicializa la fuente
+
+        Args:
+            name: Nombre de la fuente (para logs y estadísticas)
+        """
+        self.name = name
+        self.logger = get_logger('capture')
+
+        # True = no descartar: esperar a que las salidas consuman cada frame
+        self.lockstep = False
+
+        # Escala de los frames entregados respecto a la resolución nativa
+        # (< 1 si el backend ya los decodifica reducidos)
+        self.decode_scale = 1.0
+
+        # FrameRecorder opcional: graba cada frame capturado
+        self.recorder = None
+
+        self._outputs: List[LatestQueue] = []
+        self._reader: Optional[LatestQueue] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Estadísticas
+        self.sequence = 0
+        self.read_failures = 0
+        self.finished = False
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def add_output(self, queue: LatestQueue) -> LatestQueue:
+        """
+        Agrega una cola de salida; cada frame capturado se publica en todas
+
+        Debe llamarse antes de start().
+
+        Args:
+            queue: Cola donde publicar los frames
+
+        Returns:
+            La misma cola
+        """
+        self._outputs.append(queue)
+        return queue
+
+    def start(self):
+        """Abre la fuente y arranca el hilo de captura"""
+        if self._reader is None and not self._outputs:
+            self._reader = self.add_output(LatestQueue(self.name))
+
+        self._open()
+        self.finished = False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._grab_loop,
+                                        name=f'capture-{self.name}', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Fuente de video abierta: {self.name}")
+
+    def stop(self):
+        """Detiene el hilo de captura y libera la fuente"""
+        self._stop_event.set()
+        for queue in self._outputs:
+            queue.close()
+
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self._close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def read(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Devuelve el frame más nuevo (bloquea hasta que haya uno)
+
+        Solo para uso directo de la fuente, sin salidas agregadas con
+        add_output() (ej: herramientas de calibración).
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos (None = infinito)
+
+        Returns:
+            Paquete {'frame', 'timestamp', 'published', 'sequence'}, o None
+        """
+        if self._reader is None:
+            raise RuntimeError("read() requiere una fuente sin salidas propias")
+        return self._reader.get(timeout)
+
+    def get_stats(self) -> Dict:
+        """Frames capturados, fallas de lectura y descartes por salida"""
+        return {
+            'source': self.name,
+            'captured': self.sequence,
+            'read_failures': self.read_failures,
+            'dropped': {queue.name: queue.dropped_count for queue in self._outputs}
+        }
+
+    # ------------------------------------------------------------------
+    # Hilo de captura
+    # ------------------------------------------------------------------
+
+    def _grab_loop(self):
+        """Lee la fuente continuamente y publica cada frame en las salidas"""
+        while not self._stop_event.is_set():
+            grabbed = self._grab()
+
+            if grabbed is None:
+                self.read_failures += 1
+                if not self._recover():
+                    break
+                continue
+
+            frame, timestamp = grabbed
+            self.sequence += 1
+            if self.recorder is not None:
+                self.recorder.write(frame, timestamp)
+
+            packet = {
+                'frame': frame,
+                'timestamp': timestamp,
+                'sequence': self.sequence
+            }
+
+            if self.lockstep and not self._wait_for_consumers():
+                break
+            packet['published'] = time.monotonic()
+
+            for queue in self._outputs:
+                queue.put(packet)
+
+        # Sin más frames: los consumidores terminan al vaciar su cola
+        self.finished = True
+        if self.recorder is not None:
+            self.recorder.close()
+        for queue in self._outputs:
+            queue.close()
+
+    def _wait_for_consumers(self) -> bool:
+        """Modo lockstep: espera a que todas las salidas estén vacías"""
+        for queue in self._outputs:
+            while not queue.wait_until_empty(timeout=0.1):
+                if self._stop_event.is_set() or queue.closed:
+                    return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Backend (lo implementa cada subclase; sin _open/_grab no se puede
+    # instanciar, así el error sale al crearla y no en el hilo de captura)
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def _open(self):
+        """Abre el dispositivo/archivo/conexión (lanza RuntimeError si falla)"""
+
+    @abstractmethod
+    def _grab(self) -> Optional[Tuple[np.ndarray, float]]:
+        """Lee un frame; devuelve (frame, timestamp) o None si falló"""
+
+    def _recover(self) -> bool:
+        """
+        Maneja una lectura fallida
+
+        Returns:
+            True para seguir intentando, False para terminar la captura
+        """
+        self.logger.warning(f"No se pudo leer frame de '{self.name}'")
+        time.sleep(0.01)
+        return True
+
+    def _close(self):
+        """Libera el dispositivo/archivo/conexión"""
+
+
+def create_frame_source(camera_config: dict, max_scale: float = 1.0) -> FrameSource:
+    """
+    Crea la fuente de video configurada en camera_config.yaml
+
+    Args:
+        camera_config: Configuración de cámara completa
+        max_scale: Resolución máxima que usará el procesamiento (respecto
+                   a la nativa); los backends que pueden decodificar
+                   reducido lo aprovechan
+
+    Returns:
+        FrameSource del backend elegido en camera.source
+    """
+    # Importes locales: los backends heredan de FrameSource
+    from .camera_source import CameraSource
+    from .esp32_source import Esp32CamSource
+    from .file_source import FileSource
+    from .recording import FrameRecorder, RecordingSource
+
+    camera = camera_config.get('camera', {})
+    source = camera.get('source', 'laptop')
+
+    if source == 'laptop':
+        frame_source = CameraSource(camera.get('laptop', {}))
+    elif source == 'esp32cam':
+        frame_source = Esp32CamSource(camera.get('esp32cam', {}), max_scale)
+    elif source == 'file':
+        frame_source = FileSource(camera.get('file', {}))
+    elif source == 'recording':
+        frame_source = RecordingSource(camera.get('recording', {}))
+    else:
+        raise ValueError(f"Fuente de cámara '{source}' no soportada")
+
+    record_config = camera.get('record', {})
+    if record_config.get('enabled', False):
+        frame_source.recorder = FrameRecorder(
+            time.strftime(record_config.get('path', 'data/recordings/run_%Y%m%d_%H%M%S.bcvraw')),
+            record_config.get('max_frames', 3000),
+            {'source': source, 'decode_scale': frame_source.decode_scale,
+             'camera_config': camera_config})
+
+    return frame_source
@@ -0,0 +1,283 @@
+"""
+Grabación y reproducción de frames crudos (memoria mapeada)
+============================================
+
+DESCRIPCIÓN:
+    Un video .mp4 no sirve para comparar rendimiento entre versiones: la
+    decodificación cuesta tiempo y no siempre entrega exactamente los
+    mismos píxeles. Este módulo graba los frames TAL CUAL salieron de la
+    cámara a un archivo crudo preasignado, y los reproduce sin decodificar.
+
+    - FrameRecorder: lo usa FrameSource (camera.record en
+      camera_config.yaml) para copiar cada frame capturado al archivo
+    - RecordingSource: backend 'recording'; entrega cada frame como una
+      vista NumPy de solo lectura sobre el archivo mapeado (sin copias ni
+      decodificación), a su ritmo original o lo más rápido posible
+
+FORMATO (.bcvraw, little-endian):
+    [0, header_size)        cabecera
+        magic 'BCVRAW01', version, header_size, width, height,
+        channels, capacity, count, metadata_size (uint32),
+        metadata JSON: configuración de cámara, fuente, decode_scale
+    [timestamps_offset]     float64[capacity]: timestamp monotónico de
+                            captura de cada frame
+    [frames_offset]         uint8[capacity, height, width, channels]
+
+    Las secciones van alineadas a 4096 bytes (página). El archivo se
+    preasigna completo al grabar el primer frame; `count` se actualiza
+    DESPUÉS de copiar cada frame, así un corte de energía deja un archivo
+    válido con los frames completos.
+"""
+
+import json
+import os
+import struct
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import get_logger
+from .frame_source import FrameSource
+
+
+MAGIC = b'BCVRAW01'
+VERSION = 1
+
+# magic, version, header_size, width, height, channels, capacity, count, metadata_size
+_HEADER = struct.Struct('<8s8I')
+_COUNT_OFFSET = 8 + 6 * 4
+_PAGE = 4096
+
+
+def _align(offset: int) -> int:
+    """Redondea al siguiente múltiplo de página"""
+    return (offset + _PAGE - 1) // _PAGE * _PAGE
+
+
+def _layout(header_size: int, capacity: int, frame_bytes: int) -> Tuple[int, int, int]:
+    """Offsets de timestamps y frames, y tamaño total del archivo"""
+    timestamps_offset = header_size
+    frames_offset = _align(timestamps_offset + 8 * capacity)
+    return timestamps_offset, frames_offset, frames_offset + capacity * frame_bytes
+
+
+class FrameRecorder:
+    """Graba frames crudos en un archivo preasignado y mapeado en memoria"""
+
+    def __init__(self, path: str, capacity: int, metadata: Optional[Dict] = None):
+        """
+        Inicializa el grabador (el archivo se crea con el primer frame)
+
+        Args:
+            path: Ruta del archivo .bcvraw
+            capacity: Máximo de frames a grabar
+            metadata: Datos guardados en la cabecera (ej: configuración de cámara)
+        """
+        self.path = path
+        self.capacity = max(1, int(capacity))
+        self.metadata = metadata or {}
+        self.logger = get_logger('capture')
+
+        self.count = 0
+        self.skipped = 0
+        self.full = False
+        self.closed = False
+        self._map: Optional[np.memmap] = None
+        self._shape: Optional[Tuple[int, int, int]] = None
+        self._timestamps: Optional[np.ndarray] = None
+        self._frames: Optional[np.ndarray] = None
+        self._count: Optional[np.ndarray] = None
+
+    def write(self, frame: np.ndarray, timestamp: float) -> bool:
+        """
+        Copia un frame al archivo
+
+        Args:
+            frame: Imagen BGR (uint8)
+            timestamp: Tiempo monotónico de captura
+
+        Returns:
+            True si se grabó; False si el archivo está lleno o el frame
+            no coincide con la resolución grabada
+        """
+        if self.full or self.closed:
+            return False
+
+        if self._map is None:
+            self._create(frame)
+
+        if frame.shape != self._shape or frame.dtype != np.uint8:
+            self.skipped += 1
+            return False
+
+        self._frames[self.count] = frame
+        self._timestamps[self.count] = timestamp
+        self.count += 1
+        self._count[0] = self.count
+
+        if self.count == self.capacity:
+            self.full = True
+            self.logger.warning(f"Grabación llena ({self.capacity} frames): '{self.path}'")
+        return True
+
+    def close(self):
+        """Escribe a disco y cierra el archivo"""
+        self.closed = True
+        if self._map is None:
+            return
+        self._map.flush()
+        self.logger.info(f"Grabación cerrada: '{self.path}' ({self.count} frames)")
+        self._frames = self._timestamps = self._count = None
+        self._map = None
+
+    def _create(self, frame: np.ndarray):
+        """Preasigna el archivo con la resolución del primer frame"""
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        self._shape = frame.shape
+
+        metadata = dict(self.metadata, recorded_at=time.time())
+        metadata_bytes = json.dumps(metadata, default=str).encode('utf-8')
+        header_size = _align(_HEADER.size + len(metadata_bytes))
+        frame_bytes = height * width * channels
+        timestamps_offset, frames_offset, total = _layout(header_size, self.capacity, frame_bytes)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Reservar todo el espacio ya: la grabación no puede fallar a medias
+        # por disco lleno
+        with open(self.path, 'wb') as f:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(f.fileno(), 0, total)
+            else:
+                f.truncate(total)
+
+        self._map = np.memmap(self.path, dtype=np.uint8, mode='r+', shape=(total,))
+        self._map[:_HEADER.size] = np.frombuffer(_HEADER.pack(
+            MAGIC, VERSION, header_size, width, height, channels,
+            self.capacity, 0, len(metadata_bytes)), dtype=np.uint8)
+        self._map[_HEADER.size:_HEADER.size + len(metadata_bytes)] = np.frombuffer(
+            metadata_bytes, dtype=np.uint8)
+
+        self._count = self._map[_COUNT_OFFSET:_COUNT_OFFSET + 4].view('<u4')
+        self._timestamps = self._map[timestamps_offset:timestamps_offset + 8 * self.capacity].view('<f8')
+        self._frames = self._map[frames_offset:].reshape(self.capacity, *frame.shape)
+
+        self.logger.info(
+            f"Grabando frames {width}x{height} en '{self.path}' "
+            f"(hasta {self.capacity} frames, {total / 1e6:.0f} MB)")
+
+
+def open_recording(path: str) -> Tuple[np.ndarray, np.ndarray, Dict]:
+    """
+    Abre una grabación en solo lectura
+
+    Args:
+        path: Ruta del archivo .bcvraw
+
+    Returns:
+        (frames [count, h, w, c], timestamps [count], metadata), todo
+        vistas sobre el archivo mapeado
+    """
+    # asarray: vista ndarray simple sobre el mapeo (sin copia)
+    data = np.asarray(np.memmap(path, dtype=np.uint8, mode='r'))
+    if data.size < _HEADER.size:
+        raise RuntimeError(f"'{path}' no es una grabación válida")
+
+    (magic, version, header_size, width, height, channels,
+     capacity, count, metadata_size) = _HEADER.unpack(data[:_HEADER.size].tobytes())
+    if magic != MAGIC or version != VERSION:
+        raise RuntimeError(f"'{path}' no es una grabación válida (formato {magic!r} v{version})")
+
+    metadata = json.loads(data[_HEADER.size:_HEADER.size + metadata_size].tobytes())
+    frame_bytes = height * width * channels
+    timestamps_offset, frames_offset, _ = _layout(header_size, capacity, frame_bytes)
+
+    timestamps = data[timestamps_offset:timestamps_offset + 8 * count].view('<f8')
+    frames = data[frames_offset:frames_offset + count * frame_bytes]
+    shape = (count, height, width, channels) if channels > 1 else (count, height, width)
+    return frames.reshape(shape), timestamps, metadata
+
+
+class RecordingSource(FrameSource):
+    """Reproducción sin copias de una grabación .bcvraw"""
+
+    def __init__(self, config: dict):
+        """
+        Inicializa la fuente
+
+        Args:
+            config: Sección camera.recording de camera_config.yaml
+        """
+        super().__init__('recording')
+        self.path = config.get('path', '')
+        self.loop = config.get('loop', False)
+        self.realtime = config.get('realtime', True)
+        self.lockstep = not self.realtime
+
+        # Configuración de cámara con la que se grabó (de la cabecera)
+        self.metadata: Dict = {}
+
+        self._frames: Optional[np.ndarray] = None
+        self._timestamps: Optional[np.ndarray] = None
+        self._index = 0
+        self._start_time = 0.0
+
+        # decode_scale se necesita antes de start(): leer la cabecera ya
+        if self.path:
+            try:
+                self._load()
+            except RuntimeError:
+                pass
+
+    def _load(self):
+        """Mapea el archivo y toma la escala con la que se grabó"""
+        try:
+            frames, timestamps, metadata = open_recording(self.path)
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"No se pudo abrir la grabación '{self.path}' ({e})")
+        if len(frames) == 0:
+            raise RuntimeError(f"La grabación '{self.path}' no tiene frames")
+
+        self._frames = frames
+        self._timestamps = timestamps
+        self.metadata = metadata
+        self.decode_scale = metadata.get('decode_scale', 1.0)
+
+    def _open(self):
+        """Mapea el archivo (si no está mapeado) y reinicia la reproducción"""
+        if self._frames is None:
+            self._load()
+        self._index = 0
+        self._start_time = time.monotonic()
+
+    def _grab(self) -> Optional[Tuple[np.ndarray, float]]:
+        """Entrega el siguiente frame (esperando su turno original en modo realtime)"""
+        if self._index == len(self._frames):
+            if not self.loop:
+                return None
+            self._index = 0
+            self._start_time = time.monotonic()
+
+        if self.realtime:
+            offset = self._timestamps[self._index] - self._timestamps[0]
+            delay = self._start_time + offset - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        frame = self._frames[self._index]
+        self._index += 1
+        return frame, time.monotonic()
+
+    def _recover(self) -> bool:
+        """Fin de la grabación (sin loop): terminar la captura"""
+        self.logger.info(f"Fin de la grabación '{self.path}' ({self.sequence} frames)")
+        return False
+
+    def _close(self):
+        """Libera el mapeo del archivo"""
+        self._frames = None
+        self._timestamps = None
@@ -18,7 +18,7 @@ TAREAS:
 
 ENTRADA:
     - Latas detectadas (de can_detector)
-    - Frame HSV
+    - FrameContext del frame (máscara amarilla compartida)
 
 SALIDA:
     - Latas clasificadas:
@@ -29,7 +29,10 @@ SALIDA:
 
 import cv2
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+from processing.frame_context import FrameContext
+from utils.profiler import profiled
 
 
 class CanClassifier:
@@ -42,18 +45,22 @@ class CanClassifier:
         Args:
             config: Configuración con threshold de amarillo
         """
-        # TODO: Cargar threshold de píxeles amarillos
-        pass
+        can_config = config.get('can_detection', {})
+        
+        self.yellow_threshold = can_config.get('yellow_threshold', 0.15)
+        self.bottom_percentage = can_config.get('bottom_percentage', 0.25)
+        # La franja amarilla no entra en la máscara negra, así que el
+        # bounding box de la lata termina justo encima de ella: se extiende
+        # la ROI hacia abajo esta fracción de su altura.
+        self.stripe_extension = can_config.get('stripe_extension', 0.33)
     
-    def classify(self, can: Dict, frame: np.ndarray, 
-                 hsv_frame: np.ndarray) -> Dict:
+    def classify(self, can: Dict, ctx: FrameContext) -> Dict:
         """
         Clasifica una lata en orgánica o inorgánica
         
         Args:
             can: Diccionario con info de lata (de can_detector)
-            frame: Imagen BGR original
-            hsv_frame: Imagen en HSV
+            ctx: Contexto del frame (máscara amarilla compartida)
             
         Returns:
             Lata clasificada (modifica can dict):
@@ -65,36 +72,122 @@ class CanClassifier:
                 'confidence': nivel_de_confianza
             }
         """
-        # TODO: Implementar clasificación
-        # 1. Extraer ROI de la lata
-        # 2. Tomar región inferior (25%)
-        # 3. Contar píxeles amarillos
-        # 4. Decidir tipo basándose en threshold
-        pass
+        yellow_mask = ctx.mask('yellow')
+        
+        roi = self._extract_can_roi(can, yellow_mask)
+        bottom = self._get_bottom_region(roi, self.bottom_percentage)
+        yellow_ratio = self._count_yellow_pixels(bottom)
+        
+        return self.apply_yellow_ratio(can, yellow_ratio)
+    
+    @profiled('classification.cans')
+    def classify_batch(self, cans: List[Dict], ctx: FrameContext) -> List[Dict]:
+        """
+        Clasifica múltiples latas
+        
+        En lugar de recortar cada ROI y contar píxeles, usa la tabla de
+        áreas sumadas de la máscara amarilla (una por frame) y obtiene el
+        conteo de la región inferior de TODAS las latas con 4 lecturas
+        vectorizadas. El costo casi no depende del número de latas.
+        
+        Con preprocesamiento por regiones (ctx.regions) se cuenta en la
+        máscara amarilla de la región inferior ya preprocesada de cada lata.
+        """
+        if not cans:
+            return cans
+        
+        ratios = self._yellow_ratios(cans, ctx)
+        return [self.apply_yellow_ratio(can, float(ratio))
+                for can, ratio in zip(cans, ratios)]
+    
+    def _yellow_ratios(self, cans: List[Dict], ctx: FrameContext) -> np.ndarray:
+        """Ratio amarillo de la región inferior de cada lata (vectorizado)"""
+        boxes = np.array([can['bounding_box'] for can in cans], dtype=np.int64)
+        x, y, w, h = boxes.T
+        
+        # Mismos límites que _roi_bounds + _get_bottom_region
+        extension = np.round(h * self.stripe_extension).astype(np.int64)
+        x1 = np.clip(x, 0, ctx.width)
+        x2 = np.clip(x + w, 0, ctx.width)
+        y1 = np.clip(y, 0, ctx.height)
+        y2 = np.clip(y + h + extension, 0, ctx.height)
+        
+        roi_height = np.maximum(y2 - y1, 0)
+        bottom_rows = np.maximum(1, np.round(roi_height * self.bottom_percentage)).astype(np.int64)
+        top = np.maximum(y1, y2 - bottom_rows)
+        
+        areas = np.maximum(y2 - top, 0) * np.maximum(x2 - x1, 0)
+        
+        if ctx.regions is not None:
+            # Solo la franja inferior de cada lata se preprocesa
+            counts = np.zeros(len(cans), dtype=np.int64)
+            for i in np.flatnonzero(areas > 0):
+                region = (int(x1[i]), int(top[i]), int(x2[i] - x1[i]), int(y2[i] - top[i]))
+                counts[i] = cv2.countNonZero(ctx.region_mask('yellow', region, clean=False))
+        else:
+            integral = ctx.integral('yellow')
+            counts = (integral[y2, x2] - integral[top, x2]
+                      - integral[y2, x1] + integral[top, x1])
+        
+        ratios = np.zeros(len(cans), dtype=np.float64)
+        valid = areas > 0
+        ratios[valid] = counts[valid] / areas[valid]
+        return ratios
+    
+    def apply_yellow_ratio(self, can: Dict, yellow_ratio: float) -> Dict:
+        """
+        Escribe tipo, contenedor y confianza en el dict de la lata
+        
+        Args:
+            can: Diccionario de la lata
+            yellow_ratio: Ratio de amarillo medido (o acumulado por el tracker)
+            
+        Returns:
+            La misma lata con los campos de clasificación
+        """
+        can_type = self._decide_type(yellow_ratio)
+        
+        can['type'] = can_type
+        can['target_container'] = 'green' if can_type == 'organic' else 'red'
+        can['yellow_ratio'] = yellow_ratio
+        can['confidence'] = self._calculate_confidence(yellow_ratio)
+        return can
     
-    def classify_batch(self, cans: List[Dict], frame: np.ndarray,
-                       hsv_frame: np.ndarray) -> List[Dict]:
-        """Clasifica múltiples latas"""
-        # TODO: Aplicar classify() a cada lata
-        pass
+    def _roi_bounds(self, can: Dict, shape: Tuple[int, ...]) -> Tuple[int, int, int, int]:
+        """Límites (x1, y1, x2, y2) de la ROI extendida, recortados al frame"""
+        x, y, w, h = can['bounding_box']
+        extension = int(round(h * self.stripe_extension))
+        
+        x1 = min(max(0, x), shape[1])
+        y1 = min(max(0, y), shape[0])
+        x2 = min(max(x1, x + w), shape[1])
+        y2 = min(max(y1, y + h + extension), shape[0])
+        return x1, y1, x2, y2
     
     def _extract_can_roi(self, can: Dict, frame: np.ndarray) -> np.ndarray:
-        """Extrae región de interés de la lata"""
-        # TODO: Usar bounding_box para extraer región
-        pass
+        """Extrae región de interés de la lata (vista, sin copiar)"""
+        x1, y1, x2, y2 = self._roi_bounds(can, frame.shape)
+        return frame[y1:y2, x1:x2]
     
     def _get_bottom_region(self, roi: np.ndarray, percentage: float = 0.25) -> np.ndarray:
         """Obtiene el 25% inferior de la región"""
-        # TODO: Calcular y extraer porción inferior
-        pass
+        height = roi.shape[0]
+        start = height - max(1, int(round(height * percentage)))
+        return roi[max(0, start):]
     
-    def _count_yellow_pixels(self, region: np.ndarray, 
-                            hsv_region: np.ndarray) -> float:
-        """Cuenta ratio de píxeles amarillos en la región"""
-        # TODO: Máscara amarilla + countNonZero
-        pass
+    def _count_yellow_pixels(self, yellow_region: np.ndarray) -> float:
+        """Cuenta ratio de píxeles amarillos en la región (de la máscara amarilla)"""
+        if yellow_region.size == 0:
+            return 0.0
+        return cv2.countNonZero(yellow_region) / yellow_region.size
     
     def _decide_type(self, yellow_ratio: float) -> str:
         """Decide tipo basándose en cantidad de amarillo"""
-        # TODO: Comparar con threshold (ej: >15% = orgánica)
-        pass
+        return 'organic' if yellow_ratio >= self.yellow_threshold else 'inorganic'
+    
+    def _calculate_confidence(self, yellow_ratio: float) -> float:
+        """Confianza 0.5-1 según qué tan lejos está el ratio del threshold"""
+        if self.yellow_threshold <= 0:
+            return 1.0
+        margin = abs(yellow_ratio - self.yellow_threshold) / self.yellow_threshold
+        return 0.5 + 0.5 * min(1.0, margin)
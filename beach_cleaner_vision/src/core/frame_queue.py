@@ -0,0 +1,125 @@
+"""
+Cola de un solo espacio entre etapas del pipeline
+============================================
+
+DESCRIPCIÓN:
+    Une dos hilos del pipeline (captura → detección → publicación).
+    Solo guarda el elemento MÁS RECIENTE: si el consumidor va lento,
+    el dato viejo se descarta y se reemplaza por el nuevo.
+
+    Así la latencia captura→decisión queda acotada a ~1 frame por etapa,
+    en lugar de crecer cuando una etapa se atrasa (display congelado,
+    frame de detección lento, etc.).
+"""
+
+import threading
+import time
+from typing import Any, Optional
+
+
+class LatestQueue:
+    """Cola acotada de 1 elemento donde el dato más nuevo gana"""
+
+    def __init__(self, name: str = 'queue'):
+        """
+        Inicializa la cola
+
+        Args:
+            name: Nombre de la cola (para estadísticas/logs)
+        """
+        self.name = name
+        self._cond = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self._closed = False
+
+        # Estadísticas
+        self.put_count = 0
+        self.dropped_count = 0
+
+    def put(self, item: Any):
+        """
+        Publica un elemento, reemplazando el anterior si no fue consumido
+
+        Args:
+            item: Elemento a publicar
+        """
+        with self._cond:
+            if self._has_item:
+                # El consumidor no alcanzó a leerlo: dato viejo descartado
+                self.dropped_count += 1
+            self._item = item
+            self._has_item = True
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Obtiene el elemento más reciente (bloquea hasta que haya uno)
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos (None = infinito)
+
+        Returns:
+            Elemento más reciente, o None si expiró el timeout o la cola se cerró
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while not self._has_item and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            if not self._has_item:
+                return None
+
+            item = self._item
+            self._item = None
+            self._has_item = False
+            # Despertar a un productor que espera en wait_until_empty()
+            self._cond.notify_all()
+            return item
+
+    def wait_until_empty(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que el consumidor tome el elemento pendiente
+
+        Lo usan productores que NO deben descartar datos (ej: reproducir
+        un archivo lo más rápido posible para un benchmark).
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos (None = infinito)
+
+        Returns:
+            True si la cola quedó vacía, False si expiró el timeout o se cerró
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while self._has_item and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return not self._has_item
+
+    def close(self):
+        """Cierra la cola y despierta a los consumidores en espera"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        """True si la cola fue cerrada"""
+        return self._closed
+
+    def get_stats(self) -> dict:
+        """Estadísticas de la cola"""
+        return {
+            'name': self.name,
+            'put': self.put_count,
+            'dropped': self.dropped_count
+        }
@@ -0,0 +1,171 @@
+"""
+Gobernador adaptativo de resolución
+============================================
+
+DESCRIPCIÓN:
+    El costo por frame cambia mucho con la iluminación y el desorden de
+    la escena: un resize_factor fijo queda o muy lento o muy burdo.
+    ResolutionGovernor mide el tiempo de cada frame procesado y ajusta la
+    calidad en lazo cerrado para sostener performance.max_fps.
+
+    Escalera de calidad (nivel 0 = mejor):
+
+        0: resize_factor configurado + reducción de ruido
+        1: resize_factor configurado, sin reducción de ruido
+        2: resize_factor - step, sin reducción de ruido
+        ...
+        N: min_resize_factor, sin reducción de ruido
+
+    Quitar la reducción de ruido (filtering.denoise) va primero: es la
+    etapa más cara del preprocesamiento y la que menos afecta la detección.
+
+HISTÉRESIS:
+    - Baja un nivel si el promedio móvil del tiempo por frame supera
+      lower_ratio * (1/max_fps) durante `patience` frames seguidos
+    - Sube un nivel si queda por debajo de raise_ratio * (1/max_fps)
+      durante `patience` frames seguidos
+    - Tras cada cambio espera `cooldown` frames antes de evaluar otro
+    - Se recuerda el tiempo medido en cada nivel: no se sube a un nivel
+      que ya demostró no caber en el presupuesto, salvo que esa medición
+      tenga más de `memory` frames (la escena pudo cambiar)
+    raise_ratio < lower_ratio y la memoria por nivel evitan oscilar
+    entre dos niveles.
+"""
+
+from typing import Dict, List, Tuple
+
+from utils.logger import get_logger
+
+
+class ResolutionGovernor:
+    """Ajusta resolución de procesamiento y etapas opcionales según el FPS medido"""
+
+    def __init__(self, performance_config: dict = None):
+        """
+        Inicializa el gobernador
+
+        Args:
+            performance_config: Sección 'performance' de detection_config.yaml
+        """
+        performance_config = performance_config or {}
+        governor_config = performance_config.get('governor', {})
+        self.logger = get_logger('governor')
+
+        self.enabled = governor_config.get('enabled', True)
+        max_fps = performance_config.get('max_fps', 30)
+        self.target_time = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+
+        self.lower_ratio = governor_config.get('lower_ratio', 1.1)
+        self.raise_ratio = governor_config.get('raise_ratio', 0.6)
+        self.patience = max(1, governor_config.get('patience', 10))
+        self.cooldown = max(0, governor_config.get('cooldown', 30))
+        self.smoothing = governor_config.get('smoothing', 0.2)
+        self.memory = governor_config.get('memory', 300)
+
+        self.levels = self._build_levels(
+            performance_config.get('resize_factor', 1.0),
+            governor_config.get('min_resize_factor', 0.5),
+            governor_config.get('step', 0.25))
+        self.level = 0
+
+        self.frame_time = None
+        self._frame_count = 0
+        self._level_time: Dict[int, Tuple[float, int]] = {}
+        self._over = 0
+        self._under = 0
+        self._since_change = 0
+        self.changes = 0
+
+    @staticmethod
+    def _build_levels(resize_factor: float, min_factor: float,
+                      step: float) -> List[Tuple[float, bool]]:
+        """Escalera de (resize_factor, reducción de ruido) de mejor a peor calidad"""
+        levels = [(resize_factor, True), (resize_factor, False)]
+        factor = resize_factor - step
+        while step > 0 and factor >= min_factor - 1e-9:
+            levels.append((round(factor, 4), False))
+            factor -= step
+        return levels
+
+    @property
+    def resize_factor(self) -> float:
+        """Factor de redimensionamiento del nivel actual"""
+        return self.levels[self.level][0]
+
+    @property
+    def denoise(self) -> bool:
+        """True si el nivel actual aplica la reducción de ruido"""
+        return self.levels[self.level][1]
+
+    def update(self, frame_time: float) -> bool:
+        """
+        Registra el tiempo de un frame procesado y ajusta el nivel
+
+        Args:
+            frame_time: Segundos que tomó procesar el frame
+
+        Returns:
+            True si cambió el nivel (resolución o etapas)
+        """
+        self._frame_count += 1
+        if self.frame_time is None:
+            self.frame_time = frame_time
+        else:
+            self.frame_time = (self.smoothing * frame_time
+                               + (1 - self.smoothing) * self.frame_time)
+
+        if not self.enabled or self.target_time <= 0:
+            return False
+
+        self._since_change += 1
+        if self._since_change < self.cooldown:
+            return False
+
+        self._over = self._over + 1 if self.frame_time > self.lower_ratio * self.target_time else 0
+        self._under = self._under + 1 if self.frame_time < self.raise_ratio * self.target_time else 0
+
+        if self._over >= self.patience and self.level < len(self.levels) - 1:
+            return self._set_level(self.level + 1)
+        if self._under >= self.patience and self.level > 0 and self._fits(self.level - 1):
+            return self._set_level(self.level - 1)
+        return False
+
+    def _fits(self, level: int) -> bool:
+        """False si ese nivel se midió hace poco y excedía el presupuesto"""
+        measured = self._level_time.get(level)
+        if measured is None:
+            return True
+        frame_time, measured_at = measured
+        if self._frame_count - measured_at > self.memory:
+            return True
+        return frame_time <= self.lower_ratio * self.target_time
+
+    def _set_level(self, level: int) -> bool:
+        """Cambia de nivel, reinicia la histéresis y registra el cambio"""
+        previous = self.level
+        self._level_time[previous] = (self.frame_time, self._frame_count)
+        self.level = level
+        self.changes += 1
+
+        direction = "baja" if level > previous else "sube"
+        self.logger.info(
+            f"Calidad {direction} a nivel {level}: resize {self.resize_factor:.2f}, "
+            f"reducción de ruido {'sí' if self.denoise else 'no'} "
+            f"(frame {self.frame_time * 1000:.1f} ms, objetivo {self.target_time * 1000:.1f} ms)")
+
+        # El tiempo medido corresponde al nivel anterior: medir de nuevo
+        self.frame_time = None
+        self._over = 0
+        self._under = 0
+        self._since_change = 0
+        return True
+
+    def get_stats(self) -> Dict:
+        """Nivel actual, tiempo promedio por frame (ms) y cambios realizados"""
+        return {
+            'level': self.level,
+            'resize_factor': self.resize_factor,
+            'denoise': self.denoise,
+            'frame_time_ms': (self.frame_time or 0.0) * 1000,
+            'changes': self.changes
+        }
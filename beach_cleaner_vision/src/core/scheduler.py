@@ -0,0 +1,215 @@
+"""
+Planificador de cadencia por detector
+============================================
+
+DESCRIPCIÓN:
+    No todos los detectores necesitan correr en cada frame: el límite y
+    las latas cambian rápido, pero los contenedores y los obstáculos se
+    mueven poco entre frames. Cada detector tiene su cadencia
+    (performance.cadence en detection_config.yaml):
+
+        boundary: 1, cans: 1, containers: 3, obstacles: 5
+
+    En los frames en que un detector no toca, se reutiliza su último
+    resultado y se reporta su antigüedad (frames desde que se calculó).
+
+ASIGNACIÓN DE TURNOS:
+    Con cadencia N un detector puede correr en N turnos distintos (fase
+    0..N-1). La fase se elige a partir del costo MEDIDO de cada detector
+    (promedio móvil) para repartir la carga: el detector más caro elige
+    primero el turno con menos carga, y así sucesivamente. Así
+    containers y obstacles no coinciden en el mismo frame si eso
+    excede el presupuesto de 1/max_fps.
+
+    Además, si al llegar su turno el detector haría que el frame exceda
+    su presupuesto, un detector con cadencia > 1 se posterga al frame
+    siguiente (como máximo N - 1 veces seguidas, para no dejarlo sin
+    correr).
+
+FRAMES SALTADOS:
+    performance.skip_frames = N procesa 1 de cada N + 1 frames.
+"""
+
+import time
+from math import gcd
+from typing import Any, Callable, Dict, Optional
+
+from utils.logger import get_logger
+
+
+# Turnos máximos considerados al repartir fases (mcm de las cadencias)
+_MAX_HYPERPERIOD = 60
+
+
+class DetectorScheduler:
+    """Decide qué detectores corren en cada frame y guarda sus resultados"""
+
+    DEFAULT_CADENCE = {'boundary': 1, 'cans': 1, 'containers': 3, 'obstacles': 5}
+
+    def __init__(self, performance_config: dict = None):
+        """
+        Inicializa el planificador
+
+        Args:
+            performance_config: Sección 'performance' de detection_config.yaml
+        """
+        performance_config = performance_config or {}
+        self.logger = get_logger('scheduler')
+
+        self.skip_frames = max(0, performance_config.get('skip_frames', 0))
+        max_fps = performance_config.get('max_fps', 30)
+        self.frame_budget = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+        self.cost_smoothing = performance_config.get('cost_smoothing', 0.2)
+        self.rebalance_interval = max(1, performance_config.get('rebalance_interval', 30))
+
+        cadence = dict(self.DEFAULT_CADENCE)
+        cadence.update(performance_config.get('cadence', {}))
+        self.cadence: Dict[str, int] = {name: max(1, int(n)) for name, n in cadence.items()}
+        self.phase: Dict[str, int] = {name: 0 for name in self.cadence}
+
+        # Estado por detector
+        self.cost: Dict[str, float] = {}
+        self._results: Dict[str, Any] = {}
+        self._computed_at: Dict[str, int] = {}
+        self._deferred: Dict[str, int] = {}
+
+        # Estadísticas
+        self.runs: Dict[str, int] = {name: 0 for name in self.cadence}
+        self.deferrals: Dict[str, int] = {name: 0 for name in self.cadence}
+
+        self.frame_index = 0
+        self._frame_start = time.perf_counter()
+        self._incoming = 0
+
+    def should_process(self) -> bool:
+        """
+        Indica si el frame recibido debe procesarse (performance.skip_frames)
+
+        Se llama UNA vez por frame recibido, antes de begin_frame().
+        """
+        self._incoming += 1
+        return (self._incoming - 1) % (self.skip_frames + 1) == 0
+
+    def begin_frame(self):
+        """Marca el inicio de un frame procesado (para el presupuesto de tiempo)"""
+        self.frame_index += 1
+        self._frame_start = time.perf_counter()
+
+        if self.frame_index % self.rebalance_interval == 0:
+            self._rebalance()
+
+    def run(self, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Ejecuta un detector si le toca en este frame; si no, devuelve su
+        último resultado
+
+        Args:
+            name: Nombre del detector (clave de performance.cadence)
+            compute: Función que ejecuta el detector
+
+        Returns:
+            Resultado nuevo o el último calculado
+        """
+        if not self._is_due(name):
+            return self._results[name]
+
+        start = time.perf_counter()
+        result = compute()
+        elapsed = time.perf_counter() - start
+
+        previous = self.cost.get(name)
+        self.cost[name] = elapsed if previous is None else (
+            self.cost_smoothing * elapsed + (1 - self.cost_smoothing) * previous)
+
+        self._results[name] = result
+        self._computed_at[name] = self.frame_index
+        self._deferred[name] = 0
+        self.runs[name] = self.runs.get(name, 0) + 1
+        return result
+
+    def get_result(self, name: str) -> Optional[Any]:
+        """Último resultado guardado de un detector (None si nunca corrió)"""
+        return self._results.get(name)
+
+    def ages(self) -> Dict[str, int]:
+        """Frames desde que se calculó el resultado de cada detector (0 = este frame)"""
+        return {name: self.frame_index - computed
+                for name, computed in self._computed_at.items()}
+
+    def get_stats(self) -> Dict:
+        """Cadencia, fase, costo promedio (ms) y ejecuciones por detector"""
+        return {
+            name: {
+                'cadence': self.cadence[name],
+                'phase': self.phase.get(name, 0),
+                'cost_ms': self.cost.get(name, 0.0) * 1000,
+                'runs': self.runs.get(name, 0),
+                'deferrals': self.deferrals.get(name, 0)
+            }
+            for name in self.cadence
+        }
+
+    def reset(self):
+        """Olvida resultados guardados (el siguiente frame corre todo)"""
+        self._results = {}
+        self._computed_at = {}
+        self._deferred = {}
+
+    def _is_due(self, name: str) -> bool:
+        """True si el detector debe correr en el frame actual"""
+        if name not in self._results:
+            return True
+
+        cadence = self.cadence.setdefault(name, 1)
+        if cadence == 1:
+            return True
+
+        deferred = self._deferred.get(name, 0)
+        scheduled = (self.frame_index - self.phase.get(name, 0)) % cadence == 0
+        if not scheduled and deferred == 0:
+            return False
+
+        # Si ESTE detector haría que el frame exceda su presupuesto,
+        # postergarlo al siguiente (si el frame ya se pasó, no sirve de nada)
+        if self.frame_budget > 0 and deferred < cadence - 1:
+            elapsed = time.perf_counter() - self._frame_start
+            if elapsed <= self.frame_budget < elapsed + self.cost.get(name, 0.0):
+                self._deferred[name] = deferred + 1
+                self.deferrals[name] = self.deferrals.get(name, 0) + 1
+                return False
+
+        return True
+
+    def _rebalance(self):
+        """Reparte las fases según el costo medido de cada detector"""
+        periodic = {name: n for name, n in self.cadence.items() if n > 1}
+        if not periodic:
+            return
+
+        hyperperiod = 1
+        for n in periodic.values():
+            hyperperiod = min(hyperperiod * n // gcd(hyperperiod, n), _MAX_HYPERPERIOD)
+
+        # Los detectores de cada frame cargan todos los turnos por igual
+        every_frame = sum(self.cost.get(name, 0.0)
+                          for name, n in self.cadence.items() if n == 1)
+        load = [every_frame] * hyperperiod
+
+        new_phase = {}
+        for name in sorted(periodic, key=lambda k: self.cost.get(k, 0.0), reverse=True):
+            cadence = periodic[name]
+            cost = self.cost.get(name, 0.0)
+
+            def peak(phase: int) -> float:
+                return max(load[slot] for slot in range(phase, hyperperiod, cadence))
+
+            best = min(range(cadence), key=peak)
+            for slot in range(best, hyperperiod, cadence):
+                load[slot] += cost
+            new_phase[name] = best
+
+        if new_phase != {name: self.phase.get(name, 0) for name in new_phase}:
+            self.phase.update(new_phase)
+            over = " (excede presupuesto)" if self.frame_budget and max(load) > self.frame_budget else ""
+            self.logger.debug(
+                f"Fases reasignadas {new_phase}; carga máxima {max(load) * 1000:.1f} ms{over}")
@@ -0,0 +1,80 @@
+"""
+Planificador de ventanas de búsqueda
+============================================
+
+DESCRIPCIÓN:
+    Una vez que los objetos están siendo seguidos, no hace falta
+    escanear todo el frame en cada ciclo: basta buscar en una ventana
+    pequeña alrededor de la posición predicha por el tracker.
+
+    Cada frame el planificador decide entre:
+    - Escaneo COMPLETO: cada `full_scan_interval` frames, si no hay
+      tracks, o si algún track no se vio en el último frame (perdido)
+    - Ventanas: caja predicha + margen, una por track
+
+    Los escaneos completos periódicos son los que encuentran objetos
+    NUEVOS que entran en escena.
+
+SALIDA:
+    - None → escanear todo el frame
+    - {track_id: (x, y, w, h)} → ventanas de búsqueda
+"""
+
+from typing import Dict, Optional, Tuple
+
+from detection.tracker import ObjectTracker
+from utils.helpers import expand_region
+
+
+class SearchWindowPlanner:
+    """Decide si buscar en todo el frame o solo en ventanas predichas"""
+
+    def __init__(self, config: dict = None):
+        """
+        Inicializa el planificador
+
+        Args:
+            config: Sección 'search_windows' de detection_config.yaml
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.full_scan_interval = max(1, config.get('full_scan_interval', 10))
+        self.margin = config.get('margin', 0.5)
+        self.min_margin = config.get('min_margin', 20)
+
+        self.frames_since_full_scan = 0
+
+    def plan(self, tracker: ObjectTracker, frame_width: int,
+             frame_height: int) -> Optional[Dict[int, Tuple[int, int, int, int]]]:
+        """
+        Planifica la búsqueda del siguiente frame
+
+        Args:
+            tracker: Tracker con los objetos conocidos
+            frame_width: Ancho del frame
+            frame_height: Alto del frame
+
+        Returns:
+            None para escaneo completo, o ventanas por track_id
+        """
+        if self._needs_full_scan(tracker):
+            self.frames_since_full_scan = 0
+            return None
+
+        self.frames_since_full_scan += 1
+
+        windows = {}
+        for track_id, (x, y, w, h) in tracker.predicted_boxes().items():
+            margin = max(self.min_margin, self.margin * max(w, h))
+            windows[track_id] = expand_region((x, y, w, h), margin,
+                                              frame_width, frame_height)
+        return windows
+
+    def _needs_full_scan(self, tracker: ObjectTracker) -> bool:
+        """True si toca (o hace falta) escanear todo el frame"""
+        if not self.enabled or not tracker.tracks:
+            return True
+        if self.frames_since_full_scan + 1 >= self.full_scan_interval:
+            return True
+        # Un track que no se vio en el último frame se considera perdido
+        return any(track.misses > 0 for track in tracker.tracks.values())
@@ -0,0 +1,622 @@
+"""
+Pipeline de Visión (Captura → Detección → Publicación)
+============================================
+Responsable: [BRYAN - Integración]
+
+DESCRIPCIÓN:
+    Orquesta el sistema completo de visión en tres etapas, cada una en
+    su propio hilo:
+
+        [captura] --LatestQueue--> [detección] --LatestQueue--> [publicación]
+            |
+            +------LatestQueue--> [límite] (carril rápido)
+
+    - Captura: FrameSource (capture/) lee la cámara en su propio hilo y
+      publica cada frame en las colas del límite y de detección
+    - Detección: preprocesa y ejecuta todos los detectores + clasificador
+    - Publicación: entrega resultados a los consumidores (toma de
+      decisiones) y dibuja/muestra el display
+
+    Las colas son de UN solo espacio y el frame más nuevo gana: si una
+    etapa se atrasa, los frames viejos se descartan en lugar de
+    acumularse. La latencia captura→decisión queda acotada aunque el
+    display se congele o un frame de detección tarde más de lo normal.
+
+CARRIL RÁPIDO DEL LÍMITE:
+    Salir de la arena >5 s descalifica al robot, así que el límite no
+    espera detrás de latas ni obstáculos: cada frame capturado va también
+    a un hilo propio que evalúa SOLO la lona azul en una copia reducida
+    (boundary_fast_lane.pyramid_level) y entrega el estado de inmediato a
+    los callbacks de límite. Cada resultado tiene un plazo captura →
+    estado (deadline_ms); si se excede se cuenta y se emite una alerta.
+    La etapa de detección reutiliza el último estado del carril rápido en
+    lugar de volver a calcularlo.
+
+RESOLUCIÓN ADAPTATIVA:
+    ResolutionGovernor ajusta resize_factor y la reducción de ruido según el
+    tiempo medido por frame. Al cambiar la resolución, los detectores se
+    reconstruyen con sus umbrales en píxeles reescalados (ver
+    scale_pixel_config) y los trackers empiezan de cero. Las coordenadas
+    de los resultados están en la resolución de procesamiento
+    ('processing_scale' respecto a la resolución nativa de la cámara).
+    Si la fuente ya entrega frames reducidos (ESP32-CAM con decodificación
+    a 1/2 o 1/4, ver capture_scale), solo se reduce lo que falta.
+
+PREPROCESAMIENTO POR REGIONES:
+    Con filtering.lazy_preprocessing, CLAHE y reducción de ruido no se
+    aplican al frame completo: las máscaras de frame completo salen del
+    frame crudo y solo las regiones que piden los detectores (refinamiento
+    de latas, franja de clasificación, recortes de contenedores) se
+    preprocesan, una vez por frame (ver region_preprocessor).
+
+MEMORIA:
+    Con performance.buffer_pool, cada hilo (detección y límite) tiene su
+    BufferPool: resize, preprocesamiento, HSV, máscaras y morfología se
+    escriben en los mismos buffers frame tras frame (ver buffer_pool). Los
+    resultados publicados no guardan referencias a esos buffers.
+
+INSTRUMENTACIÓN:
+    Cada etapa y cada detector registran su duración en utils.profiler
+    (performance.profiling). El resumen p50/p99/máx sale periódicamente en
+    el log, en get_stats()['stages'] y en el overlay del display
+    (display.show_stages), para ver qué etapa bajó los FPS.
+
+SALIDA (por frame procesado):
+    {
+        'sequence': número de frame de captura,
+        'timestamp': tiempo monotónico de captura,
+        'cans': latas detectadas y clasificadas,
+        'containers': contenedores detectados,
+        'boundary': estado del límite (del carril rápido si está activo),
+        'obstacles': obstáculos detectados,
+        'detector_age': frames desde que se calculó cada resultado
+                        (los detectores con cadencia > 1 reutilizan el último),
+        'processing_scale': escala de las coordenadas respecto a la resolución nativa,
+        'latency': segundos desde publicación del frame hasta decisión
+                   (en lockstep no cuenta la espera a los consumidores)
+    }
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from core.frame_queue import LatestQueue
+from core.governor import ResolutionGovernor
+from core.scheduler import DetectorScheduler
+from core.search_planner import SearchWindowPlanner
+from capture.frame_source import FrameSource, create_frame_source
+from detection.can_detector import CanDetector
+from detection.container_detector import ContainerDetector
+from detection.boundary_detector import BoundaryDetector
+from detection.obstacle_detector import ObstacleDetector
+from detection.can_tracker import CanTracker
+from detection.tracker import ObjectTracker
+from classification.can_classifier import CanClassifier
+from processing.preprocessor import ImagePreprocessor
+from processing.region_preprocessor import RegionPreprocessor
+from processing.buffer_pool import BufferPool
+from processing.color_segmentation import ColorSegmentation
+from processing.color_lut import ColorLookupTable
+from processing.frame_context import FrameContext
+from utils.helpers import scale_pixel_config
+from utils.logger import get_logger, get_logging_stats
+from utils.profiler import profiled, profiler
+from utils.visualization import Visualizer
+
+
+class VisionPipeline:
+    """Pipeline de visión con etapas en hilos independientes"""
+
+    def __init__(self, camera_config: dict, detection_config: dict):
+        """
+        Inicializa el pipeline
+
+        Args:
+            camera_config: Configuración de cámara (camera_config.yaml)
+            detection_config: Configuración de detección (detection_config.yaml)
+        """
+        self.camera_config = camera_config
+        self.detection_config = detection_config
+        self.display_config = camera_config.get('display', {})
+
+        self.logger = get_logger('pipeline')
+
+        # Módulos de procesamiento
+        self.segmenter = ColorSegmentation(detection_config.get('colors', {}))
+        self.performance_config = detection_config.get('performance', {})
+
+        # Segmentación en una pasada BGR→colores (tabla compilada al iniciar)
+        self.color_lut = None
+        if self.performance_config.get('color_lookup_table', True):
+            self.color_lut = ColorLookupTable(detection_config.get('colors', {}))
+
+        self.fast_lane_config = detection_config.get('boundary_fast_lane', {})
+        self.fast_lane_enabled = self.fast_lane_config.get('enabled', True)
+        self.fast_lane_level = self.fast_lane_config.get('pyramid_level', 2)
+        self.boundary_deadline = self.fast_lane_config.get('deadline_ms', 20) / 1000.0
+
+        # Buffers reutilizados entre frames, uno por hilo (detección, límite)
+        self.buffer_pool = None
+        self.boundary_pool = None
+        if self.performance_config.get('buffer_pool', True):
+            self.buffer_pool = BufferPool()
+            self.boundary_pool = BufferPool()
+
+        # Cadencia por detector (contenedores y obstáculos no cada frame)
+        self.scheduler = DetectorScheduler(self.performance_config)
+
+        # Histogramas de latencia por etapa (utils.profiler)
+        profiler.configure(self.performance_config.get('profiling', {}))
+
+        # Resolución de procesamiento y etapas opcionales según FPS medido
+        self.governor = ResolutionGovernor(self.performance_config)
+        self._build_detectors(self.governor.resize_factor)
+
+        self.visualizer = Visualizer(
+            show_fps=self.display_config.get('show_fps', True),
+            show_labels=self.display_config.get('show_detections', True),
+            show_stages=self.display_config.get('show_stages', True) and profiler.enabled
+        )
+
+        # Colas de un solo espacio entre etapas
+        self.frame_queue = LatestQueue('frames')
+        self.result_queue = LatestQueue('results')
+        self.boundary_queue = LatestQueue('boundary')
+
+        self._callbacks: List[Callable[[Dict], None]] = []
+        self._boundary_callbacks: List[Callable[[Dict], None]] = []
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._source: Optional[FrameSource] = None
+        # Escala de los frames que entrega la fuente (< 1 = ya reducidos)
+        self.capture_scale = 1.0
+
+        self._latest_results: Optional[Dict] = None
+        self._latest_boundary: Optional[Dict] = None
+        self._results_lock = threading.Lock()
+
+        # Estadísticas
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.boundary_processed = 0
+        self.boundary_deadline_misses = 0
+        self._last_process_time = None
+
+    def _build_detectors(self, scale: float):
+        """
+        Crea detectores, trackers y planificadores para una resolución de
+        procesamiento (umbrales en píxeles reescalados)
+
+        Args:
+            scale: Factor de resolución respecto al frame capturado
+        """
+        config = scale_pixel_config(self.detection_config, scale)
+        self.processing_scale = scale
+
+        self.filtering_config = config.get('filtering', {})
+        self.preprocessor = ImagePreprocessor(self.filtering_config)
+        self.lazy_config = self.filtering_config.get('lazy_preprocessing', {})
+        self.can_detector = CanDetector(config)
+        self.container_detector = ContainerDetector(config)
+        self.boundary_detector = BoundaryDetector(config)
+        self.obstacle_detector = ObstacleDetector(config)
+        self.can_classifier = CanClassifier(config)
+        self.can_tracker = CanTracker(config, self.can_classifier)
+        self.container_tracker = ObjectTracker(config.get('tracking', {}))
+
+        # Ventanas de búsqueda alrededor de objetos seguidos
+        search_config = config.get('search_windows', {})
+        self.can_search = SearchWindowPlanner(search_config)
+        self.container_search = SearchWindowPlanner(search_config)
+
+        # Los resultados guardados están en la resolución anterior
+        self.scheduler.reset()
+
+        # Los buffers de la resolución anterior ya no sirven
+        if self.buffer_pool is not None:
+            self.buffer_pool.clear()
+
+        # El carril del límite lee todo junto (una sola asignación atómica)
+        self._boundary_lane = (self.boundary_detector, self.filtering_config, scale)
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def add_result_callback(self, callback: Callable[[Dict], None]):
+        """
+        Registra un consumidor de resultados (ej: toma de decisiones)
+
+        El callback se ejecuta en el hilo de publicación, nunca en el de
+        detección, así un consumidor lento no frena la visión.
+
+        Args:
+            callback: Función que recibe el diccionario de resultados
+        """
+        self._callbacks.append(callback)
+
+    def add_boundary_callback(self, callback: Callable[[Dict], None]):
+        """
+        Registra un consumidor del estado del límite (carril rápido)
+
+        Se ejecuta en el hilo del límite apenas se evalúa cada frame, sin
+        esperar al resto de detectores. Debe ser rápido (ej: fijar una
+        bandera de frenado); el trabajo pesado va en add_result_callback.
+
+        Args:
+            callback: Función que recibe el diccionario de estado del límite
+        """
+        self._boundary_callbacks.append(callback)
+
+    def start(self):
+        """Abre la cámara y arranca los hilos de captura y detección"""
+        self._source = create_frame_source(
+            self.camera_config, self.performance_config.get('resize_factor', 1.0))
+        self.capture_scale = self._source.decode_scale
+        # El límite primero: nunca espera a la etapa de detección
+        if self.fast_lane_enabled:
+            self._source.add_output(self.boundary_queue)
+        self._source.add_output(self.frame_queue)
+
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._process_loop, name='detection', daemon=True),
+        ]
+        if self.fast_lane_enabled:
+            self._threads.append(
+                threading.Thread(target=self._boundary_loop, name='boundary', daemon=True))
+        for thread in self._threads:
+            thread.start()
+        self._source.start()
+
+        lanes = "captura + límite + detección" if self.fast_lane_enabled else "captura + detección"
+        self.logger.info(f"Pipeline iniciado ({lanes})")
+
+    def stop(self):
+        """Detiene todos los hilos y libera la cámara"""
+        self._stop_event.set()
+        self.frame_queue.close()
+        self.result_queue.close()
+        self.boundary_queue.close()
+
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+        if self._source is not None:
+            self._source.stop()
+
+        if self.display_config.get('enabled', True):
+            cv2.destroyAllWindows()
+
+        self.logger.info(f"Pipeline detenido: {self.get_stats()}")
+
+    def run(self):
+        """
+        Ejecuta el pipeline hasta que se presione 'q' o se llame stop()
+
+        La etapa de publicación/display corre en el hilo que llama a run()
+        (HighGUI solo es confiable desde el hilo principal).
+        """
+        self.start()
+        try:
+            self._publish_loop()
+        except KeyboardInterrupt:
+            self.logger.info("Interrumpido por usuario")
+        finally:
+            self.stop()
+
+    @profiled('pipeline.process_frame')
+    def process_frame(self, frame: np.ndarray, boundary: Optional[Dict] = None) -> Dict:
+        """
+        Ejecuta preprocesamiento + detección + clasificación sobre un frame
+
+        Es la etapa de detección completa; se puede llamar directamente
+        (sin hilos) para pruebas o benchmarks.
+
+        Args:
+            frame: Imagen BGR
+            boundary: Estado del límite ya calculado por el carril rápido;
+                      None = calcularlo aquí a resolución de procesamiento
+
+        Returns:
+            Diccionario con resultados de todos los detectores
+        """
+        self.scheduler.begin_frame()
+
+        scale = self.processing_scale
+        resize = scale / self.capture_scale
+        if resize != 1.0:
+            with profiler.stage('pipeline.resize'):
+                shape = (round(frame.shape[0] * resize), round(frame.shape[1] * resize))
+                resized = self._pooled(shape + frame.shape[2:], frame.dtype, 'resized')
+                frame = cv2.resize(frame, None, dst=resized, fx=resize, fy=resize,
+                                   interpolation=cv2.INTER_AREA)
+        # Un contexto nuevo por frame: HSV, máscaras y contornos se
+        # calculan una sola vez y los comparten todos los detectores
+        ctx = self.frame_context(frame)
+
+        # Cada detector corre según su cadencia; si no le toca, se
+        # reutiliza su último resultado (ver DetectorScheduler)
+        # Un estado del carril rápido calculado a otra escala no sirve
+        if boundary is not None and boundary.get('processing_scale') != scale:
+            boundary = None
+        if boundary is None:
+            boundary = self.scheduler.run(
+                'boundary', lambda: self.boundary_detector.detect(ctx))
+        cans = self.scheduler.run('cans', lambda: self._detect_cans(ctx))
+        containers = self.scheduler.run('containers', lambda: self._detect_containers(ctx))
+        obstacles = self.scheduler.run(
+            'obstacles', lambda: self.obstacle_detector.detect(ctx))
+
+        return {
+            'cans': cans,
+            'containers': containers,
+            'boundary': boundary,
+            'obstacles': obstacles,
+            'detector_age': self.scheduler.ages(),
+            'processing_scale': scale
+        }
+
+    def frame_context(self, frame: np.ndarray) -> FrameContext:
+        """
+        Preprocesa un frame (ya a resolución de procesamiento) y arma su contexto
+
+        Con filtering.lazy_preprocessing el contexto usa el frame crudo y
+        preprocesa bajo demanda solo las regiones que piden los detectores.
+        """
+        if self.lazy_config.get('enabled', False):
+            regions = RegionPreprocessor(
+                self.preprocessor, frame, self.lazy_config,
+                reduce_noise=self.governor.denoise,
+                output=self._pooled(frame.shape, frame.dtype, 'processed'))
+            return FrameContext(frame, self.segmenter, self.filtering_config,
+                                self.color_lut, self.buffer_pool, regions)
+
+        processed = self.preprocessor.preprocess(
+            frame, reduce_noise=self.governor.denoise,
+            dst=self._pooled(frame.shape, frame.dtype, 'processed'))
+        return FrameContext(processed, self.segmenter, self.filtering_config,
+                            self.color_lut, self.buffer_pool)
+
+    def _pooled(self, shape: tuple, dtype, tag: str) -> Optional[np.ndarray]:
+        """Buffer del hilo de detección para `dst=` (None sin buffer_pool)"""
+        if self.buffer_pool is None:
+            return None
+        return self.buffer_pool.get(shape, dtype, tag)
+
+    def _detect_cans(self, ctx: FrameContext) -> List[Dict]:
+        """Detecta, sigue y clasifica latas"""
+        # IDs estables entre frames; solo se clasifican latas nuevas o dudosas.
+        # Con objetos conocidos se busca solo en ventanas predichas.
+        can_windows = self.can_search.plan(self.can_tracker, ctx.width, ctx.height)
+        if can_windows is not None:
+            can_windows = list(can_windows.values())
+        cans = self.can_tracker.update(self.can_detector.detect(ctx, can_windows))
+        return self.can_tracker.classify(cans, ctx)
+
+    def _detect_containers(self, ctx: FrameContext) -> List[Dict]:
+        """Detecta y sigue contenedores"""
+        container_windows = self.container_search.plan(
+            self.container_tracker, ctx.width, ctx.height)
+        if container_windows is not None:
+            container_windows = self._windows_by_color(container_windows)
+        return self.container_tracker.update(
+            self.container_detector.detect(ctx, container_windows))
+
+    def _windows_by_color(self, windows: Dict[int, tuple]) -> Dict[str, List[tuple]]:
+        """Agrupa las ventanas de contenedores por color del track"""
+        by_color: Dict[str, List[tuple]] = {}
+        for track_id, region in windows.items():
+            color = self.container_tracker.tracks[track_id].detection['color']
+            by_color.setdefault(color, []).append(region)
+        return by_color
+
+    @profiled('pipeline.boundary_lane')
+    def process_boundary(self, frame: np.ndarray) -> Dict:
+        """
+        Evalúa solo el límite sobre una copia reducida del frame
+
+        Es el trabajo del carril rápido: sin preprocesamiento y a
+        1/2^pyramid_level de resolución. Umbrales, regiones y distancia
+        se reportan en píxeles de la resolución de procesamiento.
+
+        Args:
+            frame: Imagen BGR tal como se capturó
+
+        Returns:
+            Estado del límite (ver BoundaryDetector.detect)
+        """
+        detector, filtering_config, scale = self._boundary_lane
+        ctx = FrameContext(frame, self.segmenter, filtering_config,
+                           self.color_lut, self.boundary_pool).downscaled(self.fast_lane_level)
+        processing_width = frame.shape[1] * scale / self.capture_scale
+        boundary = detector.detect(ctx, scale=processing_width / ctx.width)
+        boundary['processing_scale'] = scale
+        return boundary
+
+    def get_latest_results(self) -> Optional[Dict]:
+        """Devuelve los últimos resultados publicados (thread-safe)"""
+        with self._results_lock:
+            return self._latest_results
+
+    def get_latest_boundary(self) -> Optional[Dict]:
+        """Devuelve el último estado del límite del carril rápido (thread-safe)"""
+        with self._results_lock:
+            return self._latest_boundary
+
+    def get_stats(self) -> Dict:
+        """Estadísticas de captura, procesamiento, frames descartados y logging"""
+        return {
+            'captured': self._source.sequence if self._source is not None else 0,
+            'processed': self.frames_processed,
+            'dropped_before_detection': self.frame_queue.dropped_count,
+            'dropped_before_publish': self.result_queue.dropped_count,
+            'boundary_processed': self.boundary_processed,
+            'dropped_before_boundary': self.boundary_queue.dropped_count,
+            'boundary_deadline_misses': self.boundary_deadline_misses,
+            'skipped_by_schedule': self.frames_skipped,
+            'detectors': self.scheduler.get_stats(),
+            'governor': self.governor.get_stats(),
+            'stages': profiler.get_stats(),
+            'buffers': self.buffer_pool.get_stats() if self.buffer_pool is not None else None,
+            'logging': get_logging_stats()
+        }
+
+    # ------------------------------------------------------------------
+    # Etapas
+    # ------------------------------------------------------------------
+
+    def _boundary_loop(self):
+        """Hilo del límite: estado de la lona azul para cada frame capturado"""
+        while not self._stop_event.is_set():
+            packet = self.boundary_queue.get(timeout=0.5)
+            if packet is None:
+                if self.boundary_queue.closed:
+                    break
+                continue
+
+            try:
+                boundary = self.process_boundary(packet['frame'])
+            except Exception as e:
+                self.logger.error(f"Error evaluando límite en frame {packet['sequence']}: {e}")
+                continue
+
+            latency = time.monotonic() - packet['published']
+            profiler.record('pipeline.boundary_latency', latency * 1000.0)
+            boundary['sequence'] = packet['sequence']
+            boundary['timestamp'] = packet['timestamp']
+            boundary['latency'] = latency
+            boundary['deadline_missed'] = latency > self.boundary_deadline
+
+            self.boundary_processed += 1
+            if boundary['deadline_missed']:
+                self.boundary_deadline_misses += 1
+                self.logger.warning(
+                    f"Límite fuera de plazo en frame {packet['sequence']}: "
+                    f"{latency * 1000:.1f} ms > {self.boundary_deadline * 1000:.0f} ms "
+                    f"({self.boundary_deadline_misses} en total)")
+
+            with self._results_lock:
+                self._latest_boundary = boundary
+
+            for callback in self._boundary_callbacks:
+                try:
+                    callback(boundary)
+                except Exception as e:
+                    self.logger.error(f"Error en callback de límite: {e}")
+
+    def _process_loop(self):
+        """Hilo de detección: procesa solo el frame más nuevo disponible"""
+        while not self._stop_event.is_set():
+            packet = self.frame_queue.get(timeout=0.5)
+            if packet is None:
+                if self.frame_queue.closed:
+                    break
+                continue
+
+            # performance.skip_frames: el carril del límite igual ve todos
+            if not self.scheduler.should_process():
+                self.frames_skipped += 1
+                continue
+
+            boundary = self.get_latest_boundary() if self.fast_lane_enabled else None
+
+            start = time.monotonic()
+            try:
+                results = self.process_frame(packet['frame'], boundary)
+            except Exception as e:
+                self.logger.error(f"Error procesando frame {packet['sequence']}: {e}")
+                continue
+
+            now = time.monotonic()
+
+            # Lazo cerrado: ajustar calidad para sostener max_fps
+            if (self.governor.update(now - start)
+                    and self.governor.resize_factor != self.processing_scale):
+                self._build_detectors(self.governor.resize_factor)
+
+            results['sequence'] = packet['sequence']
+            results['timestamp'] = packet['timestamp']
+            results['latency'] = now - packet['published']
+            profiler.record('pipeline.latency', results['latency'] * 1000.0)
+            results['frame'] = packet['frame']
+
+            if self._last_process_time is not None:
+                dt = now - self._last_process_time
+                if dt > 0:
+                    self.visualizer.update_fps(1.0 / dt)
+            self._last_process_time = now
+
+            self.frames_processed += 1
+            profiler.maybe_report()
+            # Fuente sin descartes (benchmark): tampoco descartar resultados
+            if self._source is not None and self._source.lockstep:
+                self.result_queue.wait_until_empty()
+            self.result_queue.put(results)
+
+        # Fuente terminada: la publicación sale tras el último resultado
+        self.result_queue.close()
+
+    def _publish_loop(self):
+        """Etapa de publicación: entrega resultados y actualiza display"""
+        display_enabled = self.display_config.get('enabled', True)
+        window_name = self.display_config.get('window_name', 'Beach Cleaner Vision')
+        scale = self.display_config.get('scale', 1.0)
+
+        while not self._stop_event.is_set():
+            results = self.result_queue.get(timeout=0.05)
+
+            if results is not None:
+                with self._results_lock:
+                    self._latest_results = results
+
+                with profiler.stage('pipeline.callbacks'):
+                    for callback in self._callbacks:
+                        try:
+                            callback(results)
+                        except Exception as e:
+                            self.logger.error(f"Error en callback de resultados: {e}")
+
+                if display_enabled:
+                    with profiler.stage('pipeline.display'):
+                        self._show(results, window_name, scale)
+
+            if display_enabled and cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+            # Fuente terminada y último resultado ya publicado
+            if results is None and self.result_queue.closed:
+                break
+
+    def _show(self, results: Dict, window_name: str, scale: float):
+        """Dibuja detecciones sobre el frame y lo muestra"""
+        detections = {
+            'cans': results.get('cans', []),
+            'containers': results.get('containers', []),
+            'obstacles': results.get('obstacles', [])
+        }
+        boundary = results.get('boundary')
+        if boundary and boundary.get('boundary_regions'):
+            detections['boundaries'] = [
+                {'region': region} for region in boundary['boundary_regions']
+            ]
+
+        # Las coordenadas están en la resolución de procesamiento
+        frame = results['frame']
+        resize = results.get('processing_scale', 1.0) / self.capture_scale
+        if resize != 1.0:
+            frame = cv2.resize(frame, None, fx=resize, fy=resize,
+                               interpolation=cv2.INTER_AREA)
+
+        if self.visualizer.show_stages:
+            self.visualizer.update_stage_stats(profiler.get_stats())
+        vis_image = self.visualizer.draw_detections(frame, detections)
+        if scale != 1.0:
+            vis_image = cv2.resize(vis_image, None, fx=scale, fy=scale)
+
+        cv2.imshow(window_name, vis_image)
@@ -7,6 +7,15 @@ DESCRIPCIÓN:
     Detecta el límite entre la arena y la lona azul (mar).
     CRÍTICO: Robot pierde puntos si sale >5 segundos de la arena.
 
+MAPA DE OCUPACIÓN:
+    El frame se divide en una grilla (grid_cols x grid_rows, ej: 16x12)
+    y la fracción de azul de cada celda sale de UNA imagen integral de
+    la máscara azul (4 lecturas por celda, todo vectorizado):
+    - distance_to_boundary: fila de celdas ocupada más cercana al robot
+      (refinada a la fila de píxeles más baja con azul dentro de ella)
+    - safe_direction: suma de vectores robot → celda ponderada por
+      ocupación y cercanía; la dirección segura es la opuesta
+
 TAREAS:
     - Detectar lona azul en los bordes del frame
     - Crear zona de advertencia antes del límite
@@ -14,7 +23,7 @@ TAREAS:
     - Sugerir dirección segura para no salir
 
 ENTRADA:
-    - Frame de cámara
+    - FrameContext del frame (máscara azul compartida)
     - Configuración de color azul
 
 SALIDA:
@@ -30,7 +39,10 @@ PRIORIDAD: CRÍTICA ⚠️⚠️⚠️ (puede descalificar al robot)
 
 import cv2
 import numpy as np
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, Optional
+
+from processing.frame_context import FrameContext
+from utils.profiler import profiled
 
 
 class BoundaryDetector:
@@ -43,46 +55,151 @@ class BoundaryDetector:
         Args:
             config: Configuración de detección
         """
-        # TODO: Cargar umbrales y zonas de advertencia
-        pass
+        boundary_config = config.get('boundary_detection', {})
+        
+        self.edge_threshold = boundary_config.get('edge_threshold', 100)
+        self.blue_ratio_threshold = boundary_config.get('blue_ratio_threshold', 0.3)
+        self.warning_distance = boundary_config.get('warning_distance', 150)
+        self.min_blue_ratio = boundary_config.get('min_blue_ratio', 0.005)
+        self.min_region_area = boundary_config.get('min_region_area', 500)
+        
+        # Mapa de ocupación de azul por celdas
+        self.grid_cols = boundary_config.get('grid_cols', 16)
+        self.grid_rows = boundary_config.get('grid_rows', 12)
+        self.min_cell_occupancy = boundary_config.get('min_cell_occupancy', 0.05)
     
-    def detect(self, frame: np.ndarray, hsv_frame: np.ndarray) -> Dict:
+    @profiled('detection.boundary')
+    def detect(self, ctx: FrameContext, scale: float = 1.0) -> Dict:
         """
         Detecta límites y determina si hay peligro
         
         Args:
-            frame: Imagen BGR
-            hsv_frame: Imagen HSV
+            ctx: Contexto del frame (máscara azul compartida)
+            scale: Píxeles del frame original por píxel de ctx (ej: 4 si
+                   ctx es un frame reducido a 1/4). Umbrales, regiones y
+                   distancia siempre se expresan en píxeles del original.
             
         Returns:
             Diccionario con información del límite:
             {
                 'status': 'safe' | 'warning' | 'danger',
                 'blue_ratio': porcentaje_de_azul_en_frame,
-                'boundary_regions': lista_de_regiones_azules,
-                'safe_direction': ángulo_para_alejarse (si hay peligro),
-                'distance_to_boundary': distancia_estimada_en_píxeles
+                'boundary_regions': lista_de_regiones_azules (x, y, w, h),
+                'safe_direction': ángulo_para_alejarse (None si es seguro),
+                'distance_to_boundary': distancia_estimada_en_píxeles (None si no hay azul),
+                'occupancy_grid': fracción de azul por celda (grid_rows x grid_cols)
             }
         """
-        # TODO: Implementar detección
-        # 1. Crear máscara de color azul
-        # 2. Analizar posición del azul en el frame
-        # 3. Determinar nivel de peligro
-        # 4. Calcular dirección segura
-        pass
+        integral = ctx.integral('blue', clean=True)
+        blue_ratio = float(integral[-1, -1]) / ctx.total_pixels
+        grid, row_edges, col_edges = self._occupancy_grid(integral)
+        
+        min_region_area = self.min_region_area / (scale * scale)
+        boundary_regions = [
+            tuple(int(round(v * scale)) for v in cv2.boundingRect(contour))
+            for contour in ctx.contours('blue')
+            if cv2.contourArea(contour) >= min_region_area
+        ]
+        
+        if blue_ratio < self.min_blue_ratio:
+            return {
+                'status': 'safe',
+                'blue_ratio': blue_ratio,
+                'boundary_regions': boundary_regions,
+                'safe_direction': None,
+                'distance_to_boundary': None,
+                'occupancy_grid': grid
+            }
+        
+        status, distance = self._analyze_boundary_position(
+            integral, grid, row_edges, blue_ratio, scale)
+        safe_direction = None
+        if status != 'safe':
+            safe_direction = self._calculate_safe_direction(grid, row_edges, col_edges)
+        
+        return {
+            'status': status,
+            'blue_ratio': blue_ratio,
+            'boundary_regions': boundary_regions,
+            'safe_direction': safe_direction,
+            'distance_to_boundary': distance,
+            'occupancy_grid': grid
+        }
     
-    def _create_blue_mask(self, hsv_frame: np.ndarray) -> np.ndarray:
+    def _create_blue_mask(self, ctx: FrameContext) -> np.ndarray:
         """Crea máscara del color azul (mar)"""
-        # TODO: cv2.inRange con rango de azul
-        pass
+        return ctx.clean_mask('blue')
+    
+    def _occupancy_grid(self, integral: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Fracción de azul por celda a partir de la imagen integral
+        
+        Returns:
+            (grid, row_edges, col_edges): grilla float32 de
+            grid_rows x grid_cols y los bordes en píxeles de filas/columnas
+        """
+        height, width = integral.shape[0] - 1, integral.shape[1] - 1
+        row_edges = np.linspace(0, height, min(self.grid_rows, height) + 1).astype(np.intp)
+        col_edges = np.linspace(0, width, min(self.grid_cols, width) + 1).astype(np.intp)
+        
+        # Suma de cada celda: S[y2, x2] - S[y1, x2] - S[y2, x1] + S[y1, x1]
+        corners = integral[np.ix_(row_edges, col_edges)].astype(np.float64)
+        counts = corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+        areas = np.outer(np.diff(row_edges), np.diff(col_edges))
+        
+        return (counts / areas).astype(np.float32), row_edges, col_edges
     
-    def _analyze_boundary_position(self, mask: np.ndarray) -> str:
-        """Analiza dónde está el azul y determina peligro"""
-        # TODO: Dividir frame en regiones, ver dónde hay más azul
-        # Abajo = OK, arriba/lados = DANGER
-        pass
+    def _analyze_boundary_position(self, integral: np.ndarray, grid: np.ndarray,
+                                   row_edges: np.ndarray, blue_ratio: float,
+                                   scale: float = 1.0) -> Tuple[str, Optional[int]]:
+        """
+        Analiza dónde está el azul y determina peligro
+        
+        La parte inferior del frame es lo más cercano al robot: la distancia
+        al límite es la cantidad de filas entre el borde inferior y la fila
+        azul más baja, dentro de la fila de celdas ocupada más cercana
+        (celdas con menos de min_cell_occupancy se ignoran como ruido).
+        """
+        row_occupancy = grid.max(axis=1)
+        occupied_rows = np.flatnonzero((row_occupancy >= self.min_cell_occupancy)
+                                       & (row_occupancy > 0))
+        if occupied_rows.size == 0:
+            return 'safe', None
+        
+        # Píxeles azules por fila (columna final de la integral) dentro
+        # de la fila de celdas más cercana
+        nearest = occupied_rows[-1]
+        top, bottom = row_edges[nearest], row_edges[nearest + 1]
+        row_counts = np.diff(integral[top:bottom + 1, -1])
+        lowest = top + np.flatnonzero(row_counts)[-1]
+        
+        height = integral.shape[0] - 1
+        distance = int(round((height - 1 - lowest) * scale))
+        
+        if distance <= self.edge_threshold or blue_ratio >= self.blue_ratio_threshold:
+            return 'danger', distance
+        if distance <= self.edge_threshold + self.warning_distance:
+            return 'warning', distance
+        return 'safe', distance
     
-    def _calculate_safe_direction(self, blue_regions: List) -> float:
+    def _calculate_safe_direction(self, grid: np.ndarray, row_edges: np.ndarray,
+                                  col_edges: np.ndarray) -> float:
         """Calcula ángulo hacia donde debe moverse para alejarse del mar"""
-        # TODO: Vector opuesto a la concentración de azul
-        pass
+        height, width = row_edges[-1], col_edges[-1]
+        
+        # Vectores robot (centro inferior) -> centro de cada celda
+        dx = (col_edges[:-1] + col_edges[1:]) / 2 - width / 2
+        dy = height - (row_edges[:-1] + row_edges[1:]) / 2
+        dx, dy = np.meshgrid(dx, dy)
+        
+        # Peso = ocupación / distancia: el azul cercano empuja más
+        weights = grid / np.maximum(np.hypot(dx, dy), 1.0)
+        total = weights.sum()
+        if total <= 0:
+            return 0.0
+        
+        push_x = (weights * dx).sum() / total
+        push_y = (weights * dy).sum() / total
+        
+        # Dirección opuesta (grados, 0 = al frente, positivo = derecha)
+        return float(np.degrees(np.arctan2(-push_x, -push_y)))
@@ -7,14 +7,20 @@ DESCRIPCIÓN:
     Detecta latas negras y latas con franja amarilla en la imagen.
     Usa segmentación de color HSV y análisis de contornos.
 
+    Modo coarse-to-fine (can_detection.pyramid_level > 0): los candidatos
+    se buscan en una máscara reducida 1/2 o 1/4 (umbrales de área
+    reescalados al nivel) y la verificación de forma y la distancia se
+    calculan a resolución completa SOLO en recortes pequeños alrededor de
+    cada candidato.
+
 TAREAS:
     - Detectar latas negras usando máscara HSV
     - Filtrar por forma circular/rectangular
     - Estimar posición y distancia
-    - Marcar latas ya detectadas para no repetir
+    - Marcar latas ya detectadas para no repetir (ver can_tracker.py)
 
 ENTRADA:
-    - Frame de cámara (BGR)
+    - FrameContext del frame (máscaras y contornos compartidos)
     - Configuración de detección
 
 SALIDA:
@@ -27,9 +33,17 @@ SALIDA:
 PRIORIDAD: ALTA ⭐⭐⭐ (15-20 puntos dependen de esto)
 """
 
-import cv2
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+from processing.blob_features import BlobFeatureExtractor
+from processing.frame_context import FrameContext
+from utils.helpers import expand_region, merge_regions
+from utils.profiler import profiled
+
+
+# Diámetro real de una lata estándar (cm)
+CAN_DIAMETER_CM = 6.6
 
 
 class CanDetector:
@@ -42,16 +56,31 @@ class CanDetector:
         Args:
             config: Configuración de detección (detection_config.yaml)
         """
-        # TODO: Cargar parámetros de configuración
-        pass
+        can_config = config.get('can_detection', {})
+        
+        self.min_area = can_config.get('min_area', 200)
+        self.max_area = can_config.get('max_area', 15000)
+        self.min_circularity = can_config.get('min_circularity', 0.4)
+        self.max_circularity = can_config.get('max_circularity', 1.0)
+        self.aspect_ratio_min = can_config.get('aspect_ratio_min', 0.3)
+        self.aspect_ratio_max = can_config.get('aspect_ratio_max', 3.0)
+        
+        # Coarse-to-fine: nivel de pirámide para buscar candidatos
+        self.pyramid_level = can_config.get('pyramid_level', 0)
+        self.coarse_area_slack = can_config.get('coarse_area_slack', 0.5)
+        self.refine_margin = can_config.get('refine_margin', 0.5)
+        
+        self.focal_length = config.get('camera_model', {}).get('focal_length_px', 550)
     
-    def detect(self, frame: np.ndarray, hsv_frame: np.ndarray) -> List[Dict]:
+    @profiled('detection.cans')
+    def detect(self, ctx: FrameContext,
+               search_regions: Optional[List[Tuple[int, int, int, int]]] = None) -> List[Dict]:
         """
         Detecta todas las latas en el frame
         
         Args:
-            frame: Imagen BGR original
-            hsv_frame: Imagen convertida a HSV
+            ctx: Contexto del frame (máscaras y contornos compartidos)
+            search_regions: Ventanas (x, y, w, h) donde buscar; None = frame completo
             
         Returns:
             Lista de diccionarios con información de cada lata:
@@ -62,30 +91,81 @@ class CanDetector:
                     'area': área_en_píxeles,
                     'bounding_box': (x, y, w, h),
                     'type': 'unknown',  # Se clasificará después
-                    'distance': distancia_estimada
+                    'distance': distancia_estimada (cm)
                 },
                 ...
             ]
         """
-        # TODO: Implementar detección
-        # 1. Crear máscara de color negro
-        # 2. Aplicar operaciones morfológicas
-        # 3. Encontrar contornos
-        # 4. Filtrar por área y forma
-        # 5. Extraer características de cada lata
-        pass
+        # Blobs de la máscara negra limpia (compartidos vía FrameContext):
+        # área, caja y circularidad de todos los blobs en arreglos NumPy
+        if search_regions is None and self.pyramid_level > 0:
+            search_regions = self._find_coarse_candidates(ctx)
+
+        if search_regions is None:
+            blob_sets = [ctx.blobs('black', None, self.min_area, self.max_area)]
+        else:
+            blob_sets = [ctx.blobs('black', region, self.min_area, self.max_area)
+                         for region in merge_regions(search_regions)]
+        
+        cans = []
+        for blobs in blob_sets:
+            for index in np.flatnonzero(self._filter_by_shape(blobs)):
+                x, y, w, h = (int(v) for v in blobs['bbox'][index])
+                cx, cy = blobs['centroid'][index]
+                radius = int(round(max(w, h) / 2))
+                cans.append({
+                    'center': (int(round(cx)), int(round(cy))),
+                    'radius': radius,
+                    'area': float(blobs['area'][index]),
+                    'bounding_box': (x, y, w, h),
+                    'type': 'unknown',
+                    'distance': self._estimate_distance(radius)
+                })
+        
+        return cans
+    
+    def _find_coarse_candidates(self, ctx: FrameContext) -> List[Tuple[int, int, int, int]]:
+        """
+        Busca blobs negros en el frame reducido y devuelve las regiones a
+        refinar a resolución completa
+        """
+        scale = 2 ** self.pyramid_level
+        coarse = ctx.downscaled(self.pyramid_level)
+        
+        # Umbrales de área reescalados al nivel (con holgura: al reducir
+        # el frame las latas pequeñas pierden píxeles en el borde)
+        area_scale = 1.0 / (scale * scale)
+        min_area = self.min_area * area_scale * self.coarse_area_slack
+        max_area = self.max_area * area_scale / self.coarse_area_slack
+        
+        blobs = coarse.blobs('black', shape=False)
+        candidates = BlobFeatureExtractor.select(blobs, min_area, max_area)
+        
+        regions = []
+        for x, y, w, h in blobs['bbox'][candidates]:
+            margin = scale * (1 + self.refine_margin * max(w, h))
+            regions.append(expand_region((x * scale, y * scale, w * scale, h * scale),
+                                         margin, ctx.width, ctx.height))
+        
+        return regions
     
-    def _create_black_mask(self, hsv_frame: np.ndarray) -> np.ndarray:
+    def _create_black_mask(self, ctx: FrameContext) -> np.ndarray:
         """Crea máscara de objetos negros"""
-        # TODO: Usar cv2.inRange con rangos HSV del negro
-        pass
+        return ctx.clean_mask('black')
     
-    def _filter_by_shape(self, contours: List) -> List:
-        """Filtra contornos que parezcan latas (circulares o rectangulares)"""
-        # TODO: Verificar circularidad y aspect ratio
-        pass
+    def _filter_by_shape(self, blobs: Dict[str, np.ndarray]) -> np.ndarray:
+        """Filtra blobs que parezcan latas (circulares o rectangulares)"""
+        return BlobFeatureExtractor.select(
+            blobs,
+            min_area=self.min_area, max_area=self.max_area,
+            min_circularity=self.min_circularity,
+            max_circularity=self.max_circularity,
+            aspect_ratio_min=self.aspect_ratio_min,
+            aspect_ratio_max=self.aspect_ratio_max)
     
     def _estimate_distance(self, radius: int) -> float:
         """Estima distancia a la lata basándose en su tamaño en imagen"""
-        # TODO: Usar tamaño conocido de lata (6.6cm) para calcular distancia
-        pass
+        # Modelo pinhole: distancia = tamaño_real * focal / tamaño_en_imagen
+        if radius <= 0:
+            return 0.0
+        return CAN_DIAMETER_CM * self.focal_length / (2 * radius)
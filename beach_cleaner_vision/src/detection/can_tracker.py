@@ -0,0 +1,106 @@
+"""
+Seguimiento y votación temporal de latas
+============================================
+Responsable: [PERSONA 1 - Complementa detección]
+
+DESCRIPCIÓN:
+    Marca las latas ya detectadas para no repetirlas: cada lata recibe
+    un ID estable mientras siga a la vista (ver ObjectTracker).
+
+    Además guarda la clasificación por track:
+    - El clasificador SOLO corre si el track es nuevo o su confianza
+      todavía es baja
+    - Cada clasificación suma su yellow_ratio a la evidencia del track;
+      la decisión se toma con el promedio acumulado (votación temporal)
+    - Con confianza suficiente, la lata reutiliza la clasificación del
+      track sin volver a medir
+
+    ⚠️ Separar mal = -5 puntos: promediar varios frames reduce errores por
+    reflejos o una franja parcialmente tapada en un solo frame.
+
+SALIDA:
+    - Latas con track_id + campos de clasificación de CanClassifier
+"""
+
+from typing import Dict, List
+
+from classification.can_classifier import CanClassifier
+from processing.frame_context import FrameContext
+from .tracker import ObjectTracker, Track
+
+
+class CanTracker(ObjectTracker):
+    """Tracker de latas con caché de clasificación por track"""
+
+    def __init__(self, config: dict, classifier: CanClassifier):
+        """
+        Inicializa el tracker de latas
+
+        Args:
+            config: Configuración de detección (detection_config.yaml)
+            classifier: Clasificador usado para tracks nuevos o dudosos
+        """
+        tracking_config = config.get('tracking', {})
+        super().__init__(tracking_config)
+
+        self.classifier = classifier
+        self.reclassify_confidence = tracking_config.get('reclassify_confidence', 0.8)
+        self.min_votes = tracking_config.get('min_votes', 3)
+
+    def classify(self, cans: List[Dict], ctx: FrameContext) -> List[Dict]:
+        """
+        Clasifica las latas ya asociadas por update()
+
+        Args:
+            cans: Latas del frame con track_id
+            ctx: Contexto del frame (para el clasificador)
+
+        Returns:
+            Latas clasificadas
+        """
+        pending = []
+        for can in cans:
+            track = self.tracks[can['track_id']]
+            if self._needs_classification(track):
+                pending.append(can)
+            else:
+                self._apply_cached(can, track)
+
+        if pending:
+            self.classifier.classify_batch(pending, ctx)
+            for can in pending:
+                self._add_evidence(can, self.tracks[can['track_id']])
+
+        return cans
+
+    def _needs_classification(self, track: Track) -> bool:
+        """True si el track es nuevo o su clasificación aún es dudosa"""
+        votes = track.data.get('votes', 0)
+        return votes == 0 or track.data.get('confidence', 0.0) < self.reclassify_confidence
+
+    def _add_evidence(self, can: Dict, track: Track):
+        """Acumula el yellow_ratio medido y decide con el promedio"""
+        votes = track.data.get('votes', 0) + 1
+        ratio_sum = track.data.get('ratio_sum', 0.0) + can['yellow_ratio']
+        mean_ratio = ratio_sum / votes
+
+        self.classifier.apply_yellow_ratio(can, mean_ratio)
+
+        # Pocos votos = menos confianza aunque el ratio sea claro
+        can['confidence'] *= min(1.0, votes / self.min_votes)
+        can['votes'] = votes
+
+        track.data.update({
+            'votes': votes,
+            'ratio_sum': ratio_sum,
+            'type': can['type'],
+            'target_container': can['target_container'],
+            'yellow_ratio': can['yellow_ratio'],
+            'confidence': can['confidence']
+        })
+
+    def _apply_cached(self, can: Dict, track: Track):
+        """Copia la clasificación guardada del track a la lata"""
+        for key in ('type', 'target_container', 'yellow_ratio', 'confidence'):
+            can[key] = track.data[key]
+        can['votes'] = track.data['votes']
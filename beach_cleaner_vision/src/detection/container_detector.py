@@ -14,7 +14,7 @@ TAREAS:
     - Calcular posición y orientación del robot respecto a contenedores
 
 ENTRADA:
-    - Frame de cámara
+    - FrameContext del frame (máscaras y contornos compartidos)
     - Configuración de colores
 
 SALIDA:
@@ -29,7 +29,15 @@ PRIORIDAD: ALTA ⭐⭐⭐ (necesario para depositar residuos)
 
 import cv2
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from processing.frame_context import FrameContext
+from utils.helpers import calculate_circularity, merge_regions
+from utils.profiler import profiled
+
+
+# Diámetro real de los aros contenedores (cm)
+CONTAINER_DIAMETER_CM = 75.0
 
 
 class ContainerDetector:
@@ -42,16 +50,24 @@ class ContainerDetector:
         Args:
             config: Configuración de detección
         """
-        # TODO: Cargar parámetros
-        pass
+        container_config = config.get('container_detection', {})
+        
+        self.min_radius = container_config.get('min_radius', 50)
+        self.max_radius = container_config.get('max_radius', 300)
+        self.min_circularity = container_config.get('min_circularity', 0.7)
+        
+        self.focal_length = config.get('camera_model', {}).get('focal_length_px', 550)
     
-    def detect(self, frame: np.ndarray, hsv_frame: np.ndarray) -> List[Dict]:
+    @profiled('detection.containers')
+    def detect(self, ctx: FrameContext,
+               search_regions: Optional[Dict[str, List[Tuple[int, int, int, int]]]] = None) -> List[Dict]:
         """
         Detecta contenedores rojo y verde
         
         Args:
-            frame: Imagen BGR
-            hsv_frame: Imagen HSV
+            ctx: Contexto del frame (máscaras y contornos compartidos)
+            search_regions: Ventanas por color {'red': [(x, y, w, h), ...]};
+                            None = frame completo. Un color sin ventanas no se busca.
             
         Returns:
             Lista de contenedores detectados:
@@ -60,30 +76,112 @@ class ContainerDetector:
                     'color': 'red' o 'green',
                     'center': (x, y),
                     'radius': radio_en_píxeles,
-                    'distance': distancia_estimada,
-                    'angle': ángulo_desde_robot
+                    'bounding_box': (x, y, w, h),
+                    'distance': distancia_estimada (cm),
+                    'angle': ángulo_desde_robot (grados, 0 = al frente)
                 },
                 ...
             ]
         """
-        # TODO: Implementar detección
-        # 1. Detectar aro rojo
-        # 2. Detectar aro verde
-        # 3. Usar HoughCircles para encontrar círculos
-        # 4. Filtrar por tamaño esperado
-        pass
+        containers = []
+        
+        for color, detect_fn in (('red', self._detect_red_container),
+                                 ('green', self._detect_green_container)):
+            if search_regions is None:
+                regions = None
+            elif search_regions.get(color):
+                regions = merge_regions(search_regions[color])
+            else:
+                continue
+            
+            container = detect_fn(ctx, regions)
+            if container is not None:
+                containers.append(container)
+        
+        return containers
     
-    def _detect_red_container(self, hsv_frame: np.ndarray) -> Optional[Dict]:
-        """Detecta contenedor rojo (requiere dos rangos HSV)"""
-        # TODO: Combinar dos masks para el rojo
-        pass
+    def _detect_red_container(self, ctx: FrameContext,
+                              regions: Optional[List] = None) -> Optional[Dict]:
+        """Detecta contenedor rojo (la máscara ya combina los dos rangos HSV)"""
+        return self._detect_container(ctx, 'red', regions)
     
-    def _detect_green_container(self, hsv_frame: np.ndarray) -> Optional[Dict]:
+    def _detect_green_container(self, ctx: FrameContext,
+                                regions: Optional[List] = None) -> Optional[Dict]:
         """Detecta contenedor verde"""
-        # TODO: Crear mask verde y detectar círculo
-        pass
+        return self._detect_container(ctx, 'green', regions)
+    
+    def _detect_container(self, ctx: FrameContext, color: str,
+                          regions: Optional[List] = None) -> Optional[Dict]:
+        """
+        Busca el aro de un color: primero por contornos (barato) y, si no
+        hay uno suficientemente circular, con Hough sobre la máscara
+        (aro parcialmente visible u ocluido).
+        """
+        if regions is None:
+            contours = ctx.contours(color)
+            masks = [((0, 0), ctx.clean_mask(color))]
+        else:
+            contours = []
+            masks = []
+            for region in regions:
+                contours.extend(ctx.region_contours(color, region))
+                masks.append(((region[0], region[1]), ctx.region_mask(color, region)))
+        
+        best = None
+        for contour in contours:
+            (x, y), radius = cv2.minEnclosingCircle(contour)
+            if not self.min_radius <= radius <= self.max_radius:
+                continue
+            if calculate_circularity(contour) < self.min_circularity:
+                continue
+            if best is None or radius > best[2]:
+                best = (int(x), int(y), int(radius))
+        
+        if best is None:
+            circles = [(x + ox, y + oy, r)
+                       for (ox, oy), mask in masks
+                       for x, y, r in self._find_circles(mask)]
+            if circles:
+                best = max(circles, key=lambda c: c[2])
+        
+        if best is None:
+            return None
+        
+        return self._build_container(color, best, ctx.width, ctx.height)
+    
+    def _build_container(self, color: str, circle: Tuple[int, int, int],
+                         frame_width: int, frame_height: int) -> Dict:
+        """Arma el diccionario de salida con distancia y ángulo"""
+        x, y, radius = circle
+        
+        # El robot se asume en el centro inferior del frame
+        dx = x - frame_width / 2
+        dy = frame_height - y
+        angle = float(np.degrees(np.arctan2(dx, dy)))
+        
+        return {
+            'color': color,
+            'center': (x, y),
+            'radius': radius,
+            'bounding_box': (x - radius, y - radius, 2 * radius, 2 * radius),
+            'distance': CONTAINER_DIAMETER_CM * self.focal_length / (2 * radius),
+            'angle': angle
+        }
     
     def _find_circles(self, mask: np.ndarray) -> List[Tuple[int, int, int]]:
         """Encuentra círculos en la máscara usando Hough"""
-        # TODO: cv2.HoughCircles con parámetros apropiados
-        pass
+        if cv2.countNonZero(mask) == 0:
+            return []
+        
+        blurred = cv2.GaussianBlur(mask, (9, 9), 2)
+        circles = cv2.HoughCircles(blurred, cv2.HOUGH_GRADIENT, dp=2,
+                                   minDist=self.min_radius * 2,
+                                   param1=100, param2=60,
+                                   minRadius=int(self.min_radius),
+                                   maxRadius=int(self.max_radius))
+        
+        if circles is None:
+            return []
+        
+        circles = np.uint16(np.around(circles))
+        return [(int(x), int(y), int(r)) for x, y, r in circles[0, :]]
@@ -16,7 +16,7 @@ TAREAS:
     - Advertir cuando robot está muy cerca
 
 ENTRADA:
-    - Frame de cámara
+    - FrameContext del frame (máscaras compartidas)
     - Configuración de tamaños
 
 SALIDA:
@@ -32,7 +32,11 @@ PRIORIDAD: MEDIA ⭐⭐ (evitar penalizaciones)
 
 import cv2
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Tuple
+
+from processing.buffer_pool import structuring_element
+from processing.frame_context import FrameContext
+from utils.profiler import profiled
 
 
 class ObstacleDetector:
@@ -45,15 +49,23 @@ class ObstacleDetector:
         Args:
             config: Configuración de detección
         """
-        # TODO: Cargar umbrales de tamaño
-        pass
+        obstacle_config = config.get('obstacle_detection', {})
+        
+        self.min_area = obstacle_config.get('min_area', 5000)
+        self.max_distance = obstacle_config.get('max_distance', 500)
+        self.exclusion_margin = obstacle_config.get('exclusion_margin', 50)
+        self.max_frame_fraction = obstacle_config.get('max_frame_fraction', 0.6)
+        
+        filtering = config.get('filtering', {})
+        self.kernel_size = filtering.get('morphology_kernel', 5)
     
-    def detect(self, frame: np.ndarray) -> List[Dict]:
+    @profiled('detection.obstacles')
+    def detect(self, ctx: FrameContext) -> List[Dict]:
         """
         Detecta obstáculos en la escena
         
         Args:
-            frame: Imagen BGR
+            ctx: Contexto del frame (máscaras compartidas)
             
         Returns:
             Lista de obstáculos:
@@ -63,36 +75,92 @@ class ObstacleDetector:
                     'bounding_box': (x, y, w, h),
                     'center': (x, y),
                     'area': área_en_píxeles,
-                    'distance': distancia_estimada,
+                    'distance': distancia_estimada (píxeles desde el robot),
                     'exclusion_zone': (x, y, w, h)  # Zona a evitar
                 },
                 ...
             ]
         """
-        # TODO: Implementar detección
-        # 1. Convertir a escala de grises
-        # 2. Detectar bordes
-        # 3. Encontrar contornos grandes
-        # 4. Filtrar por área mínima (mucho más grande que latas)
-        # 5. Clasificar tipo de obstáculo (opcional)
-        pass
+        obstacles = []
+        
+        for contour in self._find_large_contours(ctx):
+            bbox = cv2.boundingRect(contour)
+            x, y, w, h = bbox
+            
+            # El robot está en el borde inferior: distancia = filas libres
+            distance = ctx.height - (y + h)
+            if distance > self.max_distance:
+                continue
+            
+            obstacles.append({
+                'type': self._classify_obstacle(contour, bbox),
+                'bounding_box': bbox,
+                'center': (x + w // 2, y + h // 2),
+                'area': cv2.contourArea(contour),
+                'distance': distance,
+                'exclusion_zone': self._calculate_exclusion_zone(
+                    bbox, self.exclusion_margin, ctx.width, ctx.height)
+            })
+        
+        return obstacles
     
-    def _find_large_contours(self, frame: np.ndarray) -> List:
+    def _find_large_contours(self, ctx: FrameContext) -> List:
         """Encuentra contornos grandes que puedan ser obstáculos"""
-        # TODO: Threshold + findContours + filtro por área
-        pass
+        def compute():
+            # Todo lo que no es arena, mar ni contenedor es candidato a obstáculo
+            known = cv2.bitwise_or(ctx.mask('sand'), ctx.mask('blue'),
+                                   dst=ctx.buffer('obstacle_known'))
+            cv2.bitwise_or(known, ctx.mask('red'), dst=known)
+            cv2.bitwise_or(known, ctx.mask('green'), dst=known)
+            not_sand = cv2.bitwise_not(known, dst=known)
+            return cv2.morphologyEx(not_sand, cv2.MORPH_OPEN,
+                                    structuring_element(self.kernel_size),
+                                    dst=ctx.buffer('obstacle_mask'))
+        
+        mask = ctx.get_or_compute('obstacle_mask', compute)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_SIMPLE)
+        
+        max_area = ctx.total_pixels * self.max_frame_fraction
+        return [c for c in contours
+                if self.min_area <= cv2.contourArea(c) <= max_area]
     
     def _classify_obstacle(self, contour: np.ndarray, 
                            bbox: Tuple[int, int, int, int]) -> str:
         """Intenta clasificar el tipo de obstáculo basándose en forma"""
-        # TODO: Aspect ratio, forma, etc.
+        _, _, w, h = bbox
+        if w == 0 or h == 0:
+            return 'unknown'
+        
+        aspect_ratio = h / w
+        
         # Vertical alto = maniquí
+        if aspect_ratio >= 1.8:
+            return 'mannequin'
+        
         # Horizontal = silla
-        # Forma especial = sombrilla
-        pass
+        if aspect_ratio <= 0.7:
+            return 'chair'
+        
+        # Forma compacta con poco relleno (copa + palo) = sombrilla
+        fill_ratio = cv2.contourArea(contour) / (w * h)
+        if fill_ratio < 0.5:
+            return 'umbrella'
+        
+        return 'unknown'
     
     def _calculate_exclusion_zone(self, bbox: Tuple[int, int, int, int], 
-                                  margin: int = 50) -> Tuple[int, int, int, int]:
+                                  margin: int = 50,
+                                  frame_width: int = None,
+                                  frame_height: int = None) -> Tuple[int, int, int, int]:
         """Calcula zona de exclusión alrededor del obstáculo"""
-        # TODO: Expandir bounding box con margen de seguridad
-        pass
+        x, y, w, h = bbox
+        x1, y1 = max(0, x - margin), max(0, y - margin)
+        x2, y2 = x + w + margin, y + h + margin
+        
+        if frame_width is not None:
+            x2 = min(frame_width, x2)
+        if frame_height is not None:
+            y2 = min(frame_height, y2)
+        
+        return (x1, y1, x2 - x1, y2 - y1)
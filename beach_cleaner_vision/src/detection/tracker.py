@@ -0,0 +1,232 @@
+"""
+Seguimiento de objetos entre frames
+============================================
+
+DESCRIPCIÓN:
+    Los detectores no tienen memoria: cada frame devuelven una lista nueva
+    de objetos. ObjectTracker asocia las detecciones de frames sucesivos
+    para dar a cada objeto un ID ESTABLE mientras siga a la vista.
+
+    - Predicción con velocidad constante (en píxeles por frame)
+    - Asociación greedy por IoU entre caja predicha y caja detectada;
+      si el IoU no alcanza, se acepta la distancia entre centros
+    - Un track se elimina tras `max_misses` frames sin detección
+
+ENTRADA:
+    - Lista de detecciones con 'bounding_box' (x, y, w, h)
+
+SALIDA:
+    - Las mismas detecciones anotadas con:
+        * track_id: ID estable del objeto
+        * track_hits: frames en que se ha detectado
+        * is_new: True el primer frame del track
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from utils.profiler import profiled
+
+
+class Track:
+    """Estado de un objeto seguido"""
+
+    def __init__(self, track_id: int, detection: Dict, frame_index: int):
+        """
+        Crea un track a partir de su primera detección
+
+        Args:
+            track_id: ID asignado
+            detection: Detección que originó el track
+            frame_index: Número de frame del tracker
+        """
+        self.track_id = track_id
+        self.bbox = tuple(detection['bounding_box'])
+        self.velocity = (0.0, 0.0)
+        self.hits = 1
+        self.misses = 0
+        self.last_frame = frame_index
+        self.detection = detection
+
+        # Datos adicionales que guardan las subclases (ej: clasificación)
+        self.data: Dict = {}
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        """Centro de la última caja conocida"""
+        x, y, w, h = self.bbox
+        return (x + w / 2, y + h / 2)
+
+    def predict_bbox(self, frame_index: int) -> Tuple[float, float, float, float]:
+        """Caja predicha para un frame con velocidad constante"""
+        frames = frame_index - self.last_frame
+        x, y, w, h = self.bbox
+        return (x + self.velocity[0] * frames, y + self.velocity[1] * frames, w, h)
+
+    def update(self, detection: Dict, frame_index: int, smoothing: float):
+        """Actualiza el track con una nueva detección"""
+        frames = max(1, frame_index - self.last_frame)
+        old_x, old_y = self.center
+
+        self.bbox = tuple(detection['bounding_box'])
+        new_x, new_y = self.center
+
+        vx = (new_x - old_x) / frames
+        vy = (new_y - old_y) / frames
+        self.velocity = (smoothing * vx + (1 - smoothing) * self.velocity[0],
+                         smoothing * vy + (1 - smoothing) * self.velocity[1])
+
+        self.hits += 1
+        self.misses = 0
+        self.last_frame = frame_index
+        self.detection = detection
+
+
+class ObjectTracker:
+    """Asociación de detecciones entre frames con IDs estables"""
+
+    def __init__(self, config: dict = None):
+        """
+        Inicializa el tracker
+
+        Args:
+            config: Sección 'tracking' de detection_config.yaml
+        """
+        config = config or {}
+        self.iou_threshold = config.get('iou_threshold', 0.3)
+        self.max_center_distance = config.get('max_center_distance', 60)
+        self.max_misses = config.get('max_misses', 5)
+        self.velocity_smoothing = config.get('velocity_smoothing', 0.5)
+
+        self.tracks: Dict[int, Track] = {}
+        self.frame_index = 0
+        self._next_id = 1
+
+    @profiled('tracking.update')
+    def update(self, detections: List[Dict]) -> List[Dict]:
+        """
+        Asocia las detecciones del frame actual con los tracks existentes
+
+        Debe llamarse UNA vez por frame procesado, aunque no haya
+        detecciones (para envejecer los tracks).
+
+        Args:
+            detections: Detecciones del frame con 'bounding_box'
+
+        Returns:
+            Las mismas detecciones anotadas con track_id, track_hits e is_new
+        """
+        self.frame_index += 1
+
+        track_ids = list(self.tracks.keys())
+        matches = self._associate(track_ids, detections)
+
+        matched_tracks = set()
+        for det_idx, detection in enumerate(detections):
+            track_id = matches.get(det_idx)
+
+            if track_id is None:
+                track = self._create_track(detection)
+                detection['is_new'] = True
+            else:
+                track = self.tracks[track_id]
+                track.update(detection, self.frame_index, self.velocity_smoothing)
+                detection['is_new'] = False
+
+            matched_tracks.add(track.track_id)
+            detection['track_id'] = track.track_id
+            detection['track_hits'] = track.hits
+
+        # Envejecer tracks no vistos y eliminar los perdidos
+        for track_id in track_ids:
+            if track_id in matched_tracks:
+                continue
+            track = self.tracks[track_id]
+            track.misses += 1
+            if track.misses > self.max_misses:
+                self._remove_track(track_id)
+
+        return detections
+
+    def get_track(self, track_id: int) -> Optional[Track]:
+        """Devuelve un track por ID (None si ya no existe)"""
+        return self.tracks.get(track_id)
+
+    def predicted_boxes(self) -> Dict[int, Tuple[float, float, float, float]]:
+        """Cajas predichas de todos los tracks para el siguiente frame"""
+        return {track_id: track.predict_bbox(self.frame_index + 1)
+                for track_id, track in self.tracks.items()}
+
+    def reset(self):
+        """Elimina todos los tracks"""
+        self.tracks = {}
+
+    def _create_track(self, detection: Dict) -> Track:
+        """Crea un track nuevo para una detección sin asociar"""
+        track = Track(self._next_id, detection, self.frame_index)
+        self.tracks[track.track_id] = track
+        self._next_id += 1
+        return track
+
+    def _remove_track(self, track_id: int):
+        """Elimina un track perdido"""
+        del self.tracks[track_id]
+
+    def _associate(self, track_ids: List[int],
+                   detections: List[Dict]) -> Dict[int, int]:
+        """
+        Asociación greedy detección → track
+
+        Returns:
+            Diccionario {índice_de_detección: track_id}
+        """
+        if not track_ids or not detections:
+            return {}
+
+        predicted = np.array([self.tracks[t].predict_bbox(self.frame_index)
+                              for t in track_ids], dtype=np.float64)
+        boxes = np.array([d['bounding_box'] for d in detections], dtype=np.float64)
+
+        iou = self._iou_matrix(predicted, boxes)
+
+        # Distancia entre centros como respaldo (objetos pequeños o rápidos)
+        pred_centers = predicted[:, :2] + predicted[:, 2:] / 2
+        det_centers = boxes[:, :2] + boxes[:, 2:] / 2
+        distance = np.linalg.norm(pred_centers[:, None, :] - det_centers[None, :, :], axis=2)
+
+        # Puntaje: IoU si supera el umbral; si no, cercanía normalizada (< umbral)
+        closeness = 1.0 - distance / self.max_center_distance
+        score = np.where(iou >= self.iou_threshold, 1.0 + iou,
+                         np.where(closeness > 0, closeness, -1.0))
+
+        matches = {}
+        used_tracks = set()
+        for flat_idx in np.argsort(score, axis=None)[::-1]:
+            t_idx, d_idx = np.unravel_index(flat_idx, score.shape)
+            if score[t_idx, d_idx] <= 0:
+                break
+            if t_idx in used_tracks or d_idx in matches:
+                continue
+            matches[int(d_idx)] = track_ids[t_idx]
+            used_tracks.add(t_idx)
+
+        return matches
+
+    @staticmethod
+    def _iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+        """IoU entre todas las cajas (x, y, w, h) de A y de B"""
+        ax1, ay1 = boxes_a[:, 0:1], boxes_a[:, 1:2]
+        ax2, ay2 = ax1 + boxes_a[:, 2:3], ay1 + boxes_a[:, 3:4]
+        bx1, by1 = boxes_b[:, 0], boxes_b[:, 1]
+        bx2, by2 = bx1 + boxes_b[:, 2], by1 + boxes_b[:, 3]
+
+        inter_w = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+        inter_h = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+        intersection = inter_w * inter_h
+
+        area_a = boxes_a[:, 2:3] * boxes_a[:, 3:4]
+        area_b = boxes_b[:, 2] * boxes_b[:, 3]
+        union = area_a + area_b - intersection
+
+        return np.divide(intersection, union, out=np.zeros_like(intersection),
+                         where=union > 0)
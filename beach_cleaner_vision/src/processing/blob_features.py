@@ -0,0 +1,219 @@
+"""
+Extracción vectorizada de características de blobs
+============================================
+
+DESCRIPCIÓN:
+    EdgeDetector.filter_contours_by_area y los helpers de forma
+    (calculate_circularity, calculate_aspect_ratio) trabajan contorno por
+    contorno en Python. Con texturas de arena ruidosas hay cientos de
+    blobs diminutos por frame.
+
+    BlobFeatureExtractor calcula las características de TODOS los blobs
+    de una máscara en una sola llamada, como arreglos NumPy:
+
+        cv2.connectedComponentsWithStats  -> área, bbox, centroide
+        vecinos-4 expuestos por píxel     -> perímetro aproximado
+
+    y los filtros de área, forma y aspecto son máscaras booleanas sobre
+    esos arreglos, sin bucles de Python.
+
+    El perímetro es lo más caro: solo se calcula para los blobs dentro
+    del rango de área pedido (recortando su caja), así el ruido de arena
+    (miles de blobs diminutos) no cuesta nada más que el etiquetado.
+
+PERÍMETRO:
+    Cada píxel de borde pesa según cuántos lados expone (vecindad-4):
+        1 lado  -> 1      (tramo horizontal/vertical)
+        2 lados -> √2     (tramo diagonal)
+        3 lados -> 2      (punta)
+        4 lados -> 4      (píxel aislado)
+    Da valores muy cercanos a cv2.arcLength del contorno, así que la
+    circularidad 4πA/P² es comparable con calculate_circularity().
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+# Peso de perímetro según cantidad de lados expuestos (índice = lados)
+_SIDE_WEIGHTS = np.array([0.0, 1.0, np.sqrt(2.0), 2.0, 4.0], dtype=np.float64)
+
+# Con más blobs que esto se calcula el perímetro en una pasada sobre
+# toda la máscara en lugar de recorte por recorte
+_CROP_PERIMETER_LIMIT = 32
+
+
+class BlobFeatureExtractor:
+    """Características de todos los blobs de una máscara en arreglos NumPy"""
+
+    def __init__(self, connectivity: int = 8):
+        """
+        Inicializa el extractor
+
+        Args:
+            connectivity: Conectividad de los componentes (4 u 8)
+        """
+        self.connectivity = connectivity
+
+    def extract(self, mask: np.ndarray,
+                offset: Tuple[int, int] = (0, 0),
+                min_area: float = 0, max_area: float = np.inf,
+                shape: bool = True,
+                labels: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Calcula características de todos los blobs
+
+        Args:
+            mask: Máscara binaria (0/255)
+            offset: (x, y) a sumar a coordenadas (si la máscara es una ROI)
+            min_area, max_area: Rango de área para calcular perímetro y
+                                circularidad (fuera del rango quedan en 0)
+            shape: False = no calcular perímetro ni circularidad
+            labels: Buffer int32 del tamaño de la máscara para la imagen de
+                    etiquetas; None = arreglo nuevo
+
+        Returns:
+            Diccionario de arreglos (uno por blob, sin el fondo):
+            {
+                'count': número de blobs,
+                'labels': imagen de etiquetas (blob i tiene etiqueta i + 1),
+                'area': píxeles por blob,
+                'bbox': (N, 4) con x, y, w, h (en coordenadas del frame),
+                'centroid': (N, 2) con cx, cy,
+                'fill_ratio': área / área_de_bbox,
+                'aspect_ratio': alto / ancho,
+                'perimeter': perímetro aproximado,
+                'circularity': 4πA/P² (0-1)
+            }
+        """
+        # Grana (BBDT) es bastante más rápido que el algoritmo por defecto
+        # con máscaras dispersas
+        count, labels, stats, centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+            mask, self.connectivity, cv2.CV_32S, cv2.CCL_GRANA, labels=labels)
+
+        # Etiqueta 0 = fondo
+        stats = stats[1:]
+        centroids = centroids[1:]
+        count -= 1
+
+        area = stats[:, cv2.CC_STAT_AREA].astype(np.float64)
+        width = stats[:, cv2.CC_STAT_WIDTH].astype(np.float64)
+        height = stats[:, cv2.CC_STAT_HEIGHT].astype(np.float64)
+
+        bbox = stats[:, :4].copy()
+        bbox[:, 0] += offset[0]
+        bbox[:, 1] += offset[1]
+        centroid = centroids + np.array(offset, dtype=np.float64)
+
+        perimeter = np.zeros(count, dtype=np.float64)
+        if shape:
+            wanted = np.flatnonzero((area >= min_area) & (area <= max_area))
+            if len(wanted) > _CROP_PERIMETER_LIMIT:
+                perimeter[wanted] = self._frame_perimeters(mask, labels, count)[wanted]
+            else:
+                perimeter[wanted] = self._crop_perimeters(labels, stats, wanted)
+
+        circularity = np.zeros(count, dtype=np.float64)
+        valid = perimeter > 0
+        circularity[valid] = np.minimum(
+            4 * np.pi * area[valid] / perimeter[valid] ** 2, 1.0)
+
+        return {
+            'count': count,
+            'labels': labels,
+            'area': area,
+            'bbox': bbox,
+            'centroid': centroid,
+            'fill_ratio': area / np.maximum(width * height, 1),
+            'aspect_ratio': height / np.maximum(width, 1),
+            'perimeter': perimeter,
+            'circularity': circularity
+        }
+
+    @staticmethod
+    def _exposed_sides(inside: np.ndarray) -> np.ndarray:
+        """Lados expuestos por píxel (vecinos-4 fuera de `inside`, bool)"""
+        # Borde de 1 píxel: lo que queda fuera de la imagen cuenta como expuesto
+        outside = (~np.pad(inside, 1)).view(np.uint8)
+
+        sides = outside[:-2, 1:-1] + outside[2:, 1:-1]
+        sides += outside[1:-1, :-2]
+        sides += outside[1:-1, 2:]
+        sides *= inside.view(np.uint8)
+        return sides
+
+    def _crop_perimeters(self, labels: np.ndarray, stats: np.ndarray,
+                         indices: np.ndarray) -> np.ndarray:
+        """Perímetro de pocos blobs, cada uno sobre el recorte de su caja"""
+        perimeters = np.zeros(len(indices), dtype=np.float64)
+
+        for i, index in enumerate(indices):
+            x, y, w, h = stats[index, :4]
+            blob = labels[y:y + h, x:x + w] == index + 1
+            perimeters[i] = _SIDE_WEIGHTS[self._exposed_sides(blob)].sum()
+
+        return perimeters
+
+    def _frame_perimeters(self, mask: np.ndarray, labels: np.ndarray,
+                          count: int) -> np.ndarray:
+        """Perímetro de todos los blobs en una sola pasada sobre la máscara"""
+        sides = self._exposed_sides(mask > 0)
+        border = sides > 0
+        perimeter = np.bincount(labels[border], weights=_SIDE_WEIGHTS[sides[border]],
+                                minlength=count + 1)
+        return perimeter[1:count + 1]
+
+    @staticmethod
+    def select(features: Dict[str, np.ndarray],
+               min_area: float = 0, max_area: float = np.inf,
+               min_circularity: float = 0.0, max_circularity: float = 1.0,
+               aspect_ratio_min: float = 0.0, aspect_ratio_max: float = np.inf,
+               min_fill_ratio: float = 0.0) -> np.ndarray:
+        """
+        Filtra blobs por área, forma y aspecto
+
+        Args:
+            features: Resultado de extract()
+            min_area, max_area: Rango de área (píxeles)
+            min_circularity, max_circularity: Rango de circularidad
+            aspect_ratio_min, aspect_ratio_max: Rango de alto/ancho
+            min_fill_ratio: Relleno mínimo de la caja
+
+        Returns:
+            Máscara booleana (True = blob aceptado)
+        """
+        area = features['area']
+        circularity = features['circularity']
+        aspect = features['aspect_ratio']
+
+        return ((area >= min_area) & (area <= max_area)
+                & (circularity >= min_circularity) & (circularity <= max_circularity)
+                & (aspect >= aspect_ratio_min) & (aspect <= aspect_ratio_max)
+                & (features['fill_ratio'] >= min_fill_ratio))
+
+    @staticmethod
+    def blob_contour(features: Dict[str, np.ndarray], index: int,
+                     offset: Tuple[int, int] = (0, 0)) -> Optional[np.ndarray]:
+        """
+        Contorno de UN blob (solo para los pocos que pasan el filtro)
+
+        Args:
+            features: Resultado de extract()
+            index: Índice del blob
+            offset: El mismo offset usado en extract()
+
+        Returns:
+            Contorno en coordenadas del frame, o None
+        """
+        x, y, w, h = features['bbox'][index]
+        lx, ly = x - offset[0], y - offset[1]
+        crop = features['labels'][ly:ly + h, lx:lx + w]
+        blob = (crop == index + 1).view(np.uint8)
+
+        contours, _ = cv2.findContours(blob, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=(int(x), int(y)))
+        if not contours:
+            return None
+        return max(contours, key=cv2.contourArea)
@@ -0,0 +1,130 @@
+"""
+Buffers preasignados para el procesamiento por frame
+============================================
+
+DESCRIPCIÓN:
+    Cada frame producía decenas de arreglos del tamaño del frame (copia
+    del preprocesamiento, LAB, HSV, máscaras, morfología) y un np.ones por
+    cada llamada morfológica. En la laptop de bajo consumo esa rotación de
+    memoria aparece como picos de latencia.
+
+    - BufferPool: arreglos reutilizables por (etiqueta, forma, dtype). El
+      primer frame los crea; los siguientes del mismo tamaño reutilizan los
+      mismos (0 asignaciones en estado estable).
+    - scratch_pool(): pool propio de cada hilo para resultados intermedios
+      dentro de una sola llamada (LAB, máscara auxiliar del rojo, ...).
+    - structuring_element(): kernels morfológicos creados una sola vez.
+
+    Las funciones de processing aceptan `dst=` (buffer de salida). Sin
+    `dst` devuelven un arreglo nuevo, como antes: solo quien es dueño del
+    pool (el pipeline) recibe resultados que se sobrescriben en el frame
+    siguiente.
+
+USO:
+    pool = BufferPool()
+    processed = preprocessor.preprocess(frame, dst=pool.like(frame, 'processed'))
+    ctx = FrameContext(processed, segmenter, filtering, color_lut, pool=pool)
+
+    kernel = structuring_element(5)          # igual a np.ones((5, 5), np.uint8)
+
+    BufferPool.total_allocations             # buffers creados por todos los pools
+
+LIMITACIÓN:
+    Un BufferPool no es thread-safe: cada hilo usa el suyo. Nada que
+    sobreviva al frame (resultados publicados, tracks) debe guardar
+    referencias a buffers del pool.
+"""
+
+import functools
+import threading
+from typing import Any, Dict, Hashable, Tuple
+
+import cv2
+import numpy as np
+
+
+class BufferPool:
+    """Arreglos reutilizables por etiqueta, forma y dtype"""
+
+    # Buffers creados por todos los pools del proceso (contador del benchmark)
+    total_allocations = 0
+    _count_lock = threading.Lock()
+
+    def __init__(self):
+        self._buffers: Dict[Tuple[Hashable, Tuple[int, ...], np.dtype], np.ndarray] = {}
+        self.requests = 0
+        self.allocations = 0
+
+    def get(self, shape: Tuple[int, ...], dtype: Any = np.uint8,
+            tag: Hashable = None) -> np.ndarray:
+        """
+        Buffer de la forma y tipo pedidos (contenido indefinido)
+
+        Args:
+            shape: Forma del arreglo
+            dtype: Tipo de dato
+            tag: Distingue buffers de igual forma usados a la vez en el mismo frame
+
+        Returns:
+            Arreglo reutilizado (o creado la primera vez)
+        """
+        key = (tag, tuple(shape), np.dtype(dtype))
+        self.requests += 1
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buffer
+            self.allocations += 1
+            with BufferPool._count_lock:
+                BufferPool.total_allocations += 1
+        return buffer
+
+    def like(self, array: np.ndarray, tag: Hashable = None) -> np.ndarray:
+        """Buffer con la forma y tipo de `array`"""
+        return self.get(array.shape, array.dtype, tag)
+
+    def clear(self):
+        """Libera todos los buffers (ej: al cambiar la resolución de procesamiento)"""
+        self._buffers = {}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Buffers vivos, memoria (bytes), pedidos y asignaciones"""
+        return {
+            'buffers': len(self._buffers),
+            'bytes': sum(buffer.nbytes for buffer in self._buffers.values()),
+            'requests': self.requests,
+            'allocations': self.allocations
+        }
+
+
+_local = threading.local()
+
+
+def scratch_pool() -> BufferPool:
+    """
+    Pool del hilo actual para intermedios que no salen de una llamada
+
+    Cada sitio de uso debe tener su propia etiqueta: dos intermedios vivos
+    a la vez con la misma etiqueta y forma se pisarían.
+    """
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = BufferPool()
+    return pool
+
+
+@functools.lru_cache(maxsize=64)
+def structuring_element(size: int, shape: int = cv2.MORPH_RECT) -> np.ndarray:
+    """
+    Kernel morfológico de size x size (creado una vez, solo lectura)
+
+    Args:
+        size: Lado del kernel
+        shape: cv2.MORPH_RECT (= np.ones), MORPH_ELLIPSE o MORPH_CROSS
+
+    Returns:
+        Kernel uint8
+    """
+    kernel = cv2.getStructuringElement(shape, (size, size))
+    kernel.setflags(write=False)
+    return kernel
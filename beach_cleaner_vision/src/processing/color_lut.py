@@ -0,0 +1,157 @@
+"""
+Clasificador de color por tabla de búsqueda (LUT) BGR → colores
+============================================
+
+DESCRIPCIÓN:
+    ColorSegmentation convierte el frame a HSV y luego llama cv2.inRange
+    una vez por color (dos para el rojo): 7 pasadas completas sobre el
+    frame más un bitwise_or.
+
+    Esta clase "compila" los rangos de la sección `colors` de
+    detection_config.yaml en una tabla 3D de 256x256x256 entradas: para
+    cada color BGR posible guarda un byte donde el bit i indica si ese
+    color pertenece a la clase i. Por frame basta UNA pasada:
+
+        frame BGR --(tabla)--> bitfield por píxel
+
+    sin cvtColor a HSV. Cada máscara por color sale después del bitfield
+    extrayendo su bit (AND + comparación, muy barato).
+
+    La tabla se construye UNA vez al iniciar (~0.5 s, 16 MB) evaluando
+    exactamente cvtColor + inRange, así que el resultado es idéntico al
+    de ColorSegmentation.
+
+LIMITACIÓN:
+    Máximo 8 colores (un byte por píxel).
+"""
+
+import sys
+
+import cv2
+import numpy as np
+from typing import Dict, List
+
+from .buffer_pool import scratch_pool
+from .color_segmentation import ColorSegmentation
+
+
+class ColorLookupTable:
+    """Clasificador de colores en una sola pasada con tabla BGR precalculada"""
+
+    MAX_COLORS = 8
+
+    def __init__(self, color_config: dict):
+        """
+        Compila la tabla de búsqueda
+
+        Args:
+            color_config: Diccionario con rangos de colores HSV (sección 'colors')
+        """
+        if len(color_config) > self.MAX_COLORS:
+            raise ValueError(
+                f"La LUT soporta máximo {self.MAX_COLORS} colores, "
+                f"hay {len(color_config)} configurados")
+
+        self.color_names: List[str] = list(color_config.keys())
+        self.color_bits: Dict[str, int] = {
+            name: 1 << i for i, name in enumerate(self.color_names)
+        }
+
+        self._lut = self._build_table(ColorSegmentation(color_config))
+
+    def _build_table(self, segmenter: ColorSegmentation) -> np.ndarray:
+        """
+        Evalúa cvtColor + inRange para los 2^24 colores BGR
+
+        Se procesa un plano R a la vez (imagen de 256x256 con G en filas
+        y B en columnas) para no necesitar cientos de MB de memoria.
+
+        Returns:
+            Tabla plana de 2^24 bytes indexada por b | g << 8 | r << 16
+        """
+        lut = np.zeros((256, 256, 256), dtype=np.uint8)  # [r, g, b]
+
+        plane = np.empty((256, 256, 3), dtype=np.uint8)
+        plane[:, :, 0] = np.arange(256, dtype=np.uint8)[np.newaxis, :]  # B
+        plane[:, :, 1] = np.arange(256, dtype=np.uint8)[:, np.newaxis]  # G
+
+        for r in range(256):
+            plane[:, :, 2] = r
+            hsv_plane = cv2.cvtColor(plane, cv2.COLOR_BGR2HSV)
+
+            bits = lut[r]
+            for name, bit in self.color_bits.items():
+                mask = segmenter.segment_by_color(hsv_plane, name)
+                bits[mask > 0] |= bit
+
+        return lut.reshape(-1)
+
+    def _pixel_indices(self, bgr_image: np.ndarray) -> np.ndarray:
+        """
+        Índice de 24 bits por píxel (b | g << 8 | r << 16)
+
+        Se calcula directamente en enteros np.intp (buffer del hilo): np.take
+        convertiría cualquier otro tipo de índice con una copia nueva.
+        """
+        pool = scratch_pool()
+        indices = pool.get(bgr_image.shape[:2], np.intp, 'lut.indices')
+        if sys.byteorder == 'little':
+            # BGRA contiguo visto como uint32 = b | g<<8 | r<<16 | a<<24
+            bgra = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2BGRA, dst=pool.get(
+                bgr_image.shape[:2] + (4,), np.uint8, 'lut.bgra'))
+            np.copyto(indices, bgra.view(np.uint32)[:, :, 0])
+            indices &= 0x00FFFFFF
+            return indices
+
+        np.copyto(indices, bgr_image[:, :, 0])
+        indices |= bgr_image[:, :, 1].astype(np.intp) << 8
+        indices |= bgr_image[:, :, 2].astype(np.intp) << 16
+        return indices
+
+    def classify(self, bgr_image: np.ndarray, dst: np.ndarray = None) -> np.ndarray:
+        """
+        Clasifica todos los píxeles en una sola pasada
+
+        Args:
+            bgr_image: Imagen BGR (uint8)
+            dst: Buffer de salida (alto x ancho, uint8); None = arreglo nuevo
+
+        Returns:
+            Bitfield por píxel (uint8); el bit de cada color está en color_bits
+        """
+        # mode='clip': los índices siempre son válidos y así np.take no
+        # copia `out` a un buffer intermedio
+        return np.take(self._lut, self._pixel_indices(bgr_image), out=dst, mode='clip')
+
+    def extract_mask(self, bits: np.ndarray, color_name: str,
+                     dst: np.ndarray = None) -> np.ndarray:
+        """
+        Extrae la máscara binaria de un color desde el bitfield
+
+        Args:
+            bits: Bitfield devuelto por classify()
+            color_name: Nombre del color
+            dst: Buffer de salida; None = arreglo nuevo
+
+        Returns:
+            Máscara binaria (0/255), igual a la de ColorSegmentation
+        """
+        if color_name not in self.color_bits:
+            raise ValueError(f"Color '{color_name}' no encontrado en configuración")
+        bit = self.color_bits[color_name]
+        selected = cv2.bitwise_and(bits, bit, dst=scratch_pool().like(bits, 'lut.selected'))
+        return cv2.compare(selected, 0, cv2.CMP_NE, dst=dst)
+
+    def segment_all_colors(self, bgr_image: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Segmenta todos los colores configurados (equivalente a
+        ColorSegmentation.segment_all_colors, pero desde BGR)
+
+        Args:
+            bgr_image: Imagen BGR
+
+        Returns:
+            Diccionario con máscaras por cada color
+        """
+        bits = self.classify(bgr_image)
+        return {name: self.extract_mask(bits, name) for name in self.color_names}
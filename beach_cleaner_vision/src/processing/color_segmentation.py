@@ -1,11 +1,16 @@
 """
 Segmentación de imagen por color usando HSV
+
+Los rangos se convierten a arreglos una sola vez y los kernels
+morfológicos salen de structuring_element(); las máscaras aceptan `dst=`.
 """
 
 import cv2
 import numpy as np
 from typing import Tuple, List, Dict
 
+from .buffer_pool import scratch_pool, structuring_element
+
 
 class ColorSegmentation:
     """Clase para segmentar imagen por colores"""
@@ -19,38 +24,40 @@ class ColorSegmentation:
         """
         self.color_config = color_config
         self.masks = {}
+        
+        # Rangos (lower, upper) por color como arreglos; el rojo tiene dos
+        self._ranges = {}
+        for name, info in color_config.items():
+            if name == 'red':
+                self._ranges[name] = [(np.array(info['lower1']), np.array(info['upper1'])),
+                                      (np.array(info['lower2']), np.array(info['upper2']))]
+            else:
+                self._ranges[name] = [(np.array(info['lower']), np.array(info['upper']))]
     
     def segment_by_color(self, hsv_image: np.ndarray, 
-                         color_name: str) -> np.ndarray:
+                         color_name: str, dst: np.ndarray = None) -> np.ndarray:
         """
         Segmenta imagen por un color específico
         
         Args:
             hsv_image: Imagen en espacio HSV
             color_name: Nombre del color ('black', 'yellow', 'red', etc.)
+            dst: Buffer de salida (alto x ancho, uint8); None = arreglo nuevo
             
         Returns:
             Máscara binaria del color
         """
-        if color_name not in self.color_config:
+        if color_name not in self._ranges:
             raise ValueError(f"Color '{color_name}' no encontrado en configuración")
         
-        color_info = self.color_config[color_name]
+        (lower, upper), *extra = self._ranges[color_name]
+        mask = cv2.inRange(hsv_image, lower, upper, dst=dst)
         
         # El rojo necesita dos rangos
-        if color_name == 'red':
-            lower1 = np.array(color_info['lower1'])
-            upper1 = np.array(color_info['upper1'])
-            lower2 = np.array(color_info['lower2'])
-            upper2 = np.array(color_info['upper2'])
-            
-            mask1 = cv2.inRange(hsv_image, lower1, upper1)
-            mask2 = cv2.inRange(hsv_image, lower2, upper2)
-            mask = cv2.bitwise_or(mask1, mask2)
-        else:
-            lower = np.array(color_info['lower'])
-            upper = np.array(color_info['upper'])
-            mask = cv2.inRange(hsv_image, lower, upper)
+        for lower, upper in extra:
+            second = cv2.inRange(hsv_image, lower, upper,
+                                 dst=scratch_pool().like(mask, 'segment.second_range'))
+            cv2.bitwise_or(mask, second, dst=mask)
         
         return mask
     
@@ -74,7 +81,8 @@ class ColorSegmentation:
     def apply_morphology(self, mask: np.ndarray, 
                         kernel_size: int = 5,
                         erosion_iter: int = 1,
-                        dilation_iter: int = 2) -> np.ndarray:
+                        dilation_iter: int = 2,
+                        dst: np.ndarray = None) -> np.ndarray:
         """
         Aplica operaciones morfológicas para limpiar máscara
         
@@ -83,23 +91,32 @@ class ColorSegmentation:
             kernel_size: Tamaño del kernel morfológico
             erosion_iter: Iteraciones de erosión
             dilation_iter: Iteraciones de dilatación
+            dst: Buffer de salida (distinto de mask); None = arreglo nuevo
             
         Returns:
             Máscara procesada
         """
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
+        kernel = structuring_element(kernel_size)
+        
+        if erosion_iter <= 0 and dilation_iter <= 0:
+            if dst is None:
+                return mask
+            np.copyto(dst, mask)
+            return dst
         
         # Erosión para eliminar ruido pequeño
         if erosion_iter > 0:
-            mask = cv2.erode(mask, kernel, iterations=erosion_iter)
+            target = scratch_pool().like(mask, 'morphology.eroded') if dilation_iter > 0 else dst
+            mask = cv2.erode(mask, kernel, dst=target, iterations=erosion_iter)
         
         # Dilatación para restaurar tamaño
         if dilation_iter > 0:
-            mask = cv2.dilate(mask, kernel, iterations=dilation_iter)
+            mask = cv2.dilate(mask, kernel, dst=dst, iterations=dilation_iter)
         
         return mask
     
-    def opening(self, mask: np.ndarray, kernel_size: int = 5) -> np.ndarray:
+    def opening(self, mask: np.ndarray, kernel_size: int = 5,
+                dst: np.ndarray = None) -> np.ndarray:
         """
         Operación de apertura (erosión + dilatación)
         Elimina ruido pequeño
@@ -107,14 +124,15 @@ class ColorSegmentation:
         Args:
             mask: Máscara binaria
             kernel_size: Tamaño del kernel
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Máscara procesada
         """
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        return cv2.morphologyEx(mask, cv2.MORPH_OPEN, structuring_element(kernel_size), dst=dst)
     
-    def closing(self, mask: np.ndarray, kernel_size: int = 5) -> np.ndarray:
+    def closing(self, mask: np.ndarray, kernel_size: int = 5,
+                dst: np.ndarray = None) -> np.ndarray:
         """
         Operación de cierre (dilatación + erosión)
         Rellena agujeros pequeños
@@ -122,12 +140,12 @@ class ColorSegmentation:
         Args:
             mask: Máscara binaria
             kernel_size: Tamaño del kernel
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Máscara procesada
         """
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+        return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, structuring_element(kernel_size), dst=dst)
     
     def find_largest_contour(self, mask: np.ndarray) -> Tuple[np.ndarray, float]:
         """
@@ -4,7 +4,9 @@ Detección de bordes y contornos
 
 import cv2
 import numpy as np
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+from .blob_features import BlobFeatureExtractor
 
 
 class EdgeDetector:
@@ -104,6 +106,32 @@ class EdgeDetector:
                 filtered.append(contour)
         return filtered
     
+    def filter_blobs_by_area(self, mask: np.ndarray,
+                             min_area: float = 100,
+                             max_area: float = 50000) -> Dict[str, np.ndarray]:
+        """
+        Versión vectorizada de filter_contours_by_area: trabaja directo
+        sobre la máscara con connectedComponentsWithStats, sin recorrer
+        contornos en Python (mucho más rápido con cientos de blobs de ruido)
+        
+        Args:
+            mask: Máscara binaria
+            min_area: Área mínima
+            max_area: Área máxima
+            
+        Returns:
+            Características (BlobFeatureExtractor) de los blobs que pasan el filtro
+        """
+        features = BlobFeatureExtractor().extract(mask, min_area=min_area, max_area=max_area)
+        selection = BlobFeatureExtractor.select(features, min_area, max_area)
+        
+        filtered = {key: value[selection] for key, value in features.items()
+                    if isinstance(value, np.ndarray) and key != 'labels'}
+        filtered['count'] = int(np.count_nonzero(selection))
+        filtered['labels'] = features['labels']
+        filtered['index'] = np.flatnonzero(selection)
+        return filtered
+    
     def approximate_contour(self, contour: np.ndarray, 
                            epsilon_factor: float = 0.02) -> np.ndarray:
         """
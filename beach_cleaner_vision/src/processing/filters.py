@@ -1,34 +1,48 @@
 """
 Filtros diversos para procesamiento de imagen
+
+Los kernels salen de structuring_element() (creados una vez) y los
+filtros aceptan `dst=` (buffer de salida, ver buffer_pool).
 """
 
+from typing import Tuple
+
 import cv2
 import numpy as np
 
+from .buffer_pool import scratch_pool, structuring_element
+
+
+# Modos de Filters.remove_shadows
+SHADOW_MODES = ('difference', 'normalize')
+
 
 class Filters:
     """Clase con diversos filtros de imagen"""
     
     @staticmethod
-    def median_filter(image: np.ndarray, kernel_size: int = 5) -> np.ndarray:
+    def median_filter(image: np.ndarray, kernel_size: int = 5,
+                      dst: np.ndarray = None) -> np.ndarray:
         """
         Aplica filtro de mediana para reducir ruido
         
         Args:
             image: Imagen de entrada
             kernel_size: Tamaño del kernel (debe ser impar)
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Imagen filtrada
         """
         if kernel_size % 2 == 0:
             kernel_size += 1
-        return cv2.medianBlur(image, kernel_size)
+        return cv2.medianBlur(image, kernel_size, dst=dst)
     
     @staticmethod
     def bilateral_filter(image: np.ndarray, d: int = 9, 
                         sigma_color: float = 75,
-                        sigma_space: float = 75) -> np.ndarray:
+                        sigma_space: float = 75,
+                        dst: np.ndarray = None) -> np.ndarray:
         """
         Filtro bilateral: reduce ruido preservando bordes
         
@@ -37,30 +51,33 @@ class Filters:
             d: Diámetro de vecindad
             sigma_color: Filtro en espacio de color
             sigma_space: Filtro en espacio de coordenadas
+            dst: Buffer de salida (distinto de image); None = arreglo nuevo
             
         Returns:
             Imagen filtrada
         """
-        return cv2.bilateralFilter(image, d, sigma_color, sigma_space)
+        return cv2.bilateralFilter(image, d, sigma_color, sigma_space, dst=dst)
     
     @staticmethod
     def morphological_gradient(mask: np.ndarray, 
-                               kernel_size: int = 5) -> np.ndarray:
+                               kernel_size: int = 5,
+                               dst: np.ndarray = None) -> np.ndarray:
         """
         Gradiente morfológico: diferencia entre dilatación y erosión
         
         Args:
             mask: Máscara binaria
             kernel_size: Tamaño del kernel
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Gradiente morfológico
         """
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(mask, cv2.MORPH_GRADIENT, kernel)
+        return cv2.morphologyEx(mask, cv2.MORPH_GRADIENT, structuring_element(kernel_size), dst=dst)
     
     @staticmethod
-    def top_hat(mask: np.ndarray, kernel_size: int = 9) -> np.ndarray:
+    def top_hat(mask: np.ndarray, kernel_size: int = 9,
+                dst: np.ndarray = None) -> np.ndarray:
         """
         Top Hat: diferencia entre imagen y apertura
         Resalta estructuras pequeñas brillantes
@@ -68,15 +85,16 @@ class Filters:
         Args:
             mask: Imagen de entrada
             kernel_size: Tamaño del kernel
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Transformación top hat
         """
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(mask, cv2.MORPH_TOPHAT, kernel)
+        return cv2.morphologyEx(mask, cv2.MORPH_TOPHAT, structuring_element(kernel_size), dst=dst)
     
     @staticmethod
-    def black_hat(mask: np.ndarray, kernel_size: int = 9) -> np.ndarray:
+    def black_hat(mask: np.ndarray, kernel_size: int = 9,
+                  dst: np.ndarray = None) -> np.ndarray:
         """
         Black Hat: diferencia entre cierre e imagen
         Resalta estructuras pequeñas oscuras
@@ -84,39 +102,112 @@ class Filters:
         Args:
             mask: Imagen de entrada
             kernel_size: Tamaño del kernel
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Transformación black hat
         """
-        kernel = np.ones((kernel_size, kernel_size), np.uint8)
-        return cv2.morphologyEx(mask, cv2.MORPH_BLACKHAT, kernel)
+        return cv2.morphologyEx(mask, cv2.MORPH_BLACKHAT, structuring_element(kernel_size), dst=dst)
     
     @staticmethod
-    def remove_shadows(image: np.ndarray) -> np.ndarray:
+    def remove_shadows(image: np.ndarray, dst: np.ndarray = None, scale: int = 1,
+                       mode: str = 'difference', size: int = 21) -> np.ndarray:
         """
         Intenta remover sombras de la imagen
         
+        El fondo (iluminación) se estima con dilatación (size / 3) + mediana
+        (size), que borran los objetos más chicos que size y dejan solo la
+        variación suave de la luz. Con scale > 1 el fondo se estima a
+        1/scale de resolución (kernels escalados), se reescala una sola vez
+        y se aplica en una sola pasada: mucho más barato y casi igual,
+        porque la iluminación es suave por naturaleza.
+        
         Args:
             image: Imagen BGR de entrada
+            dst: Buffer de salida (forma de image); None = arreglo nuevo
+            scale: Reducción para estimar el fondo (1 = resolución completa)
+            mode: 'difference' = 255 - |imagen - fondo| por canal (mapa de
+                  contraste); 'normalize' = imagen x promedio / fondo de la
+                  luminancia (misma ganancia en los 3 canales: conserva los
+                  colores y levanta las zonas en sombra)
+            size: Objetos más chicos que esto (px) no cuentan como fondo;
+                  para 'normalize' debe superar el tamaño de una lata
             
         Returns:
             Imagen con sombras reducidas
         """
-        rgb_planes = cv2.split(image)
-        result_planes = []
+        if mode not in SHADOW_MODES:
+            raise ValueError(f"Modo de sombras '{mode}' no válido "
+                             f"(opciones: {', '.join(SHADOW_MODES)})")
+        if dst is None:
+            dst = np.empty_like(image)
+        
+        pool = scratch_pool()
+        if mode == 'normalize':
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY,
+                                dst=pool.get(image.shape[:2], np.uint8, 'shadows.gray'))
+            background, mean = Filters._shadow_background(gray, image.shape, scale, size, pool)
+            # Normalización fusionada: dst = imagen * promedio / fondo
+            return cv2.divide(image, background, dst=dst, scale=mean)
+        
+        if scale > 1:
+            background, _ = Filters._shadow_background(image, image.shape, scale, size, pool)
+            cv2.absdiff(image, background, dst=dst)
+            return cv2.bitwise_not(dst, dst=dst)
+        
+        plane = pool.get(image.shape[:2], np.uint8, 'shadows.plane')
+        dilated_img = pool.like(plane, 'shadows.dilated')
+        bg_img = pool.like(plane, 'shadows.background')
+        kernel = structuring_element(max(1, size // 3) | 1)
+        
+        for channel in range(image.shape[2] if image.ndim == 3 else 1):
+            cv2.extractChannel(image, channel, dst=plane)
+            cv2.dilate(plane, kernel, dst=dilated_img)
+            cv2.medianBlur(dilated_img, size | 1, dst=bg_img)
+            # 255 - |plano - fondo|, escrito en el mismo buffer del fondo
+            cv2.absdiff(plane, bg_img, dst=bg_img)
+            cv2.bitwise_not(bg_img, dst=bg_img)
+            cv2.insertChannel(bg_img, dst, channel)
+        
+        return dst
+    
+    @staticmethod
+    def _shadow_background(source: np.ndarray, shape: tuple, scale: int,
+                           size: int, pool) -> Tuple[np.ndarray, float]:
+        """
+        Fondo de iluminación estimado a 1/scale y reescalado a `shape`
+        
+        Args:
+            source: Imagen (o plano de luminancia) de donde sale el fondo
+            shape: Forma del resultado; si source es un plano y shape tiene
+                   3 canales, el fondo se replica (en chico) antes de reescalar
+            
+        Returns:
+            (fondo uint8 de forma shape, promedio del fondo)
+        """
+        height, width = source.shape[:2]
+        scale = max(1, scale)
+        size_small = (max(1, width // scale), max(1, height // scale))
+        small = cv2.resize(source, size_small, interpolation=cv2.INTER_AREA,
+                           dst=pool.get(size_small[::-1] + source.shape[2:], np.uint8, 'shadows.small'))
+        work = pool.like(small, 'shadows.small_work')
         
-        for plane in rgb_planes:
-            dilated_img = cv2.dilate(plane, np.ones((7, 7), np.uint8))
-            bg_img = cv2.medianBlur(dilated_img, 21)
-            diff_img = 255 - cv2.absdiff(plane, bg_img)
-            result_planes.append(diff_img)
+        cv2.dilate(small, structuring_element(max(1, round(size / 3 / scale)) | 1), dst=work)
+        cv2.medianBlur(work, max(3, round(size / scale) | 1), dst=small)
+        mean = cv2.mean(small)[0]
         
-        return cv2.merge(result_planes)
+        if small.ndim < len(shape):
+            small = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR,
+                                 dst=pool.get(size_small[::-1] + (3,), np.uint8, 'shadows.small_bgr'))
+        background = pool.get(shape, np.uint8, 'shadows.background_full')
+        cv2.resize(small, (width, height), dst=background, interpolation=cv2.INTER_LINEAR)
+        return background, mean
     
     @staticmethod
     def adaptive_threshold(image: np.ndarray, 
                           block_size: int = 11,
-                          c: int = 2) -> np.ndarray:
+                          c: int = 2,
+                          dst: np.ndarray = None) -> np.ndarray:
         """
         Umbralización adaptativa
         
@@ -124,6 +215,7 @@ class Filters:
             image: Imagen en escala de grises
             block_size: Tamaño del vecindario (debe ser impar)
             c: Constante a restar
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Imagen binaria
@@ -133,24 +225,37 @@ class Filters:
         
         return cv2.adaptiveThreshold(image, 255,
                                      cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                     cv2.THRESH_BINARY, block_size, c)
+                                     cv2.THRESH_BINARY, block_size, c, dst=dst)
     
     @staticmethod
-    def normalize_illumination(image: np.ndarray) -> np.ndarray:
+    def normalize_illumination(image: np.ndarray, dst: np.ndarray = None,
+                               lab: np.ndarray = None, as_lab: bool = False) -> np.ndarray:
         """
         Normaliza la iluminación de la imagen
         
         Args:
             image: Imagen BGR
+            dst: Buffer de salida; None = arreglo nuevo
+            lab: LAB de image ya calculado (ej: de enhance_lighting con
+                 as_lab); se modifica en su lugar
+            as_lab: Devolver LAB en lugar de convertir a BGR
             
         Returns:
-            Imagen con iluminación normalizada
+            Imagen con iluminación normalizada (BGR, o LAB con as_lab)
         """
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
+        pool = scratch_pool()
+        if lab is None:
+            lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB,
+                               dst=dst if as_lab else pool.like(image, 'normalize.lab'))
+        l = cv2.extractChannel(lab, 0, dst=pool.get(lab.shape[:2], np.uint8, 'normalize.l'))
         
-        # Normalizar canal L
-        l_normalized = cv2.normalize(l, None, 0, 255, cv2.NORM_MINMAX)
+        # Normalizar canal L (en el mismo plano)
+        cv2.normalize(l, l, 0, 255, cv2.NORM_MINMAX)
+        cv2.insertChannel(l, lab, 0)
         
-        merged = cv2.merge([l_normalized, a, b])
-        return cv2.cvtColor(merged, cv2.COLOR_LAB2BGR)
+        if as_lab:
+            if dst is not None and dst is not lab:
+                np.copyto(dst, lab)
+                return dst
+            return lab
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=dst)
@@ -0,0 +1,352 @@
+"""
+Contexto compartido por frame
+============================================
+
+DESCRIPCIÓN:
+    Todos los detectores y el clasificador necesitan las mismas
+    representaciones del frame: HSV, escala de grises, máscaras de color,
+    máscaras limpias (morfología) y contornos.
+
+    FrameContext calcula cada una SOLO la primera vez que se pide y la
+    guarda para el resto del frame. Así cada conversión o máscara se
+    calcula una única vez por frame, aunque varios detectores la usen.
+
+USO:
+    ctx = FrameContext(frame, segmenter, filtering_config)
+    ctx.hsv                       # cvtColor una sola vez
+    ctx.mask('black')             # inRange una sola vez
+    ctx.clean_mask('black')       # morfología una sola vez
+    ctx.contours('black')         # findContours una sola vez
+
+    Se crea un FrameContext NUEVO por cada frame (no se reutiliza).
+
+    Si se pasa un ColorLookupTable, las máscaras salen del bitfield de
+    colores (una sola pasada desde BGR) y no se convierte a HSV salvo que
+    alguien pida ctx.hsv explícitamente.
+
+    Si se pasa un RegionPreprocessor (filtering.lazy_preprocessing), el
+    frame es el crudo: las máscaras de frame completo salen de él y las
+    de region_mask() salen de los píxeles preprocesados de esa región
+    (calculados bajo demanda, ver region_preprocessor).
+
+    Si se pasa un BufferPool, las representaciones del tamaño del frame
+    (HSV, gris, bitfield, máscaras, integrales) se escriben en buffers
+    reutilizados: el frame siguiente las sobrescribe, así que nada que
+    sobreviva al frame debe guardar referencias a ellas.
+"""
+
+import cv2
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .buffer_pool import BufferPool
+from .color_segmentation import ColorSegmentation
+from .color_lut import ColorLookupTable
+from .blob_features import BlobFeatureExtractor
+from .region_preprocessor import RegionPreprocessor
+
+
+class FrameContext:
+    """Representaciones del frame calculadas bajo demanda y memorizadas"""
+
+    def __init__(self, frame: np.ndarray, segmenter: ColorSegmentation,
+                 filtering_config: dict = None,
+                 color_lut: Optional[ColorLookupTable] = None,
+                 pool: Optional[BufferPool] = None,
+                 regions: Optional[RegionPreprocessor] = None):
+        """
+        Inicializa el contexto del frame
+
+        Args:
+            frame: Imagen BGR (ya preprocesada)
+            segmenter: Segmentador de color con los rangos configurados
+            filtering_config: Sección 'filtering' de detection_config.yaml
+            color_lut: Tabla BGR→colores compilada (opcional)
+            pool: Buffers reutilizados entre frames (opcional, ver buffer_pool)
+            regions: Preprocesamiento bajo demanda del frame crudo (opcional)
+        """
+        self.frame = frame
+        self.segmenter = segmenter
+        self.filtering_config = filtering_config or {}
+        self.color_lut = color_lut
+        self.pool = pool
+        self.regions = regions
+
+        self.height, self.width = frame.shape[:2]
+        self.total_pixels = self.height * self.width
+
+        self._cache: Dict[Any, Any] = {}
+
+    def get_or_compute(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """
+        Devuelve un valor memorizado o lo calcula la primera vez
+
+        Permite a cualquier detector compartir resultados intermedios
+        propios (ej: máscaras derivadas) con el resto del frame.
+
+        Args:
+            key: Clave única del valor
+            compute: Función sin argumentos que calcula el valor
+
+        Returns:
+            Valor memorizado
+        """
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def buffer(self, tag: Any, channels: int = 1, dtype: Any = np.uint8,
+               extra: int = 0) -> Optional[np.ndarray]:
+        """
+        Buffer del tamaño del frame para usar como `dst=` (None sin pool)
+
+        Args:
+            tag: Etiqueta única del buffer dentro del frame
+            channels: Canales (1 = máscara)
+            dtype: Tipo de dato
+            extra: Filas y columnas adicionales (ej: 1 para cv2.integral)
+
+        Returns:
+            Buffer reutilizado, o None para que OpenCV cree un arreglo nuevo
+        """
+        if self.pool is None:
+            return None
+        shape = (self.height + extra, self.width + extra)
+        if channels > 1:
+            shape += (channels,)
+        return self.pool.get(shape, dtype, tag)
+
+    def downscaled(self, level: int) -> 'FrameContext':
+        """
+        Contexto del frame reducido 2^level veces (nivel de pirámide)
+
+        El contexto reducido tiene su propio caché (máscaras, contornos,
+        etc.) y un kernel morfológico escalado al mismo factor.
+
+        Args:
+            level: 0 = este mismo frame, 1 = 1/2, 2 = 1/4, ...
+
+        Returns:
+            FrameContext del frame reducido (memorizado)
+        """
+        if level <= 0:
+            return self
+
+        def compute():
+            factor = 1.0 / (2 ** level)
+            dst = None
+            if self.pool is not None:
+                # Mismo redondeo que cv2.resize con fx/fy
+                shape = (round(self.height * factor), round(self.width * factor))
+                dst = self.pool.get(shape + self.frame.shape[2:], self.frame.dtype,
+                                    ('downscaled', level))
+            small = cv2.resize(self.frame, None, dst=dst, fx=factor, fy=factor,
+                               interpolation=cv2.INTER_AREA)
+            filtering = dict(self.filtering_config)
+            kernel = filtering.get('morphology_kernel', 5)
+            filtering['morphology_kernel'] = max(1, kernel // (2 ** level))
+            return FrameContext(small, self.segmenter, filtering, self.color_lut, self.pool)
+
+        return self.get_or_compute(('downscaled', level), compute)
+
+    @property
+    def hsv(self) -> np.ndarray:
+        """Frame en espacio HSV"""
+        return self.get_or_compute(
+            'hsv', lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2HSV,
+                                        dst=self.buffer('hsv', channels=3)))
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Frame en escala de grises"""
+        return self.get_or_compute(
+            'gray', lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY,
+                                         dst=self.buffer('gray')))
+
+    @property
+    def color_bits(self) -> np.ndarray:
+        """Bitfield de colores por píxel (requiere color_lut)"""
+        return self.get_or_compute(
+            'color_bits', lambda: self.color_lut.classify(
+                self.frame, dst=self.buffer('color_bits')))
+
+    def mask(self, color_name: str) -> np.ndarray:
+        """
+        Máscara binaria cruda de un color
+
+        Args:
+            color_name: Nombre del color en la configuración ('black', 'blue', ...)
+
+        Returns:
+            Máscara binaria (0/255)
+        """
+        def compute():
+            dst = self.buffer(('mask', color_name))
+            if self.color_lut is not None:
+                return self.color_lut.extract_mask(self.color_bits, color_name, dst=dst)
+            return self.segmenter.segment_by_color(self.hsv, color_name, dst=dst)
+
+        return self.get_or_compute(('mask', color_name), compute)
+
+    def clean_mask(self, color_name: str) -> np.ndarray:
+        """
+        Máscara de un color limpiada con erosión + dilatación
+
+        Args:
+            color_name: Nombre del color en la configuración
+
+        Returns:
+            Máscara binaria procesada
+        """
+        return self.get_or_compute(
+            ('clean_mask', color_name),
+            lambda: self.segmenter.apply_morphology(
+                self.mask(color_name),
+                kernel_size=self.filtering_config.get('morphology_kernel', 5),
+                erosion_iter=self.filtering_config.get('erosion_iterations', 1),
+                dilation_iter=self.filtering_config.get('dilation_iterations', 2),
+                dst=self.buffer(('clean_mask', color_name))))
+
+    def integral(self, color_name: str, clean: bool = False) -> np.ndarray:
+        """
+        Tabla de áreas sumadas (cv2.integral) de la máscara de un color
+
+        Con ella la cantidad de píxeles del color dentro de cualquier
+        rectángulo sale en O(1):
+            S[y2, x2] - S[y1, x2] - S[y2, x1] + S[y1, x1]
+
+        Args:
+            color_name: Nombre del color en la configuración
+            clean: True = sobre la máscara con morfología (clean_mask)
+
+        Returns:
+            Matriz int32 de (alto+1, ancho+1) con conteos de píxeles
+        """
+        def compute():
+            mask = self.clean_mask(color_name) if clean else self.mask(color_name)
+            # Máscara 0/255 -> 0/1 para que la suma sea conteo de píxeles
+            binary = cv2.threshold(mask, 0, 1, cv2.THRESH_BINARY,
+                                   dst=self.buffer('integral.binary'))[1]
+            return cv2.integral(binary, sum=self.buffer(('integral', color_name, clean),
+                                                        dtype=np.int32, extra=1),
+                                sdepth=cv2.CV_32S)
+
+        return self.get_or_compute(('integral', color_name, clean), compute)
+
+    def region_mask(self, color_name: str, region: Tuple[int, int, int, int],
+                    clean: bool = True) -> np.ndarray:
+        """
+        Máscara de un color SOLO dentro de una región del frame
+
+        Si la máscara completa ya fue calculada se devuelve una vista de
+        ella; si no, se segmenta únicamente la vista (sin copia) de la
+        región, sin tocar el resto del frame. Con preprocesamiento por
+        regiones se segmentan siempre los píxeles preprocesados de la región.
+
+        Args:
+            color_name: Nombre del color en la configuración
+            region: (x, y, width, height) dentro del frame
+            clean: Aplicar morfología (True) o máscara cruda (False)
+
+        Returns:
+            Máscara binaria de tamaño (height, width)
+        """
+        x, y, w, h = region
+
+        def compute():
+            full_key = ('clean_mask' if clean else 'mask', color_name)
+            if full_key in self._cache and self.regions is None:
+                return self._cache[full_key][y:y + h, x:x + w]
+
+            if clean:
+                return self.segmenter.apply_morphology(
+                    self.region_mask(color_name, region, clean=False),
+                    kernel_size=self.filtering_config.get('morphology_kernel', 5),
+                    erosion_iter=self.filtering_config.get('erosion_iterations', 1),
+                    dilation_iter=self.filtering_config.get('dilation_iterations', 2))
+
+            if self.regions is not None:
+                view = self.regions.region(region)
+            else:
+                view = self.frame[y:y + h, x:x + w]
+            if self.color_lut is not None:
+                bits = self.get_or_compute(('region_bits', region),
+                                           lambda: self.color_lut.classify(view))
+                return self.color_lut.extract_mask(bits, color_name)
+            hsv_view = self.get_or_compute(('region_hsv', region),
+                                           lambda: cv2.cvtColor(view, cv2.COLOR_BGR2HSV))
+            return self.segmenter.segment_by_color(hsv_view, color_name)
+
+        return self.get_or_compute(('region_mask', color_name, region, clean), compute)
+
+    def region_contours(self, color_name: str, region: Tuple[int, int, int, int],
+                        clean: bool = True) -> List[np.ndarray]:
+        """
+        Contornos de un color dentro de una región, en coordenadas del frame
+
+        Args:
+            color_name: Nombre del color en la configuración
+            region: (x, y, width, height) dentro del frame
+            clean: Usar la máscara limpia (True) o la cruda (False)
+
+        Returns:
+            Lista de contornos (ya desplazados al origen del frame)
+        """
+        def compute():
+            mask = self.region_mask(color_name, region, clean)
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL,
+                                           cv2.CHAIN_APPROX_SIMPLE,
+                                           offset=(region[0], region[1]))
+            return list(contours)
+
+        return self.get_or_compute(('region_contours', color_name, region, clean), compute)
+
+    def blobs(self, color_name: str,
+              region: Optional[Tuple[int, int, int, int]] = None,
+              min_area: float = 0, max_area: float = np.inf,
+              shape: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Características vectorizadas de los blobs de la máscara limpia
+
+        Args:
+            color_name: Nombre del color en la configuración
+            region: (x, y, width, height) para analizar solo esa región;
+                    None = frame completo
+            min_area, max_area: Rango de área con perímetro/circularidad
+            shape: False = solo área, caja y centroide
+
+        Returns:
+            Arreglos de BlobFeatureExtractor.extract() (coordenadas del frame)
+        """
+        def compute():
+            extractor = BlobFeatureExtractor()
+            labels = None
+            if region is None:
+                mask, offset = self.clean_mask(color_name), (0, 0)
+                labels = self.buffer(('labels', color_name, min_area, max_area, shape),
+                                     dtype=np.int32)
+            else:
+                mask, offset = self.region_mask(color_name, region), (region[0], region[1])
+            return extractor.extract(mask, offset, min_area, max_area, shape, labels)
+
+        key = ('blobs', color_name, region, min_area, max_area, shape)
+        return self.get_or_compute(key, compute)
+
+    def contours(self, color_name: str, clean: bool = True) -> List[np.ndarray]:
+        """
+        Contornos externos de la máscara de un color
+
+        Args:
+            color_name: Nombre del color en la configuración
+            clean: Usar la máscara limpia (True) o la cruda (False)
+
+        Returns:
+            Lista de contornos
+        """
+        def compute():
+            mask = self.clean_mask(color_name) if clean else self.mask(color_name)
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL,
+                                           cv2.CHAIN_APPROX_SIMPLE)
+            return list(contours)
+
+        return self.get_or_compute(('contours', color_name, clean), compute)
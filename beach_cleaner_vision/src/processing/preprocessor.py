@@ -1,11 +1,50 @@
 """
 Preprocesamiento de imágenes para mejorar calidad de detección
+
+Todos los pasos aceptan `dst=` (buffer de salida, ver buffer_pool); los
+intermedios (LAB, luminancia) salen del pool del hilo.
+
+La mejora de iluminación (CLAHE sobre L) vive en lighting.LightingNormalizer
+(filtering.lighting): objeto CLAHE persistente, entrada/salida en LAB y
+LUTs por mosaico a partir de una muestra del frame.
+El balance de blancos (white_balance.WhiteBalance, filtering.white_balance)
+son ganancias por canal suavizadas entre frames y aplicadas con cv2.LUT.
+La compensación de sombras (filtering.shadows, opcional) va antes de todo:
+fondo de iluminación estimado a baja resolución (Filters.remove_shadows).
+
+Reducción de ruido (filtering.denoise.method), de más lento a más rápido:
+    bilateral              bilateral a resolución completa (referencia)
+    bilateral_downsampled  bilateral a 1/downsample y reescalado
+    guided                 filtro guiado (la imagen es su propia guía),
+                           coeficientes calculados a 1/guided_subsample
+    gaussian / box         suavizado separable (no preserva bordes)
+    temporal               promedio móvil entre frames; los píxeles que
+                           cambian más de temporal_reset se reinician
+                           (evita estelas de objetos en movimiento)
+    none                   sin reducción de ruido
+El costo y la calidad (PSNR) de cada uno salen en tools/performance_test.py.
 """
 
 import cv2
 import numpy as np
 from typing import Tuple
 
+from utils.profiler import profiled
+from .buffer_pool import scratch_pool
+from .filters import Filters
+from .lighting import LightingNormalizer, TileLuts
+from .white_balance import WhiteBalance
+
+
+# Métodos de reducción de ruido (filtering.denoise.method)
+DENOISE_METHODS = ('bilateral', 'bilateral_downsampled', 'guided',
+                   'gaussian', 'box', 'temporal', 'none')
+
+# Kernel de nitidez (constante: no se crea por llamada)
+_SHARPEN_KERNEL = np.array([[-1, -1, -1],
+                            [-1,  9, -1],
+                            [-1, -1, -1]])
+
 
 class ImagePreprocessor:
     """Clase para preprocesar imágenes"""
@@ -19,9 +58,53 @@ class ImagePreprocessor:
         """
         self.config = config or {}
         self.gaussian_kernel = self.config.get('gaussian_kernel', 5)
+        self.lighting = LightingNormalizer(self.config.get('lighting', {}))
+        self.white_balance = WhiteBalance(self.config.get('white_balance', {}))
+        
+        # Compensación de sombras (desactivada por defecto)
+        shadows = self.config.get('shadows', {})
+        self.shadows_enabled = shadows.get('enabled', False)
+        self.shadows_scale = max(1, shadows.get('scale', 8))
+        self.shadows_size = shadows.get('size', 81)
+        self.shadows_mode = shadows.get('mode', 'normalize')
+        
+        # Reducción de ruido
+        denoise = self.config.get('denoise', {})
+        self.denoise_method = denoise.get('method', 'bilateral')
+        if self.denoise_method not in DENOISE_METHODS:
+            raise ValueError(f"Método de reducción de ruido '{self.denoise_method}' no válido "
+                             f"(opciones: {', '.join(DENOISE_METHODS)})")
+        self.bilateral_diameter = denoise.get('diameter', 9)
+        self.sigma_color = denoise.get('sigma_color', 75)
+        self.sigma_space = denoise.get('sigma_space', 75)
+        self.downsample = max(1, denoise.get('downsample', 2))
+        self.smoothing_kernel = denoise.get('kernel', 5)
+        self.guided_radius = denoise.get('guided_radius', 4)
+        self.guided_eps = denoise.get('guided_eps', 100.0)
+        self.guided_subsample = max(1, denoise.get('guided_subsample', 2))
+        self.temporal_alpha = denoise.get('temporal_alpha', 0.4)
+        self.temporal_reset = denoise.get('temporal_reset', 30)
+        
+        # Promedio acumulado (float32) del método temporal, y frame en que
+        # se actualizó cada píxel (solo con preprocesamiento por regiones)
+        self._temporal_state = None
+        self._temporal_stamp = None
+        self._temporal_frame = 0
+        
+        self._denoisers = {
+            'bilateral': self._denoise_bilateral,
+            'bilateral_downsampled': self._denoise_bilateral_downsampled,
+            'guided': self._denoise_guided,
+            'gaussian': self._denoise_gaussian,
+            'box': self._denoise_box,
+            'temporal': self._denoise_temporal
+        }
     
+    @profiled('preprocess')
     def preprocess(self, image: np.ndarray, enhance_lighting: bool = True,
-                   reduce_noise: bool = True) -> np.ndarray:
+                   reduce_noise: bool = True, dst: np.ndarray = None,
+                   luts: TileLuts = None, origin: Tuple[int, int] = (0, 0),
+                   frame_shape: Tuple[int, int] = None) -> np.ndarray:
         """
         Aplica preprocesamiento completo a la imagen
         
@@ -29,64 +112,280 @@ class ImagePreprocessor:
             image: Imagen de entrada
             enhance_lighting: Mejorar iluminación
             reduce_noise: Reducir ruido
+            dst: Buffer de salida (forma y tipo de image); None = arreglo nuevo
+            luts: LUTs de iluminación del frame completo si image es una
+                  región suya en origin (ver lighting.TileLuts)
+            frame_shape: (alto, ancho) del frame si image es una región suya
+                         en origin (estado de la reducción de ruido temporal)
             
         Returns:
-            Imagen preprocesada
+            Imagen preprocesada (dst si se pasó)
         """
-        processed = image.copy()
+        reduce_noise = reduce_noise and self.denoise_method != 'none'
+        
+        processed = image
+        
+        if self.shadows_enabled:
+            target = scratch_pool().like(image, 'preprocess.shadows') if (enhance_lighting or reduce_noise) else dst
+            processed = self.compensate_shadows(processed, dst=target)
+        elif not (enhance_lighting or reduce_noise):
+            if dst is None:
+                return image.copy()
+            np.copyto(dst, image)
+            return dst
         
         if enhance_lighting:
-            processed = self.enhance_lighting(processed)
+            # Si después se reduce ruido, el intermedio va a un buffer del hilo
+            target = scratch_pool().like(image, 'preprocess.enhanced') if reduce_noise else dst
+            processed = self.enhance_lighting(processed, dst=target, luts=luts, origin=origin)
         
         if reduce_noise:
-            processed = self.reduce_noise(processed)
+            processed = self.reduce_noise(processed, dst=dst, origin=origin,
+                                          frame_shape=frame_shape)
         
         return processed
     
-    def enhance_lighting(self, image: np.ndarray) -> np.ndarray:
+    @profiled('preprocess.enhance_lighting')
+    def enhance_lighting(self, image: np.ndarray, dst: np.ndarray = None,
+                         lab: np.ndarray = None, as_lab: bool = False,
+                         luts: TileLuts = None,
+                         origin: Tuple[int, int] = (0, 0)) -> np.ndarray:
         """
-        Mejora la iluminación usando CLAHE
+        Mejora la iluminación usando CLAHE sobre la luminancia
         
         Args:
             image: Imagen de entrada
+            dst: Buffer de salida; None = arreglo nuevo
+            lab: LAB de image ya calculado (se modifica en su lugar)
+            as_lab: Devolver LAB (para quien sigue en LAB) en lugar de BGR
+            luts: LUTs del frame completo si image es una región suya en origin
             
         Returns:
-            Imagen con iluminación mejorada
+            Imagen con iluminación mejorada (BGR, o LAB con as_lab)
         """
-        # Convertir a LAB para mejorar solo luminancia
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        
-        # Aplicar CLAHE a canal L
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        l = clahe.apply(l)
-        
-        # Recombinar
-        enhanced_lab = cv2.merge([l, a, b])
-        enhanced = cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
+        return self.lighting.apply(image, dst=dst, lab=lab, as_lab=as_lab,
+                                   luts=luts, origin=origin)
+    
+    @profiled('preprocess.shadows')
+    def compensate_shadows(self, image: np.ndarray, dst: np.ndarray = None) -> np.ndarray:
+        """
+        Compensa sombras (sombrilla, maniquí) con el fondo a baja resolución
         
-        return enhanced
+        Args:
+            image: Imagen BGR
+            dst: Buffer de salida; None = arreglo nuevo
+            
+        Returns:
+            Imagen con sombras compensadas (ver Filters.remove_shadows)
+        """
+        return Filters.remove_shadows(image, dst=dst, scale=self.shadows_scale,
+                                      mode=self.shadows_mode, size=self.shadows_size)
     
-    def reduce_noise(self, image: np.ndarray) -> np.ndarray:
+    @profiled('preprocess.reduce_noise')
+    def reduce_noise(self, image: np.ndarray, dst: np.ndarray = None,
+                     method: str = None, origin: Tuple[int, int] = (0, 0),
+                     frame_shape: Tuple[int, int] = None) -> np.ndarray:
         """
         Reduce ruido en la imagen
         
         Args:
             image: Imagen de entrada
+            dst: Buffer de salida (distinto de image); None = arreglo nuevo
+            method: Método de DENOISE_METHODS; None = el configurado
+            origin: (x, y) de image dentro del frame si es una región
+            frame_shape: (alto, ancho) del frame si image es una región
+                         (el método temporal guarda su estado por frame)
             
         Returns:
             Imagen con ruido reducido
         """
-        # Filtro bilateral: reduce ruido manteniendo bordes
-        return cv2.bilateralFilter(image, 9, 75, 75)
+        method = method or self.denoise_method
+        if method == 'none':
+            if dst is None:
+                return image.copy()
+            np.copyto(dst, image)
+            return dst
+        if method == 'temporal':
+            return self._denoise_temporal(image, dst, origin, frame_shape)
+        return self._denoisers[method](image, dst)
+    
+    def _denoise_bilateral(self, image: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """Filtro bilateral: reduce ruido manteniendo bordes"""
+        return cv2.bilateralFilter(image, self.bilateral_diameter, self.sigma_color,
+                                   self.sigma_space, dst=dst)
+    
+    def _denoise_bilateral_downsampled(self, image: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """Bilateral sobre la imagen reducida (costo / downsample²) y reescalado"""
+        factor = self.downsample
+        height, width = image.shape[:2]
+        size = (max(1, round(width / factor)), max(1, round(height / factor)))
+        
+        pool = scratch_pool()
+        small_shape = (size[1], size[0]) + image.shape[2:]
+        small = cv2.resize(image, size, dst=pool.get(small_shape, image.dtype, 'denoise.small'),
+                           interpolation=cv2.INTER_AREA)
+        # Diámetro y sigma espacial en píxeles de la imagen reducida
+        filtered = cv2.bilateralFilter(small, max(3, self.bilateral_diameter // factor),
+                                       self.sigma_color, self.sigma_space / factor,
+                                       dst=pool.like(small, 'denoise.small_filtered'))
+        return cv2.resize(filtered, (width, height), dst=dst, interpolation=cv2.INTER_LINEAR)
     
-    def gaussian_blur(self, image: np.ndarray, kernel_size: int = None) -> np.ndarray:
+    def _denoise_gaussian(self, image: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """Gaussiano separable (filas y columnas por separado)"""
+        ksize = self.smoothing_kernel | 1
+        return cv2.GaussianBlur(image, (ksize, ksize), 0, dst=dst)
+    
+    def _denoise_box(self, image: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """Promedio de caja separable (costo independiente del tamaño)"""
+        ksize = self.smoothing_kernel | 1
+        return cv2.blur(image, (ksize, ksize), dst=dst)
+    
+    def _denoise_guided(self, image: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """
+        Filtro guiado con la propia imagen como guía (He et al.)
+        
+        Por canal: q = mean(a) * p + mean(b), con a = var / (var + eps) y
+        b = (1 - a) * mean(p) en ventanas de guided_radius. En zonas planas
+        (var << eps) promedia; en bordes (var >> eps) conserva el píxel.
+        a y b se calculan a 1/guided_subsample de resolución ("fast guided
+        filter") y se reescalan antes de aplicarlos.
+        """
+        pool = scratch_pool()
+        height, width = image.shape[:2]
+        p = pool.get(image.shape, np.float32, 'guided.p')
+        np.copyto(p, image)
+        
+        factor = self.guided_subsample
+        if factor > 1:
+            size = (max(1, round(width / factor)), max(1, round(height / factor)))
+            small = cv2.resize(p, size, dst=pool.get((size[1], size[0]) + image.shape[2:],
+                                                     np.float32, 'guided.small'),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = p
+        radius = max(1, self.guided_radius // factor)
+        ksize = (2 * radius + 1, 2 * radius + 1)
+        
+        mean = cv2.boxFilter(small, -1, ksize, dst=pool.like(small, 'guided.mean'))
+        square = np.multiply(small, small, out=pool.like(small, 'guided.square'))
+        variance = cv2.boxFilter(square, -1, ksize, dst=pool.like(small, 'guided.variance'))
+        np.subtract(variance, np.multiply(mean, mean, out=square), out=variance)
+        
+        # a = var / (var + eps);  b = mean - a * mean
+        a = np.add(variance, self.guided_eps, out=square)
+        np.divide(variance, a, out=a)
+        b = np.multiply(a, mean, out=variance)
+        np.subtract(mean, b, out=b)
+        
+        mean_a = cv2.boxFilter(a, -1, ksize, dst=mean)
+        mean_b = cv2.boxFilter(b, -1, ksize, dst=pool.like(small, 'guided.mean_b'))
+        if factor > 1:
+            mean_a = cv2.resize(mean_a, (width, height), dst=pool.like(p, 'guided.mean_a_full'),
+                                interpolation=cv2.INTER_LINEAR)
+            mean_b = cv2.resize(mean_b, (width, height), dst=pool.like(p, 'guided.mean_b_full'),
+                                interpolation=cv2.INTER_LINEAR)
+        
+        np.multiply(mean_a, p, out=p)
+        np.add(p, mean_b, out=p)
+        return cv2.convertScaleAbs(p, dst=dst)
+    
+    def _denoise_temporal(self, image: np.ndarray, dst: np.ndarray,
+                          origin: Tuple[int, int] = (0, 0),
+                          frame_shape: Tuple[int, int] = None) -> np.ndarray:
+        """
+        Promedio móvil exponencial entre frames (peso temporal_alpha al nuevo)
+        
+        Donde el frame difiere del promedio más de temporal_reset niveles
+        (en luminancia: algo se movió) el promedio se reinicia con el frame
+        actual. Con frame_shape, image es una región del frame en origin
+        (preprocesamiento por regiones, ver _denoise_temporal_region).
+        """
+        if frame_shape is not None:
+            return self._denoise_temporal_region(image, dst, origin, frame_shape)
+        
+        self._temporal_frame += 1
+        state = self._temporal_state
+        if state is None or state.shape != image.shape:
+            state = self._temporal_state = image.astype(np.float32)
+            self._temporal_stamp = None
+            return cv2.convertScaleAbs(state, dst=dst)
+        if self._temporal_stamp is not None:
+            self._temporal_stamp.fill(self._temporal_frame)
+        
+        cv2.accumulateWeighted(image, state, self.temporal_alpha)
+        result = cv2.convertScaleAbs(state, dst=dst)
+        self._temporal_motion_reset(image, state, result)
+        return result
+    
+    def _denoise_temporal_region(self, image: np.ndarray, dst: np.ndarray,
+                                 origin: Tuple[int, int],
+                                 frame_shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Promedio temporal de una región, sobre el estado del frame completo
+        
+        El estado y la marca del último frame en que se actualizó cada
+        píxel tienen el tamaño del frame; la región lee y actualiza solo su
+        parte. Así regiones distintas del mismo tamaño no se mezclan:
+            - actualizado en el frame anterior: promedio normal
+            - sin actualizar desde antes: se reinicia con el valor actual
+            - ya actualizado en este frame (márgenes que se solapan): se
+              devuelve el promedio sin volver a mezclar
+        begin_frame() marca el inicio de cada frame.
+        """
+        shape = tuple(frame_shape) + image.shape[2:]
+        frame = self._temporal_frame
+        if (self._temporal_state is None or self._temporal_state.shape != shape
+                or self._temporal_stamp is None):
+            self._temporal_state = np.zeros(shape, dtype=np.float32)
+            self._temporal_stamp = np.full(frame_shape, frame - 2, dtype=np.int64)
+        
+        x, y = origin
+        height, width = image.shape[:2]
+        state = self._temporal_state[y:y + height, x:x + width]
+        stamp = self._temporal_stamp[y:y + height, x:x + width]
+        
+        pool = scratch_pool()
+        previous = np.equal(stamp, frame - 1, out=pool.get(stamp.shape, np.bool_, 'temporal.previous'))
+        stale = np.less(stamp, frame - 1, out=pool.get(stamp.shape, np.bool_, 'temporal.stale'))
+        cv2.accumulateWeighted(image, state, 1.0, mask=stale.view(np.uint8))
+        cv2.accumulateWeighted(image, state, self.temporal_alpha, mask=previous.view(np.uint8))
+        result = cv2.convertScaleAbs(state, dst=dst)
+        self._temporal_motion_reset(image, state, result, previous.view(np.uint8))
+        
+        np.maximum(stamp, frame, out=stamp)
+        return result
+    
+    def _temporal_motion_reset(self, image: np.ndarray, state: np.ndarray,
+                               result: np.ndarray, mask: np.ndarray = None):
+        """Reinicia el promedio (y el resultado) donde algo se movió"""
+        if self.temporal_reset <= 0:
+            return
+        pool = scratch_pool()
+        difference = cv2.absdiff(result, image, dst=pool.like(image, 'temporal.difference'))
+        if difference.ndim == 3:
+            # Diferencia por canal ponderada como luminancia (una pasada)
+            difference = cv2.cvtColor(difference, cv2.COLOR_BGR2GRAY, dst=pool.get(
+                image.shape[:2], np.uint8, 'temporal.difference_gray'))
+        moving = cv2.compare(difference, self.temporal_reset, cv2.CMP_GT,
+                             dst=pool.get(image.shape[:2], np.uint8, 'temporal.moving'))
+        if mask is not None:
+            np.multiply(moving, mask, out=moving)
+        cv2.copyTo(image, moving, result)
+        cv2.accumulateWeighted(image, state, 1.0, mask=moving)
+    
+    def begin_frame(self):
+        """Inicio de un frame preprocesado por regiones (estado temporal)"""
+        self._temporal_frame += 1
+    
+    def gaussian_blur(self, image: np.ndarray, kernel_size: int = None,
+                      dst: np.ndarray = None) -> np.ndarray:
         """
         Aplica desenfoque gaussiano
         
         Args:
             image: Imagen de entrada
             kernel_size: Tamaño del kernel (debe ser impar)
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Imagen desenfocada
@@ -94,27 +393,39 @@ class ImagePreprocessor:
         ksize = kernel_size or self.gaussian_kernel
         if ksize % 2 == 0:
             ksize += 1
-        return cv2.GaussianBlur(image, (ksize, ksize), 0)
+        return cv2.GaussianBlur(image, (ksize, ksize), 0, dst=dst)
     
-    def adjust_white_balance(self, image: np.ndarray) -> np.ndarray:
+    def white_balance_gains(self, image: np.ndarray) -> np.ndarray:
+        """
+        Ganancias de balance de blancos del frame (suavizadas entre frames)
+        
+        Llamar una vez por frame con el frame completo; las regiones del
+        mismo frame se corrigen con estas ganancias (ver white_balance).
+        
+        Args:
+            image: Imagen BGR completa
+            
+        Returns:
+            Ganancias B, G, R (float32)
+        """
+        return self.white_balance.update(image)
+    
+    @profiled('preprocess.white_balance')
+    def adjust_white_balance(self, image: np.ndarray, gains: np.ndarray = None,
+                             dst: np.ndarray = None) -> np.ndarray:
         """
         Ajusta balance de blancos automáticamente
         
         Args:
             image: Imagen de entrada
+            gains: Ganancias ya calculadas (ej: del frame completo al
+                   corregir solo una región); None = estimarlas en image
+            dst: Buffer de salida (puede ser image); None = arreglo nuevo
             
         Returns:
             Imagen con balance ajustado
         """
-        result = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        avg_a = np.average(result[:, :, 1])
-        avg_b = np.average(result[:, :, 2])
-        
-        result[:, :, 1] = result[:, :, 1] - ((avg_a - 128) * (result[:, :, 0] / 255.0) * 1.1)
-        result[:, :, 2] = result[:, :, 2] - ((avg_b - 128) * (result[:, :, 0] / 255.0) * 1.1)
-        
-        result = cv2.cvtColor(result, cv2.COLOR_LAB2BGR)
-        return result
+        return self.white_balance.apply(image, gains, dst=dst)
     
     def auto_canny(self, image: np.ndarray, sigma: float = 0.33) -> np.ndarray:
         """
@@ -136,17 +447,15 @@ class ImagePreprocessor:
         
         return cv2.Canny(image, lower, upper)
     
-    def sharpen(self, image: np.ndarray) -> np.ndarray:
+    def sharpen(self, image: np.ndarray, dst: np.ndarray = None) -> np.ndarray:
         """
         Aumenta nitidez de la imagen
         
         Args:
             image: Imagen de entrada
+            dst: Buffer de salida; None = arreglo nuevo
             
         Returns:
             Imagen más nítida
         """
-        kernel = np.array([[-1, -1, -1],
-                          [-1,  9, -1],
-                          [-1, -1, -1]])
-        return cv2.filter2D(image, -1, kernel)
+        return cv2.filter2D(image, -1, _SHARPEN_KERNEL, dst=dst)
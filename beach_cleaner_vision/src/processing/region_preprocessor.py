@@ -0,0 +1,155 @@
+"""
+Preprocesamiento bajo demanda por regiones
+============================================
+
+DESCRIPCIÓN:
+    ImagePreprocessor.preprocess limpia el frame completo (CLAHE +
+    reducción de ruido) aunque la mayor parte es arena que ningún detector
+    mira de cerca. Con filtering.lazy_preprocessing los detectores trabajan
+    sobre el frame crudo y solo las regiones que necesitan píxeles limpios
+    (ventanas de refinamiento de latas, franja inferior de cada lata para
+    el clasificador) se preprocesan, la primera vez que alguien las pide.
+
+    - El frame se divide en mosaicos de `tile` píxeles; cada mosaico se
+      preprocesa una sola vez por frame. Pedidos que se solapan reutilizan
+      los mosaicos ya calculados.
+    - Los mosaicos pendientes de un pedido se procesan juntos en un solo
+      recorte (con `margin` píxeles de contexto para que filtros y CLAHE
+      no vean el borde del recorte) y solo se copian los pendientes: un
+      píxel ya entregado nunca cambia dentro del frame.
+    - Balance de blancos (opcional): las ganancias salen del frame
+      completo submuestreado (una vez por frame), no de cada región.
+    - Las LUTs de CLAHE salen siempre de una muestra del frame completo
+      (una vez por frame) y cada región se ecualiza con ellas: mismo
+      resultado que el frame completo. Con CLAHE propio de cada recorte los
+      mosaicos quedan de pocos píxeles y un mosaico que cae entero sobre
+      una lata negra se estira hasta gris (la lata desaparece de la máscara).
+      La muestra es 1 de cada filtering.lighting.histogram_subsample
+      píxeles, o de histogram_subsample de esta sección si aquel es 1.
+    - Con denoise.method temporal, el promedio entre frames se guarda con
+      el tamaño del frame y cada recorte usa su parte (ver
+      ImagePreprocessor._denoise_temporal_region).
+
+USO:
+    regions = RegionPreprocessor(preprocessor, frame, lazy_config)
+    clean = regions.region((x, y, w, h))     # vista del frame preprocesado
+    regions.processed_fraction               # fracción del frame procesada
+
+    FrameContext lo usa en region_mask() si se le pasa (ver frame_context).
+
+CONFIGURACIÓN (filtering.lazy_preprocessing en detection_config.yaml):
+    enabled, tile, margin, white_balance, histogram_subsample
+    (el submuestreo y suavizado de las ganancias, en filtering.white_balance)
+    tile y margin son píxeles: scale_pixel_config los reescala con la
+    resolución de procesamiento, igual que los tamaños de denoise.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from utils.profiler import profiled
+from .lighting import TileLuts
+from .preprocessor import ImagePreprocessor
+
+
+class RegionPreprocessor:
+    """Píxeles preprocesados de un frame, calculados por mosaicos bajo demanda"""
+
+    def __init__(self, preprocessor: ImagePreprocessor, frame: np.ndarray,
+                 config: dict = None, reduce_noise: bool = True,
+                 output: Optional[np.ndarray] = None):
+        """
+        Prepara el frame (no procesa nada todavía)
+
+        Args:
+            preprocessor: Preprocesador con la configuración de filtering
+            frame: Imagen BGR cruda
+            config: Sección filtering.lazy_preprocessing
+            reduce_noise: Aplicar reducción de ruido (el gobernador la puede quitar)
+            output: Buffer del tamaño del frame para los píxeles limpios
+                    (ej: de un BufferPool); None = arreglo nuevo
+        """
+        config = config or {}
+        self.preprocessor = preprocessor
+        self.frame = frame
+        self.reduce_noise = reduce_noise
+        self.tile = max(8, config.get('tile', 32))
+        self.margin = max(0, config.get('margin', 16))
+        self.white_balance = config.get('white_balance', False)
+        self.histogram_subsample = max(1, config.get('histogram_subsample', 4))
+
+        self.height, self.width = frame.shape[:2]
+        self.output = output if output is not None else np.empty_like(frame)
+        self._done = np.zeros((-(-self.height // self.tile), -(-self.width // self.tile)), dtype=bool)
+        self._white_balance_gains: Optional[np.ndarray] = None
+        self._luts: Optional[TileLuts] = None
+        self.processed_pixels = 0
+        preprocessor.begin_frame()
+
+    @property
+    def processed_fraction(self) -> float:
+        """Fracción del frame que ya se preprocesó"""
+        return self.processed_pixels / max(1, self.height * self.width)
+
+    def region(self, region: Tuple[int, int, int, int]) -> np.ndarray:
+        """
+        Píxeles preprocesados de una región (procesa lo que falte)
+
+        Args:
+            region: (x, y, width, height) dentro del frame
+
+        Returns:
+            Vista (height, width) del frame preprocesado
+        """
+        x, y, w, h = region
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(self.width, x + w), min(self.height, y + h)
+        if x2 > x1 and y2 > y1:
+            self._ensure(x1 // self.tile, y1 // self.tile,
+                         -(-x2 // self.tile), -(-y2 // self.tile))
+        return self.output[y1:y2, x1:x2]
+
+    @profiled('preprocess.regions')
+    def _ensure(self, tx1: int, ty1: int, tx2: int, ty2: int):
+        """Procesa los mosaicos pendientes del rango [tx1, tx2) x [ty1, ty2)"""
+        pending = ~self._done[ty1:ty2, tx1:tx2]
+        if not pending.any():
+            return
+
+        # Recorte mínimo que cubre los pendientes (+ margen de contexto)
+        rows = np.flatnonzero(pending.any(axis=1))
+        cols = np.flatnonzero(pending.any(axis=0))
+        tile = self.tile
+        px1 = (tx1 + cols[0]) * tile
+        py1 = (ty1 + rows[0]) * tile
+        px2 = min(self.width, (tx1 + cols[-1] + 1) * tile)
+        py2 = min(self.height, (ty1 + rows[-1] + 1) * tile)
+
+        cx1, cy1 = max(0, px1 - self.margin), max(0, py1 - self.margin)
+        cx2, cy2 = min(self.width, px2 + self.margin), min(self.height, py2 + self.margin)
+        processed = self._process(self.frame[cy1:cy2, cx1:cx2], (cx1, cy1))
+
+        # Solo se copian los mosaicos pendientes
+        for row, col in zip(*np.nonzero(pending)):
+            ty, tx = ty1 + row, tx1 + col
+            sx1, sy1 = tx * tile, ty * tile
+            sx2, sy2 = min(self.width, sx1 + tile), min(self.height, sy1 + tile)
+            self.output[sy1:sy2, sx1:sx2] = processed[sy1 - cy1:sy2 - cy1, sx1 - cx1:sx2 - cx1]
+            self.processed_pixels += (sx2 - sx1) * (sy2 - sy1)
+            self._done[ty, tx] = True
+
+    def _process(self, crop: np.ndarray, origin: Tuple[int, int]) -> np.ndarray:
+        """Balance de blancos (opcional) + CLAHE + reducción de ruido de un recorte"""
+        if self.white_balance:
+            if self._white_balance_gains is None:
+                self._white_balance_gains = self.preprocessor.white_balance_gains(self.frame)
+            crop = self.preprocessor.adjust_white_balance(crop, self._white_balance_gains)
+
+        lighting = self.preprocessor.lighting
+        if self._luts is None:
+            stride = lighting.histogram_subsample
+            self._luts = lighting.tile_luts(self.frame, stride if stride > 1 else self.histogram_subsample)
+        return self.preprocessor.preprocess(crop, reduce_noise=self.reduce_noise,
+                                            luts=self._luts, origin=origin,
+                                            frame_shape=(self.height, self.width))
@@ -0,0 +1,115 @@
+"""
+Balance de blancos por ganancias de canal
+============================================
+
+DESCRIPCIÓN:
+    adjust_white_balance convertía el frame completo a LAB, promediaba a/b
+    en float64 y escribía expresiones float por píxel de vuelta al LAB
+    uint8. Con sol exterior el promedio de cada frame salta y el color de
+    las latas parpadea. Aquí:
+
+    - Las ganancias B, G, R (mundo gris: cada canal se lleva al promedio
+      de los tres) se estiman en float32 con 1 de cada `stride` píxeles
+      por fila y columna.
+    - Las ganancias se suavizan entre frames (promedio móvil exponencial),
+      así un cambio de nubes corrige en unos frames sin parpadeo.
+    - La corrección es una tabla de 256 entradas por canal aplicada con un
+      solo cv2.LUT sobre el BGR: sin conversión a LAB ni aritmética float
+      por píxel.
+
+USO:
+    balance = WhiteBalance(filtering_config.get('white_balance', {}))
+    gains = balance.update(frame)          # una vez por frame (suavizado)
+    balanced = balance.apply(frame, gains)
+    crop = balance.apply(frame[y:y+h, x:x+w], gains)   # mismas ganancias
+
+CONFIGURACIÓN (filtering.white_balance en detection_config.yaml):
+    stride, smoothing, max_gain
+"""
+
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+_LEVELS = np.arange(256, dtype=np.float32)
+
+
+class WhiteBalance:
+    """Ganancias de canal suavizadas en el tiempo, aplicadas con cv2.LUT"""
+
+    def __init__(self, config: dict = None):
+        """
+        Args:
+            config: Sección filtering.white_balance
+        """
+        config = config or {}
+        self.stride = max(1, config.get('stride', 4))
+        self.smoothing = min(1.0, max(0.0, config.get('smoothing', 0.2)))
+        self.max_gain = max(1.0, config.get('max_gain', 1.5))
+
+        self.gains: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def estimate(self, image: np.ndarray) -> np.ndarray:
+        """
+        Ganancias B, G, R de un solo frame (sin suavizado)
+
+        Args:
+            image: Imagen BGR
+
+        Returns:
+            float32 (3,), limitadas a [1 / max_gain, max_gain]
+        """
+        sample = np.ascontiguousarray(image[::self.stride, ::self.stride])
+        means = np.array(cv2.mean(sample)[:3], dtype=np.float32)
+        gains = means.mean() / np.maximum(means, 1.0)
+        return np.clip(gains, 1.0 / self.max_gain, self.max_gain).astype(np.float32)
+
+    def update(self, image: np.ndarray) -> np.ndarray:
+        """
+        Incorpora un frame al promedio de ganancias
+
+        Args:
+            image: Imagen BGR (el frame completo)
+
+        Returns:
+            Ganancias suavizadas (copia)
+        """
+        gains = self.estimate(image)
+        with self._lock:
+            if self.gains is None:
+                self.gains = gains
+            else:
+                self.gains += self.smoothing * (gains - self.gains)
+            return self.gains.copy()
+
+    def reset(self):
+        """Olvida el promedio (ej: al cambiar de cámara o de escena)"""
+        with self._lock:
+            self.gains = None
+
+    @staticmethod
+    def lookup_table(gains: np.ndarray) -> np.ndarray:
+        """Tabla (1, 256, 3) uint8: nivel x ganancia de cada canal, saturada"""
+        table = _LEVELS[:, None] * np.asarray(gains, dtype=np.float32)[None, :]
+        return np.clip(np.rint(table), 0, 255).astype(np.uint8).reshape(1, 256, 3)
+
+    def apply(self, image: np.ndarray, gains: np.ndarray = None,
+              dst: np.ndarray = None) -> np.ndarray:
+        """
+        Corrige una imagen (o región) con un solo cv2.LUT
+
+        Args:
+            image: Imagen BGR
+            gains: Ganancias a usar; None = update(image)
+            dst: Buffer de salida (puede ser image); None = arreglo nuevo
+
+        Returns:
+            Imagen balanceada
+        """
+        if gains is None:
+            gains = self.update(image)
+        return cv2.LUT(image, self.lookup_table(gains), dst=dst)
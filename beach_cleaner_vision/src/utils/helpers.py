@@ -187,6 +187,131 @@ def is_point_in_region(point: Tuple[int, int],
     return rx <= x <= rx + rw and ry <= y <= ry + rh
 
 
+def expand_region(region: Tuple[float, float, float, float], margin: float,
+                  frame_width: int, frame_height: int) -> Tuple[int, int, int, int]:
+    """
+    Expande una región con un margen y la recorta al frame
+    
+    Args:
+        region: (x, y, width, height)
+        margin: Píxeles a agregar por cada lado
+        frame_width: Ancho del frame
+        frame_height: Alto del frame
+        
+    Returns:
+        (x, y, width, height) en enteros, dentro del frame
+    """
+    x, y, w, h = region
+    x1 = int(max(0, np.floor(x - margin)))
+    y1 = int(max(0, np.floor(y - margin)))
+    x2 = int(min(frame_width, np.ceil(x + w + margin)))
+    y2 = int(min(frame_height, np.ceil(y + h + margin)))
+    return (x1, y1, max(0, x2 - x1), max(0, y2 - y1))
+
+
+def merge_regions(regions: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """
+    Une regiones que se traslapan para no procesar píxeles dos veces
+    
+    Args:
+        regions: Lista de (x, y, width, height)
+        
+    Returns:
+        Lista de regiones sin traslapes entre sí
+    """
+    merged = [r for r in regions if r[2] > 0 and r[3] > 0]
+    
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                ax, ay, aw, ah = merged[i]
+                bx, by, bw, bh = merged[j]
+                if ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah:
+                    x1, y1 = min(ax, bx), min(ay, by)
+                    x2, y2 = max(ax + aw, bx + bw), max(ay + ah, by + bh)
+                    merged[i] = (x1, y1, x2 - x1, y2 - y1)
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    
+    return merged
+
+
+# Parámetros de detection_config.yaml expresados en píxeles
+# (sección, ..., clave): exponente del factor de escala (1 = longitud, 2 = área)
+# Las longitudes se redondean a enteros >= 1; las áreas quedan en float.
+# Los factores de submuestreo (downsample, guided_subsample, stride, scale)
+# no son longitudes: a cualquier resolución reducen lo mismo.
+PIXEL_CONFIG_KEYS = {
+    ('camera_model', 'focal_length_px'): 1,
+    ('can_detection', 'min_area'): 2,
+    ('can_detection', 'max_area'): 2,
+    ('tracking', 'max_center_distance'): 1,
+    ('search_windows', 'min_margin'): 1,
+    ('container_detection', 'min_radius'): 1,
+    ('container_detection', 'max_radius'): 1,
+    ('boundary_detection', 'edge_threshold'): 1,
+    ('boundary_detection', 'warning_distance'): 1,
+    ('boundary_detection', 'min_region_area'): 2,
+    ('obstacle_detection', 'min_area'): 2,
+    ('obstacle_detection', 'max_distance'): 1,
+    ('obstacle_detection', 'exclusion_margin'): 1,
+    ('filtering', 'gaussian_kernel'): 1,
+    ('filtering', 'morphology_kernel'): 1,
+    ('filtering', 'shadows', 'size'): 1,
+    ('filtering', 'denoise', 'diameter'): 1,
+    ('filtering', 'denoise', 'sigma_space'): 1,
+    ('filtering', 'denoise', 'kernel'): 1,
+    ('filtering', 'denoise', 'guided_radius'): 1,
+    ('filtering', 'lazy_preprocessing', 'tile'): 1,
+    ('filtering', 'lazy_preprocessing', 'margin'): 1,
+}
+
+
+def _copy_sections(values: Any) -> Any:
+    """Copia los diccionarios anidados (las hojas se comparten)"""
+    if isinstance(values, dict):
+        return {key: _copy_sections(value) for key, value in values.items()}
+    return values
+
+
+def scale_pixel_config(config: Dict[str, Any], factor: float) -> Dict[str, Any]:
+    """
+    Copia la configuración de detección con los umbrales en píxeles
+    reescalados a otra resolución de procesamiento
+    
+    Args:
+        config: Configuración de detección (detection_config.yaml)
+        factor: Escala de la nueva resolución (ej: 0.5 = mitad de ancho y alto)
+        
+    Returns:
+        Nueva configuración (la original no se modifica)
+    """
+    scaled = _copy_sections(config)
+    if factor == 1.0:
+        return scaled
+    
+    for path, power in PIXEL_CONFIG_KEYS.items():
+        values = scaled
+        for section in path[:-1]:
+            values = values.get(section) if isinstance(values, dict) else None
+        key = path[-1]
+        if not isinstance(values, dict) or key not in values:
+            continue
+        value = values[key] * factor ** power
+        if power == 1:
+            # Longitudes: OpenCV exige enteros (radios de Hough, kernels, ...)
+            # margin puede ser 0 (sin contexto) y así se queda
+            value = max(1 if values[key] > 0 else 0, int(round(value)))
+        values[key] = value
+    
+    return scaled
+
+
 def clamp(value: float, min_value: float, max_value: float) -> float:
     """
     Limita un valor entre un mínimo y máximo
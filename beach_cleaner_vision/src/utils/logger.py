@@ -1,88 +1,346 @@
 """
 Sistema de logging para Beach Cleaner Vision
+============================================
+
+DESCRIPCIÓN:
+    Modo asíncrono (por defecto): los hilos del pipeline solo encolan el
+    registro (QueueHandler) y un hilo de fondo (QueueListener) lo formatea
+    y lo escribe en consola y archivo. Un log por frame ya no hace E/S de
+    disco ni de consola en el hilo de detección.
+
+    - Cola acotada: si se llena, el registro nuevo se descarta y se cuenta
+      (el hilo que loguea nunca se bloquea)
+    - Límite de frecuencia por mensaje: cada llamada (archivo + línea, o la
+      clave explícita `key`) deja pasar como máximo `burst` registros por
+      `interval` segundos; el resto se cuenta como suprimido y el siguiente
+      que pasa lo indica en su texto
+    - Contadores en get_logging_stats() (también en pipeline.get_stats())
+
+USO:
+    from utils.logger import get_logger, configure_logging
+
+    configure_logging(vision_config.get('logging', {}))
+    logger = get_logger('pipeline')
+    logger.warning(f"Frame {n} sin detecciones", key='sin_detecciones')
+
+CONFIGURACIÓN (logging en vision_config.yaml):
+    level, save_to_file, log_dir, include_timestamp, async, queue_size,
+    rate_limit {enabled, burst, interval}. Los loggers ya creados se
+    reconfiguran.
 """
 
+import atexit
 import logging
-import os
+import queue
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# Configuración vigente (sección 'logging' de vision_config.yaml)
+_settings: Dict[str, Any] = {
+    'level': logging.INFO,
+    'save_to_file': True,
+    'log_dir': 'logs',
+    'include_timestamp': True,
+    'async': True,
+    'queue_size': 10000,
+    'rate_limit': {'enabled': True, 'burst': 10, 'interval': 1.0},
+}
+
+# Destinos reales (consola, archivo) de cada logger, por nombre
+_outputs: Dict[str, List[logging.Handler]] = {}
+# Nivel pedido explícitamente al crear cada logger (ausente = el de la configuración)
+_requested_levels: Dict[str, int] = {}
+# Directorio pedido explícitamente al crear cada logger (ausente = log_dir de la configuración)
+_requested_dirs: Dict[str, str] = {}
+_setup_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """Deja pasar como máximo `burst` registros por `interval` segundos por mensaje"""
+
+    def __init__(self, burst: int = 10, interval: float = 1.0):
+        super().__init__()
+        self.enabled = True
+        self.burst = burst
+        self.interval = interval
+        self.suppressed = 0
+        self.suppressed_by_key: Dict[str, int] = {}
+        # clave → [inicio de ventana, registros en la ventana, suprimidos en la ventana]
+        self._windows: Dict[Any, List] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.enabled:
+            return True
+
+        key = getattr(record, 'rate_key', None) or (record.name, record.pathname, record.lineno)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or record.created - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [record.created, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} [+{suppressed} similares suprimidos]"
+                return True
+
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            self.suppressed += 1
+            label = key if isinstance(key, str) else f"{key[0]}:{Path(key[1]).name}:{key[2]}"
+            self.suppressed_by_key[label] = self.suppressed_by_key.get(label, 0) + 1
+            return False
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler que nunca bloquea: con la cola llena descarta y cuenta"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Sin formatear aquí: el formato lo hace el hilo de fondo
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Router(logging.Handler):
+    """Entrega cada registro a los destinos de su logger (en el hilo de fondo)"""
+
+    def handle(self, record: logging.LogRecord):
+        for handler in _outputs.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+_rate_limiter = RateLimitFilter()
+_queue_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def _start_listener():
+    """Crea la cola compartida y arranca el hilo de escritura (una vez)"""
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+    log_queue = queue.Queue(maxsize=_settings['queue_size'])
+    _queue_handler = _DroppingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, _Router())
+    _listener.start()
+
+
+def _stop_listener():
+    """
+    Vacía la cola (escribe lo pendiente) y detiene el hilo de fondo
+
+    Como logging.shutdown, ignora OSError/ValueError: al salir (atexit) la
+    consola puede estar ya cerrada (stdout redirigido, captura de pytest).
+    """
+    global _listener
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except (OSError, ValueError):
+            pass
+        _listener = None
+    for handlers in _outputs.values():
+        for handler in handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                pass
+
+
+def shutdown_logging():
+    """
+    Escribe los registros pendientes y detiene el hilo de fondo
+
+    Los loggers pasan a escribir directo (modo síncrono), así los mensajes
+    del cierre no se pierden en una cola que ya nadie atiende.
+    """
+    with _setup_lock:
+        _stop_listener()
+        _settings['async'] = False
+        for name in _outputs:
+            _attach(name)
+
+
+atexit.register(shutdown_logging)
+
+
+def _build_outputs(name: str) -> List[logging.Handler]:
+    """Handlers de consola y archivo de un logger según la configuración"""
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    # Handler para consola
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers: List[logging.Handler] = [console_handler]
+
+    # Handler para archivo (se crea al escribir el primer registro)
+    if _settings['save_to_file']:
+        log_path = Path(_requested_dirs.get(name, _settings['log_dir']))
+        log_path.mkdir(parents=True, exist_ok=True)
+        suffix = f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}" if _settings['include_timestamp'] else ''
+        file_handler = logging.FileHandler(log_path / f'{name}{suffix}.log',
+                                           encoding='utf-8', delay=True)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    return handlers
+
+
+def _attach(name: str):
+    """Conecta un logger a sus destinos (directo o por la cola)"""
+    logger = logging.getLogger(name)
+    level = _requested_levels.get(name, _settings['level'])
+    logger.setLevel(level)
+    for handler in _outputs[name]:
+        handler.setLevel(level)
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    if _settings['async']:
+        _start_listener()
+        logger.addHandler(_queue_handler)
+    else:
+        for handler in _outputs[name]:
+            logger.addHandler(handler)
+
+
+def configure_logging(config: Optional[dict] = None):
+    """
+    Aplica la sección 'logging' de vision_config.yaml a todos los loggers
+
+    Args:
+        config: {'level', 'save_to_file', 'log_dir', 'include_timestamp',
+                 'async', 'queue_size', 'rate_limit': {'enabled', 'burst', 'interval'}}
+    """
+    config = config or {}
+    level = config.get('level', _settings['level'])
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+
+    with _setup_lock:
+        restart = (config.get('queue_size', _settings['queue_size']) != _settings['queue_size']
+                   or not config.get('async', _settings['async']))
+        if restart:
+            _stop_listener()
+
+        file_keys = ('save_to_file', 'log_dir', 'include_timestamp')
+        reopen = any(config.get(key, _settings[key]) != _settings[key] for key in file_keys)
+        for key in file_keys + ('async', 'queue_size'):
+            _settings[key] = config.get(key, _settings[key])
+        _settings['level'] = level
+
+        rate_limit = dict(_settings['rate_limit'], **config.get('rate_limit', {}))
+        _settings['rate_limit'] = rate_limit
+        _rate_limiter.enabled = rate_limit['enabled']
+        _rate_limiter.burst = rate_limit['burst']
+        _rate_limiter.interval = rate_limit['interval']
+
+        # Destinos nuevos si cambió el archivo y reconexión de cada logger
+        for name in list(_outputs):
+            if reopen:
+                for handler in _outputs[name]:
+                    handler.close()
+                _outputs[name] = _build_outputs(name)
+            _attach(name)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Modo, registros en cola, descartados por cola llena y suprimidos por frecuencia"""
+    top = sorted(_rate_limiter.suppressed_by_key.items(), key=lambda item: item[1], reverse=True)
+    return {
+        'async': _settings['async'],
+        'queued': _queue_handler.queue.qsize() if _queue_handler is not None else 0,
+        'dropped': _queue_handler.dropped if _queue_handler is not None else 0,
+        'suppressed': _rate_limiter.suppressed,
+        'suppressed_by_key': dict(top[:10])
+    }
 
 
 class Logger:
     """Clase para gestionar logging del sistema"""
-    
-    def __init__(self, name='beach_cleaner', log_dir='logs', level=logging.INFO):
+
+    def __init__(self, name='beach_cleaner', log_dir=None, level=None):
         """
         Inicializa el logger
-        
+
         Args:
             name: Nombre del logger
-            log_dir: Directorio para guardar logs
-            level: Nivel de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+            log_dir: Directorio para guardar logs (None = el de la configuración)
+            level: Nivel de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL;
+                   None = el de la configuración)
         """
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(level)
-        
+
         # Evitar duplicar handlers
-        if self.logger.handlers:
-            return
-            
-        # Crear directorio de logs si no existe
-        log_path = Path(log_dir)
-        log_path.mkdir(parents=True, exist_ok=True)
-        
-        # Formato de log
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
-        # Handler para consola
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(level)
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-        
-        # Handler para archivo
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_handler = logging.FileHandler(
-            log_path / f'{name}_{timestamp}.log',
-            encoding='utf-8'
-        )
-        file_handler.setLevel(level)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-    
-    def debug(self, message):
+        with _setup_lock:
+            if name in _outputs:
+                return
+
+            # Solo para este logger: el log_dir global se cambia con configure_logging
+            if log_dir is not None:
+                _requested_dirs[name] = log_dir
+            if level is not None:
+                _requested_levels[name] = level
+            _outputs[name] = _build_outputs(name)
+            self.logger.addFilter(_rate_limiter)
+            _attach(name)
+
+    def debug(self, message, key=None):
         """Log mensaje de debug"""
-        self.logger.debug(message)
-    
-    def info(self, message):
+        self.logger.debug(message, extra=_extra(key), stacklevel=2)
+
+    def info(self, message, key=None):
         """Log mensaje informativo"""
-        self.logger.info(message)
-    
-    def warning(self, message):
+        self.logger.info(message, extra=_extra(key), stacklevel=2)
+
+    def warning(self, message, key=None):
         """Log advertencia"""
-        self.logger.warning(message)
-    
-    def error(self, message):
+        self.logger.warning(message, extra=_extra(key), stacklevel=2)
+
+    def error(self, message, key=None):
         """Log error"""
-        self.logger.error(message)
-    
-    def critical(self, message):
+        self.logger.error(message, extra=_extra(key), stacklevel=2)
+
+    def critical(self, message, key=None):
         """Log crítico"""
-        self.logger.critical(message)
+        self.logger.critical(message, extra=_extra(key), stacklevel=2)
 
 
-def get_logger(name='beach_cleaner', log_dir='logs', level=logging.INFO):
+def _extra(key: Optional[str]) -> Optional[dict]:
+    """Clave explícita del límite de frecuencia (None = archivo + línea de la llamada)"""
+    return {'rate_key': key} if key is not None else None
+
+
+def get_logger(name='beach_cleaner', log_dir=None, level=None):
     """
     Función helper para obtener un logger
-    
+
     Args:
         name: Nombre del logger
-        log_dir: Directorio para logs
-        level: Nivel de logging
-        
+        log_dir: Directorio para logs (None = el de la configuración)
+        level: Nivel de logging (None = el de la configuración)
+
     Returns:
         Instancia de Logger
     """
@@ -0,0 +1,241 @@
+"""
+Instrumentación de etapas (histogramas de latencia)
+============================================
+
+DESCRIPCIÓN:
+    Cuando los FPS caen en el escenario hay que ver QUÉ etapa se volvió
+    lenta sin conectar un profiler. Cada etapa del pipeline y cada método
+    de detector registra su duración en un histograma circular de tamaño
+    fijo (las últimas `window` mediciones), del que se sacan p50/p99,
+    máximo y número de llamadas.
+
+    - Sin reservar memoria por medición: el buffer circular se crea una vez
+    - Desactivado: cada medición cuesta una comprobación de bandera (el
+      decorador llama directo a la función y el context manager devuelve
+      un objeto vacío compartido)
+    - Se reporta periódicamente por utils.logger, con get_stats() y en el
+      overlay del display (Visualizer)
+
+USO:
+    from utils.profiler import profiler, profiled
+
+    @profiled('detection.cans')
+    def detect(self, ctx): ...
+
+    with profiler.stage('preprocess'):
+        processed = preprocessor.preprocess(frame)
+
+    profiler.get_stats()   # {'preprocess': {'count', 'p50_ms', 'p99_ms', 'max_ms', ...}}
+
+    Los nombres de etapa usan prefijo por grupo ('pipeline.', 'detection.',
+    'classification.', ...), los mismos que tools/performance_test.py.
+
+CONFIGURACIÓN (performance.profiling en detection_config.yaml):
+    enabled, window, report_interval (s, 0 = no reportar)
+"""
+
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .logger import get_logger
+
+
+class StageHistogram:
+    """Últimas N duraciones de una etapa en un buffer circular"""
+
+    __slots__ = ('name', 'count', 'max_ms', '_samples', '_index', '_size')
+
+    def __init__(self, name: str, size: int = 256):
+        """
+        Args:
+            name: Nombre de la etapa
+            size: Mediciones que se conservan (ventana de los percentiles)
+        """
+        self.name = name
+        self.count = 0
+        self.max_ms = 0.0
+        self._size = max(1, size)
+        self._samples: List[float] = [0.0] * self._size
+        self._index = 0
+
+    def record(self, elapsed_ms: float):
+        """Registra una duración (ms)"""
+        self._samples[self._index] = elapsed_ms
+        self._index = (self._index + 1) % self._size
+        self.count += 1
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def window(self) -> np.ndarray:
+        """Mediciones de la ventana actual (sin orden)"""
+        return np.array(self._samples[:min(self.count, self._size)])
+
+    def summary(self) -> Dict:
+        """Llamadas, p50/p99/media de la ventana (ms) y máximo histórico (ms)"""
+        samples = self.window()
+        if samples.size == 0:
+            return {'count': 0}
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {
+            'count': self.count,
+            'p50_ms': float(p50),
+            'p99_ms': float(p99),
+            'mean_ms': float(samples.mean()),
+            'max_ms': self.max_ms
+        }
+
+    def reset(self):
+        """Olvida las mediciones"""
+        self.count = 0
+        self.max_ms = 0.0
+        self._index = 0
+
+
+class _Timer:
+    """Context manager que mide un bloque y lo registra en un histograma"""
+
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram: StageHistogram):
+        self._histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.record((time.perf_counter() - self._start) * 1000.0)
+        return False
+
+
+class _NullTimer:
+    """Context manager vacío (instrumentación desactivada)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Profiler:
+    """Registro de histogramas por etapa"""
+
+    def __init__(self, enabled: bool = True, window: int = 256, report_interval: float = 30.0):
+        """
+        Inicializa el registro
+
+        Args:
+            enabled: Medir (False = costo casi nulo)
+            window: Mediciones por etapa para los percentiles
+            report_interval: Segundos entre reportes por log (0 = nunca)
+        """
+        self.enabled = enabled
+        self.window = window
+        self.report_interval = report_interval
+        self.logger = get_logger('profiler')
+
+        self._histograms: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+        self._last_report = time.monotonic()
+
+    def configure(self, config: Optional[dict] = None):
+        """
+        Aplica la sección performance.profiling de detection_config.yaml
+
+        Los histogramas existentes se descartan si cambia la ventana.
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.report_interval = config.get('report_interval', 30.0)
+        window = config.get('window', 256)
+        if window != self.window:
+            self.window = window
+            with self._lock:
+                self._histograms = {}
+
+    def histogram(self, name: str) -> StageHistogram:
+        """Histograma de una etapa (se crea la primera vez)"""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    name, StageHistogram(name, self.window))
+        return histogram
+
+    def stage(self, name: str):
+        """
+        Context manager que mide el bloque como la etapa `name`
+
+        Args:
+            name: Nombre de la etapa
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(name))
+
+    def record(self, name: str, elapsed_ms: float):
+        """Registra una duración ya medida (ms)"""
+        if self.enabled:
+            self.histogram(name).record(elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Resumen por etapa: {nombre: {'count', 'p50_ms', 'p99_ms', 'mean_ms', 'max_ms'}}"""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        return {h.name: h.summary() for h in sorted(histograms, key=lambda h: h.name)}
+
+    def maybe_report(self):
+        """Escribe el resumen en el log si pasó report_interval desde el anterior"""
+        if not self.enabled or self.report_interval <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+
+        parts = [f"{name} {s['p50_ms']:.1f}/{s['p99_ms']:.1f}/{s['max_ms']:.1f} ({s['count']})"
+                 for name, s in self.get_stats().items() if s['count']]
+        if parts:
+            self.logger.info("Etapas p50/p99/máx ms (llamadas): " + ", ".join(parts))
+
+    def reset(self):
+        """Olvida todas las mediciones"""
+        with self._lock:
+            for histogram in self._histograms.values():
+                histogram.reset()
+
+
+# Registro global: lo comparten todos los módulos del proceso
+profiler = Profiler()
+
+
+def profiled(name: str) -> Callable:
+    """
+    Decorador que mide cada llamada de la función como la etapa `name`
+
+    Args:
+        name: Nombre de la etapa
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.histogram(name).record((time.perf_counter() - start) * 1000.0)
+        return wrapper
+    return decorator
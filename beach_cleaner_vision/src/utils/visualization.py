@@ -6,6 +6,7 @@ import cv2
 import numpy as np
 from typing import List, Tuple, Dict, Any
 from .helpers import draw_text_with_background
+from .profiler import profiled
 
 
 class Visualizer:
@@ -24,18 +25,25 @@ class Visualizer:
         'background': (0, 0, 0)
     }
     
-    def __init__(self, show_fps=True, show_labels=True):
+    # Etapas más lentas mostradas bajo los FPS
+    MAX_STAGE_LINES = 8
+    
+    def __init__(self, show_fps=True, show_labels=True, show_stages=False):
         """
         Inicializa el visualizador
         
         Args:
             show_fps: Mostrar FPS
             show_labels: Mostrar etiquetas de objetos
+            show_stages: Mostrar bajo los FPS el tiempo por etapa (utils.profiler)
         """
         self.show_fps = show_fps
         self.show_labels = show_labels
+        self.show_stages = show_stages
         self.fps = 0
+        self.stage_stats = {}
     
+    @profiled('visualization.draw_detections')
     def draw_detections(self, image: np.ndarray, 
                         detections: Dict[str, List[Dict[str, Any]]]) -> np.ndarray:
         """
@@ -93,7 +101,8 @@ class Visualizer:
         if self.show_labels:
             label = f"Lata {'ORGANICA' if can_type == 'organic' else 'INORGANICA'}"
             if 'distance' in can:
-                label += f" ({can['distance']:.0f}px)"
+                # CanDetector._estimate_distance devuelve centímetros
+                label += f" ({can['distance']:.0f}cm)"
             draw_text_with_background(image, label, 
                                       (center[0] - 40, center[1] - radius - 10),
                                       font_scale=0.5, thickness=1,
@@ -135,8 +144,9 @@ class Visualizer:
     
     def _draw_obstacle(self, image: np.ndarray, obstacle: Dict[str, Any]):
         """Dibuja un obstáculo detectado"""
-        if 'region' in obstacle:
-            x, y, w, h = obstacle['region']
+        region = obstacle.get('region', obstacle.get('bounding_box'))
+        if region is not None:
+            x, y, w, h = region
             cv2.rectangle(image, (x, y), (x+w, y+h),
                          self.COLORS['obstacle'], 2)
             
@@ -147,17 +157,40 @@ class Visualizer:
                                           text_color=self.COLORS['obstacle'])
     
     def _draw_fps(self, image: np.ndarray):
-        """Dibuja FPS en la esquina"""
+        """Dibuja FPS en la esquina y, debajo, las etapas más lentas (p50/p99)"""
         fps_text = f"FPS: {self.fps:.1f}"
         draw_text_with_background(image, fps_text, (10, 30),
                                   font_scale=0.7, thickness=2,
                                   text_color=self.COLORS['text'],
                                   bg_color=self.COLORS['background'])
+        
+        if not self.show_stages:
+            return
+        
+        stages = sorted(((name, stats) for name, stats in self.stage_stats.items()
+                         if stats.get('count')),
+                        key=lambda item: item[1]['p50_ms'], reverse=True)
+        for row, (name, stats) in enumerate(stages[:self.MAX_STAGE_LINES]):
+            text = f"{name} {stats['p50_ms']:.1f}/{stats['p99_ms']:.1f} ms"
+            draw_text_with_background(image, text, (10, 55 + 20 * row),
+                                      font_scale=0.45, thickness=1,
+                                      text_color=self.COLORS['text'],
+                                      bg_color=self.COLORS['background'],
+                                      padding=3)
     
     def update_fps(self, fps: float):
         """Actualiza el valor de FPS"""
         self.fps = fps
     
+    def update_stage_stats(self, stage_stats: Dict[str, Dict[str, float]]):
+        """
+        Actualiza el tiempo por etapa del overlay
+        
+        Args:
+            stage_stats: Resumen por etapa (utils.profiler.Profiler.get_stats)
+        """
+        self.stage_stats = stage_stats
+    
     def draw_hsv_ranges(self, image: np.ndarray, masks: Dict[str, np.ndarray]) -> np.ndarray:
         """
         Dibuja las máscaras de color HSV lado a lado
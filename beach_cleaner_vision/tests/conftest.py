@@ -0,0 +1,15 @@
+"""
+Configuración común de las pruebas (pytest)
+
+Las pruebas importan los módulos igual que main.py y tools/: con src/ y
+tools/ en sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for folder in ('src', 'tools'):
+    path = str(ROOT / folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
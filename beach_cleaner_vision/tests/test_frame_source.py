@@ -0,0 +1,39 @@
+"""
+Un backend sin _open o _grab debe fallar al crearlo
+
+Antes el NotImplementedError salía dentro del hilo de captura, donde solo
+quedaba en el log.
+"""
+
+import numpy as np
+import pytest
+
+from capture.frame_source import FrameSource
+
+
+class _NoGrab(FrameSource):
+    def _open(self):
+        pass
+
+
+class _Constant(FrameSource):
+    def _open(self):
+        pass
+
+    def _grab(self):
+        return np.zeros((4, 4, 3), np.uint8), 0.0
+
+
+def test_backend_without_grab_fails_when_constructed():
+    with pytest.raises(TypeError):
+        _NoGrab('incompleta')
+
+
+def test_complete_backend_still_publishes_frames():
+    source = _Constant('constante')
+    source.start()
+    try:
+        packet = source.read(timeout=1.0)
+    finally:
+        source.stop()
+    assert packet is not None and packet['sequence'] >= 1
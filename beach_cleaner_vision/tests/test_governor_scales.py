@@ -0,0 +1,71 @@
+"""
+El pipeline completo debe funcionar en todos los niveles del gobernador
+
+Los umbrales en píxeles se reescalan con scale_pixel_config; OpenCV exige
+enteros en varios de ellos (radios de HoughCircles, kernels).
+"""
+
+import copy
+
+import cv2
+import numpy as np
+import pytest
+
+from core.vision_pipeline import VisionPipeline
+from synthetic_scene import ROOT, RING_COLORS, SceneGenerator
+from utils.helpers import PIXEL_CONFIG_KEYS, load_config, scale_pixel_config
+
+
+def _configs():
+    camera_config = load_config(str(ROOT / 'config' / 'camera_config.yaml'))
+    detection_config = load_config(str(ROOT / 'config' / 'detection_config.yaml'))
+    return camera_config, detection_config
+
+
+def _frame_with_partial_ring() -> np.ndarray:
+    """Escena sintética + aro rojo cortado por el borde (fuerza el camino de Hough)"""
+    frame, _ = SceneGenerator(640, 480, cans=4, seed=3, containers=()).render(0)
+    cv2.circle(frame, (600, 240), 90, RING_COLORS['red'], 14, lineType=cv2.LINE_AA)
+    return frame
+
+
+def test_pixel_lengths_are_integers():
+    _, detection_config = _configs()
+    scaled = scale_pixel_config(detection_config, 0.75)
+    for path, power in PIXEL_CONFIG_KEYS.items():
+        value = scaled
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if power == 1 and value is not None:
+            assert isinstance(value, int) and value >= 1, (path, value)
+
+
+def test_nested_pixel_lengths_scale_without_touching_the_original():
+    _, detection_config = _configs()
+    filtering = detection_config['filtering']
+    scaled = scale_pixel_config(detection_config, 0.5)['filtering']
+
+    assert scaled['lazy_preprocessing']['tile'] == filtering['lazy_preprocessing']['tile'] // 2
+    assert scaled['lazy_preprocessing']['margin'] == filtering['lazy_preprocessing']['margin'] // 2
+    assert scaled['denoise']['diameter'] == round(filtering['denoise']['diameter'] / 2)
+    # Factores de submuestreo: no son longitudes
+    assert scaled['denoise']['downsample'] == filtering['denoise']['downsample']
+    assert scaled['lazy_preprocessing'] is not filtering['lazy_preprocessing']
+    assert load_config(str(ROOT / 'config' / 'detection_config.yaml')) == detection_config
+
+
+@pytest.mark.parametrize('level', range(4))
+def test_process_frame_at_every_governor_level(level):
+    camera_config, detection_config = _configs()
+    detection_config = copy.deepcopy(detection_config)
+    detection_config['performance']['governor']['enabled'] = False
+    pipeline = VisionPipeline(camera_config, detection_config)
+
+    levels = pipeline.governor.levels
+    pipeline.governor.level = min(level, len(levels) - 1)
+    pipeline._build_detectors(pipeline.governor.resize_factor)
+
+    results = pipeline.process_frame(_frame_with_partial_ring())
+
+    assert results['processing_scale'] == pipeline.governor.resize_factor
+    assert any(container['color'] == 'red' for container in results['containers'])
@@ -0,0 +1,50 @@
+"""
+Reproducir una grabación en lockstep no debe marcar el límite fuera de plazo
+
+En lockstep la captura espera a que la detección vacíe su cola; esa espera
+no es latencia del carril del límite.
+"""
+
+import time
+
+from capture.recording import FrameRecorder
+from core.vision_pipeline import VisionPipeline
+from synthetic_scene import ROOT, SceneGenerator
+from utils.helpers import load_config
+
+
+FRAMES = 20
+
+
+def test_lockstep_replay_has_no_spurious_deadline_misses(tmp_path):
+    path = str(tmp_path / 'replay.bcvraw')
+    generator = SceneGenerator(640, 480, cans=4, seed=5)
+    recorder = FrameRecorder(path, FRAMES)
+    for index in range(FRAMES):
+        frame, _ = generator.render(index)
+        recorder.write(frame, time.monotonic())
+    recorder.close()
+
+    camera_config = load_config(str(ROOT / 'config' / 'camera_config.yaml'))
+    camera_config['camera']['source'] = 'recording'
+    camera_config['camera']['recording'] = {'path': path, 'loop': False, 'realtime': False}
+    camera_config['camera'].get('record', {})['enabled'] = False
+    camera_config['display'] = {'enabled': False}
+    detection_config = load_config(str(ROOT / 'config' / 'detection_config.yaml'))
+    detection_config['performance']['governor']['enabled'] = False
+    # Plazo holgado para CI, pero muy por debajo de lo que tarda la detección
+    detection_config['boundary_fast_lane']['deadline_ms'] = 50
+
+    pipeline = VisionPipeline(camera_config, detection_config)
+    boundaries = []
+    pipeline.add_boundary_callback(boundaries.append)
+    pipeline.start()
+    try:
+        deadline = time.monotonic() + 30.0
+        while pipeline.boundary_processed < FRAMES and time.monotonic() < deadline:
+            pipeline.result_queue.get(timeout=0.1)
+    finally:
+        pipeline.stop()
+
+    assert pipeline.boundary_processed == FRAMES
+    assert pipeline.boundary_deadline_misses == 0, [round(b['latency'] * 1000) for b in boundaries]
@@ -0,0 +1,33 @@
+"""
+Lo que se pide al crear un logger es solo de ese logger
+
+El directorio y el nivel explícitos no cambian la configuración global
+(la que usan los loggers creados después).
+"""
+
+import logging
+
+from utils.logger import configure_logging, get_logger, shutdown_logging
+
+
+def test_log_dir_is_per_logger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    custom = tmp_path / 'custom'
+
+    get_logger('test_dir_custom', log_dir=str(custom)).info('propio')
+    get_logger('test_dir_default').info('global')
+    shutdown_logging()
+
+    assert [path.name.split('_2')[0] for path in custom.iterdir()] == ['test_dir_custom']
+    assert [path.name.split('_2')[0] for path in (tmp_path / 'logs').iterdir()] == ['test_dir_default']
+
+
+def test_requested_notset_level_survives_reconfiguration():
+    notset = get_logger('test_level_notset', level=logging.NOTSET)
+    default = get_logger('test_level_default')
+    try:
+        configure_logging({'level': 'WARNING'})
+        assert notset.logger.level == logging.NOTSET
+        assert default.logger.level == logging.WARNING
+    finally:
+        configure_logging({'level': 'INFO'})
@@ -0,0 +1,197 @@
+"""
+Servidor HTTP que simula la ESP32-CAM
+============================================
+
+DESCRIPCIÓN:
+    Sirve JPEG grabados igual que la ESP32-CAM (un JPEG fijo por
+    petición en /cam-hi.jpg, /cam-mid.jpg, /cam-lo.jpg), con conexiones
+    persistentes HTTP/1.1. Permite probar el cliente (Esp32CamSource) y
+    medir su rendimiento sin la cámara.
+
+    Los frames salen de una carpeta de .jpg o de un video (se codifican a
+    JPEG al iniciar) y se sirven en ciclo.
+
+USO:
+    # Servidor (luego camera.source: 'esp32cam', ip 127.0.0.1, port 8080)
+    python tools/esp32_stub_server.py --source data/test_videos/beach_test.mp4
+
+    # Limitar a los FPS reales de la cámara
+    python tools/esp32_stub_server.py --source grabacion/ --fps 20
+
+    # Medir el cliente contra el servidor durante 10 s
+    python tools/esp32_stub_server.py --source grabacion/ --benchmark 10
+"""
+
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+import cv2
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+# Rutas que sirve la ESP32-CAM (todas devuelven el mismo JPEG aquí)
+CAMERA_PATHS = ('/cam-hi.jpg', '/cam-mid.jpg', '/cam-lo.jpg')
+
+
+def load_jpegs(source: str, quality: int = 80) -> List[bytes]:
+    """
+    Carga los JPEG a servir
+
+    Args:
+        source: Carpeta con .jpg o archivo de video
+        quality: Calidad JPEG al codificar frames de video (0-100)
+
+    Returns:
+        Lista de JPEG codificados
+    """
+    path = Path(source)
+    if path.is_dir():
+        return [file.read_bytes() for file in sorted(path.glob('*.jpg'))]
+
+    jpegs = []
+    capture = cv2.VideoCapture(str(path))
+    while True:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            jpegs.append(encoded.tobytes())
+    capture.release()
+    return jpegs
+
+
+class CameraStub:
+    """Estado compartido del servidor: JPEG en ciclo a un ritmo máximo"""
+
+    def __init__(self, jpegs: List[bytes], fps: float = 0.0):
+        """
+        Args:
+            jpegs: JPEG a servir en ciclo
+            fps: Frames por segundo máximos (0 = sin límite)
+        """
+        self.jpegs = jpegs
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.served = 0
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+
+    def next_jpeg(self) -> bytes:
+        """Siguiente JPEG (espera su turno si hay límite de FPS)"""
+        with self._lock:
+            if self.interval > 0:
+                delay = self._next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self._next_time = max(self._next_time + self.interval, time.monotonic())
+
+            jpeg = self.jpegs[self.served % len(self.jpegs)]
+            self.served += 1
+            return jpeg
+
+
+def make_handler(stub: CameraStub):
+    """Crea la clase de handler HTTP ligada al estado del servidor"""
+
+    class CameraHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1: conexiones persistentes (keep-alive) por defecto
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if self.path not in CAMERA_PATHS:
+                self.send_error(404)
+                return
+
+            jpeg = stub.next_jpeg()
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(jpeg)))
+            self.end_headers()
+            self.wfile.write(jpeg)
+
+        def log_message(self, format, *args):
+            # Sin log por petición (cientos por segundo)
+            pass
+
+    return CameraHandler
+
+
+def run_benchmark(host: str, port: int, seconds: float, max_scale: float):
+    """Mide FPS y latencia de Esp32CamSource contra el servidor local"""
+    from capture.esp32_source import Esp32CamSource
+
+    source = Esp32CamSource({'ip_address': host, 'port': port,
+                             'stream_path': CAMERA_PATHS[0]}, max_scale)
+    source.start()
+
+    frames = 0
+    latencies = []
+    shape = None
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        packet = source.read(timeout=1.0)
+        if packet is None:
+            continue
+        frames += 1
+        latencies.append(time.monotonic() - packet['timestamp'])
+        shape = packet['frame'].shape
+
+    source.stop()
+
+    stats = source.get_stats()
+    if shape is None:
+        print(f"No se leyó ningún frame en {seconds:.1f} s (¿servidor caído?)")
+    else:
+        print(f"Frames leídos: {frames} ({frames / seconds:.1f} FPS), tamaño {shape[1]}x{shape[0]}")
+    print(f"Frames descargados: {stats['captured']}, "
+          f"{stats['bytes_received'] / seconds / 1e6:.1f} MB/s, "
+          f"reconexiones: {stats['reconnects']}")
+    if latencies:
+        latencies.sort()
+        print(f"Latencia JPEG→lectura: p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+              f"máx {latencies[-1] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor HTTP que simula la ESP32-CAM')
+    parser.add_argument('--source', required=True, help='Carpeta con .jpg o archivo de video')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fps', type=float, default=0.0, help='FPS máximos (0 = sin límite)')
+    parser.add_argument('--quality', type=int, default=80, help='Calidad JPEG para videos')
+    parser.add_argument('--benchmark', type=float, default=0.0,
+                        help='Segundos de medición del cliente (0 = solo servidor)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='resize_factor del cliente en la medición (0.5/0.25 = decodificación reducida)')
+    args = parser.parse_args()
+
+    jpegs = load_jpegs(args.source, args.quality)
+    if not jpegs:
+        sys.exit(f"No hay frames en '{args.source}'")
+
+    stub = CameraStub(jpegs, args.fps)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(stub))
+    server.daemon_threads = True
+    print(f"Sirviendo {len(jpegs)} JPEG en http://{args.host}:{args.port}{CAMERA_PATHS[0]}")
+
+    if args.benchmark > 0:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        run_benchmark(args.host, args.port, args.benchmark, args.scale)
+        server.shutdown()
+        return
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
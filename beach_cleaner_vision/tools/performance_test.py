@@ -2,21 +2,663 @@
 Test de Rendimiento del Sistema
 ============================================
 
-Mide FPS y latencia del pipeline completo
+DESCRIPCIÓN:
+    Mide latencia y throughput de cada etapa del sistema de visión por
+    separado y del pipeline completo (VisionPipeline.process_frame, sin
+    hilos), sobre frames grabados o sintéticos.
+
+    Por etapa reporta p50/p95/p99/media/máximo en ms y throughput
+    (llamadas por segundo a la media). Los resultados se guardan en JSON
+    y se comparan contra una línea base: una etapa cuyo percentil
+    (--metric) empeora más de --tolerance se marca como regresión.
+
+    Definición de "terminado" del equipo: pipeline completo > 10 FPS.
+
+ETAPAS:
+    preprocess.*      pasos de ImagePreprocessor; preprocess.denoise.<método>
+                      mide cada método de reducción de ruido (además se
+                      reporta su PSNR contra frames limpios)
+    filters.*         Filters (sombras, iluminación)
+    segmentation.*    HSV, inRange por color, tabla BGR→colores
+    morphology.*      limpieza de máscaras
+    edges.*           EdgeDetector
+    detection.*       cada detector con un FrameContext propio (sin
+                      compartir máscaras con los demás: costo aislado)
+    classification.*  CanClassifier
+    visualization.*   Visualizer
+    pipeline.*        process_frame completo (máscaras compartidas,
+                      cadencia de detectores, trackers)
+
+USO:
+    # Frames sintéticos (tools/synthetic_scene.py) a la resolución de la
+    # cámara configurada
+    python tools/performance_test.py
+    python tools/performance_test.py --cans 50 --width 1920 --height 1080
+
+    # Barrido latas × resolución (CanDetector, classify_batch)
+    python tools/performance_test.py --scaling
+
+    # Grabación cruda (.bcvraw), video o carpeta de imágenes
+    python tools/performance_test.py --source data/recordings/campo.bcvraw
+
+    # Guardar como línea base / comparar contra ella
+    python tools/performance_test.py --save-baseline
+    python tools/performance_test.py --tolerance 0.15
+
+    Código de salida 1 si hay regresiones o el pipeline no llega a
+    --target-fps (sirve para CI).
+
+MEMORIA:
+    Después de medir, process_frame corre una pasada más con y sin
+    performance.buffer_pool contando los buffers nuevos de BufferPool en
+    estado estable (debe ser 0) y, con tracemalloc, el pico de memoria
+    transitoria por frame (arreglos temporales de NumPy/OpenCV).
 """
 
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
 import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 import cv2
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from capture.recording import open_recording
+from classification.can_classifier import CanClassifier
+from core.vision_pipeline import VisionPipeline
+from detection.can_detector import CanDetector
+from processing.color_lut import ColorLookupTable
+from processing.color_segmentation import ColorSegmentation
+from processing.buffer_pool import BufferPool
+from processing.edge_detection import EdgeDetector
+from processing.filters import Filters
+from processing.frame_context import FrameContext
+from processing.lighting import LightingNormalizer
+from processing.preprocessor import DENOISE_METHODS, ImagePreprocessor
+from utils.helpers import load_config, scale_pixel_config
+from synthetic_scene import SceneGenerator
+
+
+DEFAULT_OUTPUT = 'data/benchmarks/latest.json'
+DEFAULT_BASELINE = 'data/benchmarks/baseline.json'
+
+Stage = Tuple[str, Callable[[Dict[str, Any]], Any]]
+
+
+# ----------------------------------------------------------------------
+# Frames de entrada
+# ----------------------------------------------------------------------
+
+def load_frames(source: Optional[str], count: int,
+                generator: SceneGenerator) -> Tuple[List[np.ndarray], str]:
+    """
+    Carga los frames de prueba
+
+    Args:
+        source: .bcvraw, video o carpeta de imágenes; None = sintéticos
+        count: Número máximo de frames
+        generator: Generador de escenas para el caso sintético
+
+    Returns:
+        (frames BGR, descripción de la fuente)
+    """
+    if source is None:
+        frames = [image for image, _ in generator.scenes(count)]
+        return frames, (f'synthetic {generator.width}x{generator.height} '
+                        f'cans={generator.cans} seed={generator.seed}')
+
+    path = Path(source)
+    if path.suffix == '.bcvraw':
+        frames, _, _ = open_recording(str(path))
+        return [np.ascontiguousarray(frame) for frame in frames[:count]], str(path)
+
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.suffix.lower() in ('.jpg', '.jpeg', '.png'))
+        return [cv2.imread(str(p)) for p in files[:count]], str(path)
+
+    frames = []
+    capture = cv2.VideoCapture(str(path))
+    while len(frames) < count:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames, str(path)
+
+
+# ----------------------------------------------------------------------
+# Etapas
+# ----------------------------------------------------------------------
+
+def prepare_inputs(pipeline: VisionPipeline, frames: List[np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Calcula (sin medir) las entradas de cada etapa para cada frame
+
+    Cada etapa recibe la salida real de la etapa anterior: el frame
+    preprocesado, su HSV, la máscara negra, las latas detectadas, etc.
+    """
+    inputs = []
+    scale = pipeline.processing_scale
+    for frame in frames:
+        if scale != 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        processed = pipeline.preprocessor.preprocess(frame)
+        ctx = FrameContext(processed, pipeline.segmenter, pipeline.filtering_config,
+                           pipeline.color_lut)
+        cans = pipeline.can_detector.detect(ctx)
+        inputs.append({
+            'frame': frame,
+            'processed': processed,
+            'hsv': ctx.hsv,
+            'gray': ctx.gray,
+            'mask': ctx.mask('black'),
+            'clean_mask': ctx.clean_mask('black'),
+            'cans': cans,
+            'detections': {
+                'cans': pipeline.can_classifier.classify_batch(cans, ctx),
+                'containers': pipeline.container_detector.detect(ctx),
+                'obstacles': pipeline.obstacle_detector.detect(ctx)
+            }
+        })
+    return inputs
+
+
+def build_stages(pipeline: VisionPipeline) -> List[Stage]:
+    """Etapas medidas: (nombre, función que recibe las entradas de un frame)"""
+    preprocessor = pipeline.preprocessor
+    segmenter = pipeline.segmenter
+    filtering = pipeline.filtering_config
+    edges = EdgeDetector()
+    kernel = filtering.get('morphology_kernel', 5)
+
+    # CLAHE con histogramas de 1 de cada 4 píxeles (filtering.lighting.histogram_subsample)
+    subsampled = LightingNormalizer(dict(filtering.get('lighting', {}), histogram_subsample=4))
+
+    def context(d: Dict[str, Any]) -> FrameContext:
+        return FrameContext(d['processed'], segmenter, filtering, pipeline.color_lut)
+
+    stages: List[Stage] = [
+        ('preprocess.enhance_lighting', lambda d: preprocessor.enhance_lighting(d['frame'])),
+        ('preprocess.enhance_lighting.lab', lambda d: preprocessor.enhance_lighting(d['frame'], as_lab=True)),
+        ('preprocess.enhance_lighting.subsampled', lambda d: subsampled.apply(d['frame'])),
+        ('preprocess.reduce_noise', lambda d: preprocessor.reduce_noise(d['frame'])),
+        ('preprocess.gaussian_blur', lambda d: preprocessor.gaussian_blur(d['frame'])),
+        ('preprocess.white_balance', lambda d: preprocessor.adjust_white_balance(d['frame'])),
+        ('preprocess.full', lambda d: preprocessor.preprocess(d['frame'])),
+    ]
+    stages += [(f'preprocess.denoise.{method}',
+                lambda d, method=method: preprocessor.reduce_noise(d['frame'], method=method))
+               for method in DENOISE_METHODS if method != 'none']
+    stages += [
+
+        ('filters.remove_shadows', lambda d: Filters.remove_shadows(d['frame'])),
+        ('filters.remove_shadows.lowres', lambda d: Filters.remove_shadows(d['frame'], scale=4)),
+        ('preprocess.shadows', lambda d: preprocessor.compensate_shadows(d['frame'])),
+        ('filters.normalize_illumination', lambda d: Filters.normalize_illumination(d['frame'])),
+
+        ('segmentation.hsv', lambda d: cv2.cvtColor(d['processed'], cv2.COLOR_BGR2HSV)),
+        ('segmentation.in_range', lambda d: segmenter.segment_all_colors(d['hsv'])),
+    ]
+    if pipeline.color_lut is not None:
+        stages.append(('segmentation.lookup_table',
+                       lambda d: pipeline.color_lut.segment_all_colors(d['processed'])))
+
+    stages += [
+        ('morphology.clean_mask', lambda d: segmenter.apply_morphology(
+            d['mask'], kernel_size=kernel,
+            erosion_iter=filtering.get('erosion_iterations', 1),
+            dilation_iter=filtering.get('dilation_iterations', 2))),
+        ('morphology.opening', lambda d: segmenter.opening(d['mask'], kernel)),
+        ('morphology.closing', lambda d: segmenter.closing(d['mask'], kernel)),
+
+        ('edges.canny', lambda d: edges.canny_edge(d['gray'])),
+        ('edges.find_contours', lambda d: edges.find_contours(d['clean_mask'])),
+        ('edges.filter_blobs', lambda d: edges.filter_blobs_by_area(d['clean_mask'])),
+
+        ('detection.boundary', lambda d: pipeline.boundary_detector.detect(context(d))),
+        ('detection.cans', lambda d: pipeline.can_detector.detect(context(d))),
+        ('detection.containers', lambda d: pipeline.container_detector.detect(context(d))),
+        ('detection.obstacles', lambda d: pipeline.obstacle_detector.detect(context(d))),
+
+        ('classification.cans', lambda d: pipeline.can_classifier.classify_batch(
+            [dict(can) for can in d['cans']], context(d))),
+
+        ('visualization.draw_detections',
+         lambda d: pipeline.visualizer.draw_detections(d['frame'], d['detections'])),
+    ]
+    return stages
+
+
+# ----------------------------------------------------------------------
+# Medición
+# ----------------------------------------------------------------------
+
+def summarize(samples_ns: List[int]) -> Dict[str, float]:
+    """Percentiles, media, máximo (ms) y throughput (Hz) de una etapa"""
+    if not samples_ns:
+        return {'samples': 0}
+    ms = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    mean = float(ms.mean())
+    return {
+        'samples': int(ms.size),
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'mean_ms': round(mean, 4),
+        'max_ms': round(float(ms.max()), 4),
+        'throughput_hz': round(1000.0 / mean, 1) if mean > 0 else None
+    }
+
+
+def time_stage(function: Callable[[Dict[str, Any]], Any], inputs: List[Dict[str, Any]],
+               iterations: int, warmup: int) -> List[int]:
+    """Ejecuta una etapa sobre todos los frames `iterations` veces"""
+    for d in inputs[:warmup]:
+        function(d)
+
+    samples = []
+    for _ in range(iterations):
+        for d in inputs:
+            start = time.perf_counter_ns()
+            function(d)
+            samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def time_pipeline(camera_config: dict, detection_config: dict,
+                  frames: List[np.ndarray], iterations: int, warmup: int) -> Tuple[List[int], float]:
+    """
+    process_frame completo en secuencia (como lo recibe el hilo de detección)
+
+    Returns:
+        (muestras en ns, FPS sostenidos)
+    """
+    pipeline = VisionPipeline(camera_config, detection_config)
+    for frame in frames[:warmup]:
+        pipeline.process_frame(frame)
+
+    samples = []
+    start_all = time.perf_counter()
+    for _ in range(iterations):
+        for frame in frames:
+            start = time.perf_counter_ns()
+            pipeline.process_frame(frame)
+            samples.append(time.perf_counter_ns() - start)
+    elapsed = time.perf_counter() - start_all
+    return samples, len(samples) / elapsed if elapsed > 0 else 0.0
+
+
+def denoise_quality(filtering_config: dict, references: List[np.ndarray],
+                    sigma: float, seed: int, steps: int = 8) -> Dict[str, float]:
+    """
+    PSNR (dB) de cada método de reducción de ruido contra frames limpios
+
+    A cada referencia se le suma ruido gaussiano `steps` veces seguidas
+    (escena estática, así el método temporal tiene frames que promediar) y
+    se compara la última salida con la referencia. Todos los métodos
+    reciben la misma secuencia de ruido.
+
+    Args:
+        filtering_config: Sección 'filtering' (parámetros de filtering.denoise)
+        references: Frames sin ruido
+        sigma: Desviación estándar del ruido (niveles de gris)
+        seed: Semilla del ruido
+        steps: Frames ruidosos por referencia
+    """
+    quality = {}
+    for method in DENOISE_METHODS:
+        rng = np.random.default_rng(seed)
+        values = []
+        for reference in references:
+            # Preprocesador nuevo por escena: el promedio temporal empieza de cero
+            preprocessor = ImagePreprocessor(filtering_config)
+            for _ in range(steps):
+                noise = rng.normal(0, sigma, reference.shape[:2] + (1,))
+                noisy = np.clip(reference + noise, 0, 255).astype(np.uint8)
+                output = preprocessor.reduce_noise(noisy, method=method)
+            values.append(cv2.PSNR(reference, output))
+        quality[method] = round(float(np.mean(values)), 2)
+    return quality
+
+
+def measure_allocations(camera_config: dict, detection_config: dict,
+                        frames: List[np.ndarray], warmup: int, pooled: bool) -> Dict[str, Any]:
+    """
+    Asignaciones de process_frame por frame en estado estable
+
+    Tras `warmup` frames cuenta los buffers que crean los BufferPool y el
+    pico de memoria reservada y liberada dentro de cada frame (tracemalloc).
+
+    Args:
+        pooled: Valor de performance.buffer_pool
+
+    Returns:
+        Buffers nuevos del pool y memoria transitoria por frame (KB)
+    """
+    config = dict(detection_config)
+    config['performance'] = dict(detection_config.get('performance', {}), buffer_pool=pooled)
+    pipeline = VisionPipeline(camera_config, config)
+    for frame in frames[:max(1, warmup)]:
+        pipeline.process_frame(frame)
+
+    allocations = BufferPool.total_allocations
+    transient = []
+    tracemalloc.start()
+    for frame in frames:
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        pipeline.process_frame(frame)
+        transient.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    kb = np.asarray(transient, dtype=np.float64) / 1024.0
+    return {
+        'buffer_pool': pooled,
+        'frames': len(frames),
+        'pool_allocations': BufferPool.total_allocations - allocations,
+        'transient_kb_p50': round(float(np.percentile(kb, 50)), 1),
+        'transient_kb_max': round(float(kb.max()), 1)
+    }
+
+
+# ----------------------------------------------------------------------
+# Escalamiento (latas y resolución)
+# ----------------------------------------------------------------------
+
+SCALING_CANS = (5, 20, 50, 100)
+SCALING_RESOLUTIONS = ((640, 480), (1280, 960), (1920, 1080), (3840, 2160))
+
+
+def scaling_sweep(detection_config: dict, seed: int, frames: int,
+                  iterations: int) -> List[Dict]:
+    """
+    Costo de CanDetector y CanClassifier.classify_batch según el número de
+    latas y la resolución (escenas sintéticas)
+
+    Los umbrales en píxeles se reescalan a cada resolución (como hace el
+    gobernador), así las latas se siguen detectando en 4K.
+
+    Returns:
+        Una entrada por combinación: resolución, latas dibujadas/detectadas,
+        p50 de detección y de clasificación
+    """
+    rows = []
+    for width, height in SCALING_RESOLUTIONS:
+        config = scale_pixel_config(detection_config, width / 640.0)
+        segmenter = ColorSegmentation(config.get('colors', {}))
+        color_lut = ColorLookupTable(config.get('colors', {}))
+        detector = CanDetector(config)
+        classifier = CanClassifier(config)
+        filtering = config.get('filtering', {})
+
+        def context(image: np.ndarray) -> FrameContext:
+            return FrameContext(image, segmenter, filtering, color_lut)
+
+        for cans in SCALING_CANS:
+            generator = SceneGenerator(width, height, cans=cans, obstacles=0, seed=seed)
+            scenes = list(generator.scenes(frames))
+            images = [image for image, _ in scenes]
+            detected = [detector.detect(context(image)) for image in images]
+
+            inputs = [{'frame': image, 'cans': found} for image, found in zip(images, detected)]
+            detection = summarize(time_stage(
+                lambda d: detector.detect(context(d['frame'])), inputs, iterations, 1))
+            classification = summarize(time_stage(
+                lambda d: classifier.classify_batch([dict(can) for can in d['cans']],
+                                                    context(d['frame'])), inputs, iterations, 1))
+            rows.append({
+                'resolution': f'{width}x{height}',
+                'cans_requested': cans,
+                'cans_drawn': float(np.mean([len(labels['cans']) for _, labels in scenes])),
+                'cans_detected': float(np.mean([len(found) for found in detected])),
+                'detection_p50_ms': detection['p50_ms'],
+                'classification_p50_ms': classification['p50_ms']
+            })
+    return rows
+
+
+def run_scaling(detection_config: dict, args: argparse.Namespace) -> int:
+    """Barrido de escalamiento: imprime la tabla y guarda el reporte"""
+    print(f"{'resolución':>10s} {'latas':>6s} {'dibujadas':>9s} {'detectadas':>10s} "
+          f"{'detección':>10s} {'clasif.':>8s}")
+    rows = scaling_sweep(detection_config, args.seed, args.scaling_frames, args.iterations)
+    for row in rows:
+        print(f"{row['resolution']:>10s} {row['cans_requested']:6d} {row['cans_drawn']:9.1f} "
+              f"{row['cans_detected']:10.1f} {row['detection_p50_ms']:10.2f} "
+              f"{row['classification_p50_ms']:8.2f}")
+
+    write_json({
+        'meta': {'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'git': git_revision(),
+                 'seed': args.seed, 'frames': args.scaling_frames},
+        'scaling': rows
+    }, args.output)
+    print(f"\nReporte: {args.output}")
+    return 0
+
+
+# ----------------------------------------------------------------------
+# Línea base
+# ----------------------------------------------------------------------
+
+def compare(report: Dict, baseline: Dict, metric: str,
+            tolerance: float, min_delta_ms: float) -> List[Dict]:
+    """
+    Compara cada etapa contra la línea base
+
+    Una etapa es regresión si su `metric` supera el de la base en más de
+    `tolerance` (relativo) Y en más de `min_delta_ms` (absoluto, para no
+    marcar ruido en etapas de microsegundos).
+
+    Returns:
+        Una entrada por etapa común: {stage, baseline, current, change, regression}
+    """
+    rows = []
+    for name, current in report['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if not base or metric not in base or metric not in current:
+            continue
+        change = (current[metric] - base[metric]) / base[metric] if base[metric] > 0 else 0.0
+        rows.append({
+            'stage': name,
+            'baseline': base[metric],
+            'current': current[metric],
+            'change': round(change, 4),
+            'regression': (change > tolerance
+                           and current[metric] - base[metric] > min_delta_ms)
+        })
+    return rows
+
+
+def git_revision() -> Optional[str]:
+    """Commit actual (para saber qué versión se midió)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_json(data: Dict, path: str):
+    """Guarda un reporte JSON (crea la carpeta si no existe)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+# ----------------------------------------------------------------------
+# Principal
+# ----------------------------------------------------------------------
+
+def run_benchmark(args: argparse.Namespace) -> int:
+    """Prueba rendimiento del sistema de visión; devuelve el código de salida"""
+    camera_config = load_config(str(ROOT / 'config' / 'camera_config.yaml'))
+    detection_config = load_config(str(ROOT / 'config' / 'detection_config.yaml'))
+
+    camera = camera_config.get('camera', {})
+    resolution = camera.get(camera.get('source', 'laptop'), {}).get('resolution', {})
+    width = args.width or resolution.get('width', 640)
+    height = args.height or resolution.get('height', 480)
+
+    if args.scaling:
+        return run_scaling(detection_config, args)
+
+    generator = SceneGenerator(width, height, cans=args.cans, noise=args.noise, seed=args.seed)
+    frames, source = load_frames(args.source, args.frames, generator)
+    if not frames:
+        print(f"No hay frames en '{args.source}'")
+        return 1
+
+    pipeline = VisionPipeline(camera_config, detection_config)
+    inputs = prepare_inputs(pipeline, frames)
+
+    report = {
+        'meta': {
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'git': git_revision(),
+            'source': source,
+            'frames': len(frames),
+            'resolution': f"{frames[0].shape[1]}x{frames[0].shape[0]}",
+            'processing_scale': pipeline.processing_scale,
+            'iterations': args.iterations,
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'opencv_threads': cv2.getNumThreads()
+        },
+        'stages': {}
+    }
+
+    print(f"Fuente: {source} ({len(frames)} frames, {report['meta']['resolution']}, "
+          f"escala {pipeline.processing_scale})")
+    print(f"{'etapa':42s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'máx':>8s} {'Hz':>8s}")
+
+    def show(name: str, stats: Dict):
+        print(f"{name:42s} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} "
+              f"{stats['p99_ms']:8.2f} {stats['max_ms']:8.2f} {stats['throughput_hz']:8.1f}")
+
+    for name, function in build_stages(pipeline):
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        stats = summarize(time_stage(function, inputs, args.iterations, args.warmup))
+        report['stages'][name] = stats
+        show(name, stats)
+
+    # Calidad de cada método de reducción de ruido (frames sintéticos sin
+    # ruido como referencia; con otra fuente, sus propios frames)
+    if any(name.startswith('preprocess.denoise.') for name in report['stages']):
+        if args.source is None:
+            clean = SceneGenerator(width, height, cans=args.cans, noise=0, seed=args.seed)
+            references = [image for image, _ in clean.scenes(min(len(frames), 8))]
+        else:
+            references = frames[:8]
+        sigma = args.noise or 6.0
+        quality = denoise_quality(pipeline.filtering_config, references, sigma, args.seed)
+        configured = pipeline.preprocessor.denoise_method
+        print(f"\nReducción de ruido (σ={sigma:g}, configurado: {configured}):")
+        print(f"  {'método':24s} {'p50 ms':>8s} {'PSNR dB':>8s}")
+        for method, psnr in quality.items():
+            stats = report['stages'].get(f'preprocess.denoise.{method}')
+            if stats is not None:
+                stats['psnr_db'] = psnr
+            p50 = f"{stats['p50_ms']:8.2f}" if stats is not None else f"{'-':>8s}"
+            print(f"  {method:24s} {p50} {psnr:8.2f}")
+        report['denoise'] = {'sigma': sigma, 'configured': configured, 'psnr_db': quality}
+
+    samples, fps = time_pipeline(camera_config, detection_config, frames,
+                                 args.iterations, args.warmup)
+    report['stages']['pipeline.process_frame'] = summarize(samples)
+    show('pipeline.process_frame', report['stages']['pipeline.process_frame'])
+
+    report['pipeline'] = {
+        'fps': round(fps, 1),
+        'target_fps': args.target_fps,
+        'meets_target': fps > args.target_fps
+    }
+    status = "OK" if fps > args.target_fps else "NO CUMPLE"
+    print(f"\nPipeline: {fps:.1f} FPS (objetivo > {args.target_fps}) {status}")
+
+    exit_code = 0 if fps > args.target_fps else 1
+
+    # Asignaciones por frame con y sin buffers reutilizados
+    report['memory'] = [measure_allocations(camera_config, detection_config, frames,
+                                            args.warmup, pooled) for pooled in (True, False)]
+    print("\nMemoria por frame (estado estable):")
+    for row in report['memory']:
+        label = "con buffer_pool" if row['buffer_pool'] else "sin buffer_pool"
+        print(f"  {label:16s} buffers nuevos {row['pool_allocations']:4d}   "
+              f"transitoria p50 {row['transient_kb_p50']:9.1f} KB   máx {row['transient_kb_max']:9.1f} KB")
+
+    # Comparación contra la línea base
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.metric, args.tolerance, args.min_delta_ms)
+        regressions = [row for row in rows if row['regression']]
+        report['comparison'] = {
+            'baseline': args.baseline,
+            'baseline_git': baseline.get('meta', {}).get('git'),
+            'metric': args.metric,
+            'tolerance': args.tolerance,
+            'stages': rows,
+            'regressions': [row['stage'] for row in regressions]
+        }
+
+        print(f"\nComparación con {args.baseline} ({args.metric}, tolerancia {args.tolerance:.0%}):")
+        for row in rows:
+            mark = "  REGRESIÓN" if row['regression'] else ""
+            print(f"  {row['stage']:42s} {row['baseline']:8.2f} → {row['current']:8.2f} ms "
+                  f"({row['change']:+.1%}){mark}")
+        if regressions:
+            print(f"{len(regressions)} etapa(s) con regresión")
+            exit_code = 1
+
+    write_json(report, args.output)
+    print(f"\nReporte: {args.output}")
+    if args.save_baseline:
+        write_json(report, args.baseline)
+        print(f"Línea base guardada: {args.baseline}")
+
+    return exit_code
 
 
-def test_performance():
-    """Prueba rendimiento del sistema de visión"""
-    # TODO: Ejecutar pipeline
-    # TODO: Medir FPS
-    # TODO: Medir latencia
-    # TODO: Generar reporte
-    pass
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark por etapa del sistema de visión')
+    parser.add_argument('--source', help='.bcvraw, video o carpeta de imágenes (omitir = sintéticos)')
+    parser.add_argument('--frames', type=int, default=60, help='Frames a usar')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla de los frames sintéticos')
+    parser.add_argument('--width', type=int, help='Ancho de los frames sintéticos (omitir = cámara configurada)')
+    parser.add_argument('--height', type=int, help='Alto de los frames sintéticos')
+    parser.add_argument('--cans', type=int, default=4, help='Latas por escena sintética')
+    parser.add_argument('--noise', type=float, default=6.0, help='Ruido de las escenas sintéticas (σ)')
+    parser.add_argument('--scaling', action='store_true',
+                        help='Solo barrido de latas × resolución para CanDetector y el clasificador')
+    parser.add_argument('--scaling-frames', type=int, default=3, help='Escenas por combinación del barrido')
+    parser.add_argument('--iterations', type=int, default=3, help='Pasadas por todos los frames')
+    parser.add_argument('--warmup', type=int, default=5, help='Llamadas sin medir por etapa')
+    parser.add_argument('--only', nargs='*', help='Medir solo etapas que contengan estos textos')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Reporte JSON')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Línea base JSON')
+    parser.add_argument('--save-baseline', action='store_true', help='Guardar este reporte como línea base')
+    parser.add_argument('--metric', default='p50_ms', choices=['p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'])
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Empeoramiento relativo permitido')
+    parser.add_argument('--min-delta-ms', type=float, default=0.1, help='Empeoramiento absoluto mínimo para marcar')
+    parser.add_argument('--target-fps', type=float, default=10.0, help='FPS mínimos del pipeline')
+    sys.exit(run_benchmark(parser.parse_args()))
 
 
 if __name__ == '__main__':
-    test_performance()
+    main()
@@ -0,0 +1,484 @@
+"""
+Generador de escenas sintéticas de playa
+============================================
+
+DESCRIPCIÓN:
+    Dibuja escenas deterministas del escenario TMR con su verdad de
+    terreno (etiquetas), para correr benchmarks y pruebas de precisión sin
+    cámara ni escenario:
+
+    - Arena con textura (variación suave + grano)
+    - Lona azul (límite del mar) con borde ondulado
+    - Aros rojo y verde de 75 cm
+    - Latas negras y negras con franja amarilla (25% inferior)
+    - Siluetas grandes de obstáculos (maniquí, silla, sombrilla)
+
+    Resolución, número de objetos, ruido e iluminación son configurables.
+    Misma semilla + mismo índice = misma imagen, en cualquier máquina.
+
+    Los objetos más abajo en la imagen (más cerca del robot) se dibujan
+    más grandes, como en la cámara real.
+
+ETIQUETAS (una por escena):
+    {
+        'index', 'seed', 'width', 'height',
+        'cans': [{'bounding_box', 'center', 'type': 'organic'|'inorganic'}],
+        'containers': [{'color', 'center', 'radius', 'bounding_box'}],
+        'obstacles': [{'type', 'bounding_box'}],
+        'boundary': {'edge': 'top'|'left'|'right'|None, 'region': (x, y, w, h)}
+    }
+    bounding_box de las latas incluye la franja amarilla.
+
+USO:
+    # 100 escenas PNG + labels.json
+    python tools/synthetic_scene.py --count 100 --output data/synthetic
+
+    # Grabación cruda para reproducir con camera.source: 'recording'
+    python tools/synthetic_scene.py --count 300 --record data/recordings/sintetico.bcvraw
+
+    # Estrés: 60 latas en 4K
+    python tools/synthetic_scene.py --count 10 --cans 60 --width 3840 --height 2160 --output data/stress
+
+    # Precisión de los detectores contra las etiquetas
+    python tools/synthetic_scene.py --count 50 --evaluate
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+Box = Tuple[int, int, int, int]
+
+# Colores BGR dentro de los rangos HSV de detection_config.yaml
+SAND = (140, 185, 210)
+TARP = (170, 90, 30)
+RING_COLORS = {'red': (35, 35, 200), 'green': (50, 165, 45)}
+CAN_BLACK = (22, 22, 22)
+CAN_YELLOW = (0, 210, 230)
+OBSTACLE_COLORS = [(175, 175, 180), (120, 120, 125), (235, 235, 235), (90, 85, 85)]
+
+
+class SceneGenerator:
+    """Genera escenas sintéticas deterministas con su verdad de terreno"""
+
+    def __init__(self, width: int = 640, height: int = 480, cans: int = 4,
+                 organic_fraction: float = 0.5, containers: Tuple[str, ...] = ('red', 'green'),
+                 obstacles: int = 1, noise: float = 6.0, illumination: float = 0.15,
+                 tarp: bool = True, seed: int = 0):
+        """
+        Inicializa el generador
+
+        Args:
+            width: Ancho de la imagen
+            height: Alto de la imagen
+            cans: Latas por escena
+            organic_fraction: Fracción de latas con franja amarilla
+            containers: Aros a dibujar ('red', 'green')
+            obstacles: Obstáculos por escena
+            noise: Desviación estándar del ruido del sensor (niveles de gris)
+            illumination: Variación máxima de iluminación (0.15 = ±15%)
+            tarp: Dibujar la lona azul
+            seed: Semilla base
+        """
+        self.width = width
+        self.height = height
+        self.cans = cans
+        self.organic_fraction = organic_fraction
+        self.containers = containers
+        self.obstacles = obstacles
+        self.noise = noise
+        self.illumination = illumination
+        self.tarp = tarp
+        self.seed = seed
+
+        # Tamaños relativos a una imagen de 640 px de ancho
+        self._unit = width / 640.0
+
+    def scenes(self, count: int, start: int = 0) -> Iterator[Tuple[np.ndarray, Dict]]:
+        """Genera `count` escenas (imagen, etiquetas) a partir del índice `start`"""
+        for index in range(start, start + count):
+            yield self.render(index)
+
+    def render(self, index: int) -> Tuple[np.ndarray, Dict]:
+        """
+        Dibuja una escena
+
+        Args:
+            index: Índice de la escena (con la semilla, la define por completo)
+
+        Returns:
+            (imagen BGR uint8, etiquetas)
+        """
+        rng = np.random.default_rng([self.seed, index])
+        image = self._sand(rng)
+        occupied: List[Box] = []
+
+        labels = {
+            'index': index,
+            'seed': self.seed,
+            'width': self.width,
+            'height': self.height,
+            'cans': [],
+            'containers': [],
+            'obstacles': [],
+            'boundary': {'edge': None, 'region': None}
+        }
+
+        if self.tarp:
+            labels['boundary'] = self._draw_tarp(image, rng, occupied)
+
+        for color in self.containers:
+            container = self._draw_ring(image, rng, color, occupied)
+            if container is not None:
+                labels['containers'].append(container)
+
+        for _ in range(self.obstacles):
+            obstacle = self._draw_obstacle(image, rng, occupied)
+            if obstacle is not None:
+                labels['obstacles'].append(obstacle)
+
+        for _ in range(self.cans):
+            can = self._draw_can(image, rng, occupied)
+            if can is not None:
+                labels['cans'].append(can)
+
+        image = self._lighting_and_noise(image, rng)
+        return image, labels
+
+    # ------------------------------------------------------------------
+    # Fondo
+    # ------------------------------------------------------------------
+
+    def _sand(self, rng: np.random.Generator) -> np.ndarray:
+        """Arena: color base + variación suave de baja frecuencia"""
+        small = rng.normal(0, 10, (max(2, self.height // 40), max(2, self.width // 40), 1))
+        variation = cv2.resize(small.astype(np.float32), (self.width, self.height),
+                               interpolation=cv2.INTER_CUBIC)[..., None]
+        image = np.empty((self.height, self.width, 3), np.float32)
+        image[:] = SAND
+        image += variation
+        return np.clip(image, 0, 255).astype(np.uint8)
+
+    def _lighting_and_noise(self, image: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Gradiente de iluminación global + grano del sensor"""
+        result = image.astype(np.float32)
+        if self.illumination > 0:
+            # Plano inclinado: ±illumination entre esquinas opuestas
+            a, b = rng.uniform(-self.illumination, self.illumination, 2) / 2
+            ys = np.linspace(-1, 1, self.height, dtype=np.float32)[:, None]
+            xs = np.linspace(-1, 1, self.width, dtype=np.float32)[None, :]
+            result *= (1.0 + a * xs + b * ys)[..., None]
+        if self.noise > 0:
+            result += rng.normal(0, self.noise, (self.height, self.width, 1)).astype(np.float32)
+        return np.clip(result, 0, 255).astype(np.uint8)
+
+    def _draw_tarp(self, image: np.ndarray, rng: np.random.Generator,
+                   occupied: List[Box]) -> Dict:
+        """Lona azul en un borde (casi siempre al fondo) con borde ondulado"""
+        edge = rng.choice(['top', 'top', 'top', 'left', 'right'])
+        along = self.width if edge == 'top' else self.height
+        across = self.height if edge == 'top' else self.width
+        depth = rng.uniform(0.08, 0.22) * across
+
+        # Borde ondulado: la lona no queda recta sobre la arena
+        t = np.arange(along, dtype=np.float32)
+        phase = rng.uniform(0, 2 * np.pi)
+        wave = depth + 0.03 * across * np.sin(t / along * rng.uniform(2, 6) * np.pi + phase)
+        limit = np.clip(wave, 1, across).astype(np.int32)
+
+        pos = np.arange(across, dtype=np.int32)[:, None]
+        mask = pos < limit[None, :]
+        if edge == 'top':
+            region_mask = mask
+        else:
+            region_mask = mask.T if edge == 'left' else mask.T[:, ::-1]
+
+        # Arrugas: franjas de sombra suaves sobre el azul
+        folds = 1.0 + 0.12 * np.sin(np.arange(self.width, dtype=np.float32) / (23 * self._unit))
+        tarp = np.array(TARP, np.float32)[None, None, :] * folds[None, :, None]
+        image[region_mask] = np.clip(tarp, 0, 255).astype(np.uint8).repeat(
+            self.height, axis=0)[region_mask]
+
+        extent = int(limit.max())
+        if edge == 'top':
+            region = (0, 0, self.width, extent)
+        elif edge == 'left':
+            region = (0, 0, extent, self.height)
+        else:
+            region = (self.width - extent, 0, extent, self.height)
+        occupied.append(region)
+        return {'edge': str(edge), 'region': region}
+
+    # ------------------------------------------------------------------
+    # Objetos
+    # ------------------------------------------------------------------
+
+    def _perspective(self, y: float) -> float:
+        """Factor de tamaño según la fila: más abajo = más cerca = más grande"""
+        return 0.7 + 0.6 * y / self.height
+
+    def _place(self, rng: np.random.Generator, size: Tuple[int, int],
+               occupied: List[Box], y_range: Tuple[float, float] = (0.2, 1.0),
+               attempts: int = 50) -> Optional[Tuple[int, int]]:
+        """Esquina superior izquierda libre para una caja de `size` (w, h)"""
+        w, h = size
+        for _ in range(attempts):
+            x = int(rng.uniform(0, max(1, self.width - w)))
+            y = int(rng.uniform(y_range[0] * self.height, max(y_range[0] * self.height + 1,
+                                                             y_range[1] * self.height - h)))
+            box = (x, y, w, h)
+            if y + h <= self.height and not any(_overlaps(box, other) for other in occupied):
+                occupied.append(box)
+                return x, y
+        return None
+
+    def _draw_ring(self, image: np.ndarray, rng: np.random.Generator,
+                   color: str, occupied: List[Box]) -> Optional[Dict]:
+        """Aro de 75 cm visto desde arriba"""
+        y_hint = rng.uniform(0.3, 0.7) * self.height
+        radius = int(rng.uniform(55, 80) * self._unit * self._perspective(y_hint))
+        thickness = max(2, radius // 6)
+        position = self._place(rng, (2 * radius, 2 * radius), occupied, (0.2, 0.95))
+        if position is None:
+            return None
+
+        center = (position[0] + radius, position[1] + radius)
+        cv2.circle(image, center, radius - thickness // 2, RING_COLORS[color], thickness,
+                   lineType=cv2.LINE_AA)
+        return {
+            'color': color,
+            'center': center,
+            'radius': radius,
+            'bounding_box': (position[0], position[1], 2 * radius, 2 * radius)
+        }
+
+    def _draw_can(self, image: np.ndarray, rng: np.random.Generator,
+                  occupied: List[Box]) -> Optional[Dict]:
+        """Lata de pie; orgánica = franja amarilla en el 25% inferior"""
+        y_hint = rng.uniform(0.35, 0.95) * self.height
+        scale = self._unit * self._perspective(y_hint)
+        w = max(4, int(rng.uniform(20, 28) * scale))
+        h = max(8, int(rng.uniform(44, 56) * scale))
+        # Con muchas latas (pruebas de estrés) hace falta insistir más
+        position = self._place(rng, (w, h), occupied, (0.25, 1.0), attempts=200)
+        if position is None:
+            return None
+
+        x, y = position
+        organic = bool(rng.random() < self.organic_fraction)
+        cv2.rectangle(image, (x, y), (x + w - 1, y + h - 1), CAN_BLACK, -1)
+        # Tapa: elipse un poco más clara
+        cv2.ellipse(image, (x + w // 2, y + max(1, h // 12)), (w // 2, max(1, h // 12)),
+                    0, 0, 360, (45, 45, 45), -1)
+        if organic:
+            stripe = max(1, int(round(h * 0.25)))
+            cv2.rectangle(image, (x, y + h - stripe), (x + w - 1, y + h - 1), CAN_YELLOW, -1)
+
+        return {
+            'bounding_box': (x, y, w, h),
+            'center': (x + w // 2, y + h // 2),
+            'type': 'organic' if organic else 'inorganic'
+        }
+
+    def _draw_obstacle(self, image: np.ndarray, rng: np.random.Generator,
+                       occupied: List[Box]) -> Optional[Dict]:
+        """Silueta grande: maniquí (alto), silla (ancha) o sombrilla"""
+        kind = str(rng.choice(['mannequin', 'chair', 'umbrella']))
+        scale = self._unit * rng.uniform(0.9, 1.3)
+        size = {'mannequin': (70, 190), 'chair': (170, 90), 'umbrella': (150, 150)}[kind]
+        w, h = int(size[0] * scale), int(size[1] * scale)
+        if w >= self.width or h >= self.height:
+            return None
+        position = self._place(rng, (w, h), occupied, (0.25, 1.0))
+        if position is None:
+            return None
+
+        x, y = position
+        color = OBSTACLE_COLORS[int(rng.integers(len(OBSTACLE_COLORS)))]
+        if kind == 'mannequin':
+            head = w // 3
+            cv2.circle(image, (x + w // 2, y + head), head, color, -1)
+            cv2.rectangle(image, (x + w // 6, y + 2 * head), (x + w - w // 6, y + h * 3 // 5), color, -1)
+            cv2.rectangle(image, (x + w // 5, y + h * 3 // 5), (x + w // 2 - 2, y + h - 1), color, -1)
+            cv2.rectangle(image, (x + w // 2 + 2, y + h * 3 // 5), (x + w - w // 5, y + h - 1), color, -1)
+        elif kind == 'chair':
+            cv2.rectangle(image, (x, y), (x + w - 1, y + h // 2), color, -1)
+            leg = max(3, w // 12)
+            for lx in (x, x + w - leg):
+                cv2.rectangle(image, (lx, y + h // 2), (lx + leg, y + h - 1), color, -1)
+        else:
+            canopy = np.array([[x, y + h // 3], [x + w // 2, y], [x + w - 1, y + h // 3]], np.int32)
+            cv2.fillPoly(image, [canopy], color)
+            cv2.rectangle(image, (x + w // 2 - max(2, w // 40), y + h // 3),
+                          (x + w // 2 + max(2, w // 40), y + h - 1), color, -1)
+
+        return {'type': kind, 'bounding_box': (x, y, w, h)}
+
+
+def _overlaps(a: Box, b: Box, margin: int = 4) -> bool:
+    """True si dos cajas (x, y, w, h) se tocan (con margen)"""
+    return not (a[0] + a[2] + margin <= b[0] or b[0] + b[2] + margin <= a[0]
+                or a[1] + a[3] + margin <= b[1] or b[1] + b[3] + margin <= a[1])
+
+
+# ----------------------------------------------------------------------
+# Precisión de los detectores
+# ----------------------------------------------------------------------
+
+def _inside(point: Tuple[float, float], box: Box, margin: float = 0.0) -> bool:
+    """True si el punto cae dentro de la caja (agrandada por margin × tamaño)"""
+    x, y, w, h = box
+    return (x - margin * w <= point[0] <= x + w + margin * w
+            and y - margin * h <= point[1] <= y + h + margin * h)
+
+
+def evaluate(generator: SceneGenerator, count: int) -> Dict:
+    """
+    Corre los detectores sobre escenas sintéticas y los compara con las etiquetas
+
+    Cada escena es independiente (sin trackers ni cadencia): se usan los
+    detectores directo sobre un FrameContext, con la configuración actual.
+
+    Returns:
+        Recall/precisión de latas, exactitud de clasificación, recall de
+        contenedores y obstáculos, y aciertos del límite
+    """
+    from core.vision_pipeline import VisionPipeline
+    from utils.helpers import load_config
+
+    camera_config = load_config(str(ROOT / 'config' / 'camera_config.yaml'))
+    detection_config = load_config(str(ROOT / 'config' / 'detection_config.yaml'))
+    pipeline = VisionPipeline(camera_config, detection_config)
+
+    totals = {key: 0 for key in ('cans', 'cans_found', 'cans_detected', 'cans_false',
+                                 'type_correct', 'containers', 'containers_found',
+                                 'obstacles', 'obstacles_found', 'boundary', 'boundary_found')}
+
+    for image, labels in generator.scenes(count):
+        scale = pipeline.processing_scale
+        if scale != 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        ctx = pipeline.frame_context(image)
+
+        def to_frame(box: Box) -> Box:
+            return tuple(int(round(v * scale)) for v in box)
+
+        cans = pipeline.can_classifier.classify_batch(pipeline.can_detector.detect(ctx), ctx)
+        matched = set()
+        for can in cans:
+            hit = next((i for i, truth in enumerate(labels['cans'])
+                        if i not in matched and _inside(can['center'], to_frame(truth['bounding_box']))), None)
+            if hit is None:
+                totals['cans_false'] += 1
+                continue
+            matched.add(hit)
+            totals['type_correct'] += can.get('type') == labels['cans'][hit]['type']
+        totals['cans'] += len(labels['cans'])
+        totals['cans_found'] += len(matched)
+        totals['cans_detected'] += len(cans)
+
+        containers = pipeline.container_detector.detect(ctx)
+        for truth in labels['containers']:
+            totals['containers'] += 1
+            totals['containers_found'] += any(
+                c['color'] == truth['color'] and _inside(c['center'], to_frame(truth['bounding_box']))
+                for c in containers)
+
+        obstacles = pipeline.obstacle_detector.detect(ctx)
+        for truth in labels['obstacles']:
+            totals['obstacles'] += 1
+            totals['obstacles_found'] += any(
+                _inside(o['center'], to_frame(truth['bounding_box']), margin=0.25) for o in obstacles)
+
+        if labels['boundary']['edge'] is not None:
+            totals['boundary'] += 1
+            totals['boundary_found'] += bool(
+                pipeline.boundary_detector.detect(ctx).get('boundary_regions'))
+
+    def ratio(found: str, total: str) -> Optional[float]:
+        return round(totals[found] / totals[total], 3) if totals[total] else None
+
+    return {
+        'scenes': count,
+        'cans': totals['cans'],
+        'can_recall': ratio('cans_found', 'cans'),
+        'can_precision': ratio('cans_found', 'cans_detected'),
+        'can_false_positives': totals['cans_false'],
+        'can_type_accuracy': ratio('type_correct', 'cans_found'),
+        'container_recall': ratio('containers_found', 'containers'),
+        'obstacle_recall': ratio('obstacles_found', 'obstacles'),
+        'boundary_recall': ratio('boundary_found', 'boundary')
+    }
+
+
+# ----------------------------------------------------------------------
+# Principal
+# ----------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Generador de escenas sintéticas de playa')
+    parser.add_argument('--count', type=int, default=100, help='Escenas a generar')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--cans', type=int, default=4, help='Latas por escena')
+    parser.add_argument('--organic', type=float, default=0.5, help='Fracción de latas orgánicas')
+    parser.add_argument('--obstacles', type=int, default=1, help='Obstáculos por escena')
+    parser.add_argument('--noise', type=float, default=6.0, help='Ruido del sensor (σ)')
+    parser.add_argument('--illumination', type=float, default=0.15, help='Variación de iluminación')
+    parser.add_argument('--no-tarp', action='store_true', help='Sin lona azul')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Carpeta de salida (PNG + labels.json)')
+    parser.add_argument('--record', help='Archivo .bcvraw de salida (para camera.source: recording)')
+    parser.add_argument('--fps', type=float, default=30.0, help='FPS de la grabación')
+    parser.add_argument('--evaluate', action='store_true', help='Medir precisión de los detectores')
+    args = parser.parse_args()
+
+    generator = SceneGenerator(args.width, args.height, args.cans, args.organic,
+                               obstacles=args.obstacles, noise=args.noise,
+                               illumination=args.illumination, tarp=not args.no_tarp,
+                               seed=args.seed)
+
+    if args.evaluate:
+        print(json.dumps(evaluate(generator, args.count), indent=2))
+        return
+
+    if not args.output and not args.record:
+        parser.error('indicar --output, --record o --evaluate')
+
+    recorder = None
+    if args.record:
+        from capture.recording import FrameRecorder
+        recorder = FrameRecorder(args.record, args.count, {
+            'source': 'synthetic', 'decode_scale': 1.0, 'generator': vars(args)})
+
+    all_labels = []
+    for image, labels in generator.scenes(args.count):
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+            cv2.imwrite(os.path.join(args.output, f"scene_{labels['index']:05d}.png"), image)
+        if recorder is not None:
+            recorder.write(image, labels['index'] / args.fps)
+        all_labels.append(labels)
+
+    if recorder is not None:
+        recorder.close()
+        with open(os.path.splitext(args.record)[0] + '.labels.json', 'w', encoding='utf-8') as f:
+            json.dump(all_labels, f)
+    if args.output:
+        with open(os.path.join(args.output, 'labels.json'), 'w', encoding='utf-8') as f:
+            json.dump({'generator': vars(args), 'scenes': all_labels}, f)
+
+    print(f"{args.count} escenas {args.width}x{args.height} generadas")
+
+
+if __name__ == '__main__':
+    main()